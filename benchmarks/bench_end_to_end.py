@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+End-to-End Benchmark
+
+Runs the real request + parse paths against the local stand-in server
+(voyager_server.py) instead of LinkedIn, so client-side overhead (session,
+headers, response.json(), extractors, store writes) can be measured with no
+network. Reports p50/p95 latency per operation and the peak memory of one
+call. Local stores go to a temporary directory.
+
+Usage:
+    python benchmarks/bench_end_to_end.py
+    python benchmarks/bench_end_to_end.py --size 2000 --requests 50 --latency-ms 20
+    python benchmarks/bench_end_to_end.py --only messages
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Dict
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_extractors import REPO_ROOT, ensure_config
+from voyager_server import start_server
+
+# ==========================================
+# BENCHMARK SETTINGS
+# ==========================================
+
+DEFAULT_REQUESTS = 30
+DEFAULT_SIZE = 0      # 0 = recorded fixtures, else elements per synthetic response
+
+CONVERSATION_URN = "urn:li:msg_conversation:(urn:li:fsd_profile:ACoAA0,2-stand-in)"
+PROFILE_URL = "https://www.linkedin.com/in/stand-in-profile/"
+
+
+def operations(data_dir: str) -> Dict[str, Callable[[], object]]:
+    """One callable per measured operation, wired to fresh stores under `data_dir`"""
+    # Imported here: LINKEDIN_BASE_URL must be set before linkedin_client is loaded
+    from linkedin_client import new_session
+    from local_store import LocalStore
+    from response_archive import ResponseArchive
+    from linkedin_api_call import LinkedInScraper
+    from linkedin_conversation_extractor import LinkedInConversationExtractor
+    from linkedin_messages_viewer import LinkedInMessagesViewer
+    from linkedin_connection_checker import LinkedInConnectionChecker
+    from identity_cache import IdentityCache
+
+    session = new_session(use_http_cache=False)
+    store = LocalStore(os.path.join(data_dir, "store.db"))
+    archive = ResponseArchive(os.path.join(data_dir, "responses.dat"))
+    scraper = LinkedInScraper(session=session, archive=archive)
+    conversations = LinkedInConversationExtractor(store=store, session=session, archive=archive)
+    viewer = LinkedInMessagesViewer(store=store, session=session)
+    checker = LinkedInConnectionChecker(identity_cache=IdentityCache(os.path.join(data_dir, "identity.db")),
+                                        store=store, session=session)
+
+    return {
+        "search (make_api_call + extract)": lambda: scraper.extract_posts_from_json(scraper.make_api_call(0)),
+        "conversations (get + extract)": lambda: conversations.extract_conversation_data(conversations.get_conversations()),
+        "messages (get + extract)": lambda: viewer.extract_messages(viewer.get_messages(CONVERSATION_URN)),
+        "connection (resolve_connection_status)": lambda: checker.resolve_connection_status(PROFILE_URL),
+    }
+
+
+def measure(operation: Callable[[], object], requests: int) -> Dict:
+    """Latency percentiles over `requests` calls and peak memory of one call"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        # Warm-up: connection setup and first-call imports don't count
+        operation()
+
+        timings = []
+        for _ in range(requests):
+            start = time.perf_counter()
+            operation()
+            timings.append((time.perf_counter() - start) * 1000)
+
+        tracemalloc.start()
+        try:
+            operation()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "p50_ms": statistics.median(timings),
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark request + parse paths against the local stand-in server")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="Timed calls per operation")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="Elements per synthetic response (0 = recorded fixtures)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Server-side delay per response")
+    parser.add_argument("--only", help="Run only operations whose name contains this text")
+    args = parser.parse_args()
+
+    server = start_server(size=args.size, latency_ms=args.latency_ms)
+    os.environ["LINKEDIN_BASE_URL"] = server.base_url
+    os.environ["LINKEDIN_TRANSPORT"] = "passthrough"
+    ensure_config()
+    os.chdir(REPO_ROOT)
+    # The scraper logs every call at INFO; keep the table readable
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        measured = operations(data_dir)
+        print("=" * 80)
+        print(f"📊 END-TO-END BENCHMARKS ({server.base_url}, "
+              f"{'fixtures' if not args.size else f'{args.size} elements'}, {args.latency_ms:.0f} ms server latency)")
+        print("=" * 80)
+        print(f"{'Operation':<44} {'p50 ms':>10} {'p95 ms':>10} {'peak KB':>12}")
+        print("-" * 80)
+        for name, operation in measured.items():
+            if args.only and args.only.lower() not in name.lower():
+                continue
+            stats = measure(operation, args.requests)
+            print(f"{name:<44} {stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f} {stats['peak_memory_kb']:>12.1f}")
+        print("=" * 80)
+
+    server.shutdown()
+    print("📈 Requests served: " + ", ".join(f"{k}={v}" for k, v in sorted(server.counters.items())))
+
+
+if __name__ == "__main__":
+    main()
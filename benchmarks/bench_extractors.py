@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Extractor Benchmark Suite
+
+Runs the response extractors offline against the recorded, anonymised
+responses in benchmarks/fixtures/ plus a set of synthetic large responses,
+and reports throughput (responses/sec) and peak memory for each extractor.
+
+Usage:
+    python benchmarks/bench_extractors.py
+    python benchmarks/bench_extractors.py --iterations 20 --synthetic-size 20000
+    python benchmarks/bench_extractors.py --json bench_results.json
+    python benchmarks/bench_extractors.py --baseline bench_results.json --max-regression 0.25
+
+With --baseline the script exits with status 1 when any extractor's
+throughput drops by more than --max-regression compared to the baseline run.
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from typing import Callable, Dict, List
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+# ==========================================
+# BENCHMARK SETTINGS
+# ==========================================
+
+DEFAULT_ITERATIONS = 10          # Passes over the corpus per extractor
+DEFAULT_SYNTHETIC_SIZE = 12000   # Elements in each synthetic large response
+DEFAULT_MAX_REGRESSION = 0.20    # Allowed throughput drop vs. baseline (20%)
+
+
+def ensure_config():
+    """
+    Make `import config` work offline.
+
+    linkedin_api_call.py imports its credentials from config.py at import time.
+    The extractors never touch the network, so when no config.py exists the
+    placeholder values from config_template.py are used instead.
+    """
+    try:
+        import config  # noqa: F401
+    except ImportError:
+        template_path = os.path.join(REPO_ROOT, "config_template.py")
+        spec = importlib.util.spec_from_file_location("config", template_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules["config"] = module
+
+
+# ==========================================
+# SYNTHETIC RESPONSES
+# ==========================================
+
+def _urn_id(i: int) -> str:
+    return f"ACoAA{i:035d}"
+
+
+def synthetic_search_response(size: int) -> Dict:
+    """Search GraphQL response with `size` feed updates"""
+    items = []
+    for i in range(size):
+        items.append({
+            "item": {
+                "searchFeedUpdate": {
+                    "update": {
+                        "actor": {
+                            "name": {"text": f"Author {i}"},
+                            "navigationContext": {"actionTarget": f"https://www.linkedin.com/in/author-{i}?miniProfileUrn=x"}
+                        },
+                        "commentary": {"text": {"text": f"Post body {i} - hiring marketing roles in Dubai " * 4}},
+                        "socialContent": {"shareUrl": f"https://www.linkedin.com/feed/update/urn:li:activity:{7000000000000000000 + i}/"}
+                    }
+                }
+            }
+        })
+    return {"data": {"searchDashClustersByAll": {"elements": [{"items": items}]}}}
+
+
+def synthetic_conversations_response(size: int) -> Dict:
+    """messengerConversations response with `size` two-party threads"""
+    owner = "urn:li:fsd_profile:" + _urn_id(0)
+    elements = []
+    for i in range(1, size + 1):
+        other = "urn:li:fsd_profile:" + _urn_id(i)
+        elements.append({
+            "entityUrn": f"urn:li:msg_conversation:({owner},2-{i:040d})",
+            "backendUrn": f"urn:li:messagingThread:2-{i:040d}",
+            "conversationUrl": f"https://www.linkedin.com/messaging/thread/2-{i:040d}",
+            "lastActivityAt": 1750000000000 - i * 1000,
+            "unreadCount": i % 3,
+            "conversationParticipants": [
+                {
+                    "entityUrn": f"urn:li:msg_messagingParticipant:{other}",
+                    "hostIdentityUrn": other,
+                    "participantType": {
+                        "member": {
+                            "firstName": {"text": f"First{i}"},
+                            "lastName": {"text": f"Last{i}"},
+                            "headline": {"text": f"Headline {i}"},
+                            "profileUrl": f"https://www.linkedin.com/in/person-{i}"
+                        }
+                    }
+                }
+            ]
+        })
+    return {"data": {"messengerConversationsByCategoryQuery": {"elements": elements}}}
+
+
+def synthetic_messages_response(size: int) -> Dict:
+    """messengerMessages response with `size` messages"""
+    elements = []
+    for i in range(size):
+        sender = "urn:li:fsd_profile:" + _urn_id(i % 2)
+        elements.append({
+            "entityUrn": f"urn:li:msg_message:(urn:li:fsd_profile:{_urn_id(0)},2-{i:050d})",
+            "backendUrn": f"urn:li:messagingMessage:2-{i:050d}",
+            "deliveredAt": 1700000000000 + i * 60000,
+            "body": {"text": f"Message number {i}, following up on the invoice and the meeting."},
+            "sender": {
+                "hostIdentityUrn": sender,
+                "participantType": {"member": {"firstName": {"text": f"Sender{i % 2}"}, "lastName": {"text": "Example"}}}
+            }
+        })
+    return {"data": {"messengerMessagesBySyncToken": {"elements": elements}}}
+
+
+def synthetic_profile_view_response(size: int) -> Dict:
+    """
+    Normalized profileView response with `size` included elements.
+
+    The person's Profile and distance element are placed at the end so the
+    extractors have to walk the whole array, which is the worst case seen on
+    large profiles.
+    """
+    included = []
+    for i in range(size):
+        included.append({
+            "$type": "com.linkedin.voyager.identity.profile.Position",
+            "entityUrn": f"urn:li:fs_position:({_urn_id(1)},{i})",
+            "title": f"Role {i}",
+            "companyName": f"Company {i}",
+            "description": "Responsible for campaigns, budgets and reporting. " * 2
+        })
+    included.append({
+        "$type": "com.linkedin.voyager.identity.profile.Profile",
+        "entityUrn": "urn:li:fs_profile:" + _urn_id(1),
+        "firstName": "Synthetic",
+        "lastName": "Profile",
+        "headline": "Synthetic profile used for benchmarks"
+    })
+    included.append({
+        "$type": "com.linkedin.voyager.identity.profile.ProfileNetworkInfo",
+        "entityUrn": "urn:li:fs_profileNetworkInfo:" + _urn_id(1),
+        "distance": {"value": "DISTANCE_3"}
+    })
+    return {"data": {"entityUrn": "urn:li:fs_profileView:synthetic-profile"}, "included": included}
+
+
+# ==========================================
+# EXTRACTOR REGISTRY
+# ==========================================
+
+def _scraper_extractor() -> Callable[[Dict], object]:
+    from linkedin_api_call import LinkedInScraper
+    return LinkedInScraper().extract_posts_from_json
+
+
+def _conversation_extractor() -> Callable[[Dict], object]:
+    from linkedin_conversation_extractor import LinkedInConversationExtractor
+    return LinkedInConversationExtractor().extract_conversation_data
+
+
+def _messages_extractor() -> Callable[[Dict], object]:
+    from linkedin_messages_viewer import LinkedInMessagesViewer
+    return LinkedInMessagesViewer().extract_messages
+
+
+def _connection_extractor() -> Callable[[Dict], object]:
+    from linkedin_connection_checker import LinkedInConnectionChecker
+    checker = LinkedInConnectionChecker()
+    return lambda data: checker.extract_connection_info(data, "benchmark")
+
+
+# name -> (fixture file prefixes, synthetic generator, extractor factory)
+EXTRACTORS = {
+    "LinkedInScraper.extract_posts_from_json": (
+        ("search_clusters_",), synthetic_search_response, _scraper_extractor),
+    "LinkedInConversationExtractor.extract_conversation_data": (
+        ("conversations_",), synthetic_conversations_response, _conversation_extractor),
+    "LinkedInMessagesViewer.extract_messages": (
+        ("messages_",), synthetic_messages_response, _messages_extractor),
+    "LinkedInConnectionChecker.extract_connection_info": (
+        ("profile_view_", "network_info_"), synthetic_profile_view_response, _connection_extractor),
+}
+
+
+def load_fixtures(prefixes) -> List[Dict]:
+    """Load every recorded fixture whose filename starts with one of `prefixes`"""
+    corpus = []
+    for filename in sorted(os.listdir(FIXTURE_DIR)):
+        if filename.endswith(".json") and filename.startswith(tuple(prefixes)):
+            with open(os.path.join(FIXTURE_DIR, filename), 'r', encoding='utf-8') as f:
+                corpus.append(json.load(f))
+    return corpus
+
+
+# ==========================================
+# MEASUREMENT
+# ==========================================
+
+def measure(extract: Callable[[Dict], object], corpus: List[Dict], iterations: int) -> Dict:
+    """Return throughput and peak memory for one extractor over `corpus`"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        # Warm-up pass so imports and caches don't count against the first run
+        for response in corpus:
+            extract(response)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            for response in corpus:
+                extract(response)
+        elapsed = time.perf_counter() - start
+
+        tracemalloc.start()
+        try:
+            for response in corpus:
+                extract(response)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    processed = iterations * len(corpus)
+    return {
+        "responses": processed,
+        "seconds": elapsed,
+        "responses_per_sec": processed / elapsed if elapsed > 0 else float('inf'),
+        "peak_memory_kb": peak / 1024,
+    }
+
+
+def run_benchmarks(iterations: int, synthetic_size: int, only: str = None) -> Dict[str, Dict]:
+    ensure_config()
+    results = {}
+    for name, (prefixes, synthesize, factory) in EXTRACTORS.items():
+        if only and only.lower() not in name.lower():
+            continue
+
+        recorded = load_fixtures(prefixes)
+        synthetic = synthesize(synthetic_size)
+        extract = factory()
+
+        results[name] = {
+            "recorded": measure(extract, recorded, iterations),
+            "synthetic": measure(extract, [synthetic], max(1, iterations // 5)),
+        }
+    return results
+
+
+def print_results(results: Dict[str, Dict], synthetic_size: int):
+    print("=" * 96)
+    print("📊 EXTRACTOR BENCHMARKS")
+    print("=" * 96)
+    print(f"{'Extractor':<58} {'Corpus':<10} {'resp/sec':>12} {'peak KB':>12}")
+    print("-" * 96)
+    for name, corpora in results.items():
+        for corpus_name, stats in corpora.items():
+            label = corpus_name if corpus_name == "recorded" else f"{synthetic_size // 1000}k"
+            print(f"{name:<58} {label:<10} {stats['responses_per_sec']:>12.1f} {stats['peak_memory_kb']:>12.1f}")
+    print("=" * 96)
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline_path: str, max_regression: float) -> List[str]:
+    """Return a description of every throughput regression beyond `max_regression`"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f).get("results", {})
+
+    regressions = []
+    for name, corpora in results.items():
+        for corpus_name, stats in corpora.items():
+            previous = baseline.get(name, {}).get(corpus_name)
+            if not previous:
+                continue
+            ratio = stats["responses_per_sec"] / previous["responses_per_sec"]
+            if ratio < 1 - max_regression:
+                regressions.append(f"{name} [{corpus_name}]: {previous['responses_per_sec']:.1f} -> "
+                                   f"{stats['responses_per_sec']:.1f} resp/sec ({(1 - ratio) * 100:.0f}% slower)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmarks for the LinkedIn response extractors")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Passes over the recorded corpus")
+    parser.add_argument("--synthetic-size", type=int, default=DEFAULT_SYNTHETIC_SIZE, help="Elements per synthetic response")
+    parser.add_argument("--only", help="Only run extractors whose name contains this text")
+    parser.add_argument("--json", dest="json_path", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a previous --json output")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Allowed fractional throughput drop vs. baseline")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.iterations, args.synthetic_size, args.only)
+    print_results(results, args.synthetic_size)
+
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "iterations": args.iterations,
+                "synthetic_size": args.synthetic_size,
+                "python": sys.version.split()[0],
+                "results": results,
+            }, f, indent=2)
+        print(f"💾 Results saved to: {args.json_path}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.max_regression)
+        if regressions:
+            print("❌ Throughput regressions detected:")
+            for line in regressions:
+                print(f"   • {line}")
+            sys.exit(1)
+        print("✅ No throughput regressions against baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+HTTP Client Benchmark
+
+Compares the old one-Session-per-object pattern (a new connection for every
+extractor/lookup) with the shared keep-alive session from linkedin_client.py.
+Requests go to a local HTTP/1.1 server that sleeps --handshake-ms for every new
+connection, standing in for the TCP + TLS handshake with www.linkedin.com.
+
+Usage:
+    python benchmarks/bench_http_client.py
+    python benchmarks/bench_http_client.py --requests 200 --handshake-ms 80
+"""
+
+import argparse
+import os
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_extractors import ensure_config
+
+# linkedin_client needs config.py; the placeholder values will do against a local server
+ensure_config()
+
+from linkedin_client import new_session
+
+BODY = b'{"elements": []}'
+
+
+class HandshakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, handshake_ms: float):
+        super().__init__(address, KeepAliveHandler)
+        self.handshake_ms = handshake_ms
+        self.connections = 0
+        self._lock = threading.Lock()
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server._lock:
+            self.server.connections += 1
+        time.sleep(self.server.handshake_ms / 1000)
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(BODY)))
+        self.end_headers()
+        self.wfile.write(BODY)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(url: str, count: int, shared: bool) -> float:
+    """Milliseconds per request; `shared` reuses one pooled session"""
+    session = new_session() if shared else None
+    start = time.perf_counter()
+    for _ in range(count):
+        if shared:
+            session.get(url).content
+        else:
+            with requests.Session() as fresh:
+                fresh.get(url).content
+    return (time.perf_counter() - start) * 1000 / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark per-object sessions vs. the shared keep-alive session")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--handshake-ms", type=float, default=50.0,
+                        help="Delay per new connection, standing in for TCP + TLS setup (default: 50)")
+    args = parser.parse_args()
+
+    server = HandshakeServer(("127.0.0.1", 0), args.handshake_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/voyager/api/me"
+
+    print("=" * 80)
+    print(f"📊 HTTP CLIENT: {args.requests} requests, {args.handshake_ms:g} ms per handshake")
+    print("=" * 80)
+    print(f"{'Client':<34} {'ms/request':>12} {'connections':>12}")
+    print("-" * 80)
+    for label, shared in (("new Session per call (old)", False), ("shared pooled session", True)):
+        server.connections = 0
+        per_request_ms = run(url, args.requests, shared)
+        print(f"{label:<34} {per_request_ms:>12.2f} {server.connections:>12}")
+    print("=" * 80)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Name Index Benchmark
+
+Compares the old linear "query in name or name in query" scan from
+get_urns_by_name with the ranked NameIndex on a synthetic mailbox, reporting
+build time and time per lookup.
+
+Usage:
+    python benchmarks/bench_name_index.py
+    python benchmarks/bench_name_index.py --threads 50000 --iterations 200
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+from typing import Dict, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from name_index import NameIndex
+
+QUERIES = ["john", "jo", "jonh", "oussama", "usama", "maria smith", "marsia", "zzqx"]
+
+
+def synthetic_name_mapping(threads: int, seed: int = 7) -> Dict[str, Dict]:
+    """Name mapping shaped like create_name_mapping's output for `threads` conversations"""
+    rng = random.Random(seed)
+    consonants, syllables = "bcdfghjklmnprstvz", ["a", "e", "i", "o", "u", "ar", "en", "il", "on", "ja", "ri", "ss"]
+    first_names = [
+        rng.choice(consonants) + "".join(rng.choice(syllables) + rng.choice(consonants) for _ in range(rng.randint(1, 3)))
+        for _ in range(400)
+    ] + ["john", "maria", "oussama"]
+
+    mapping = {}
+    for i in range(threads):
+        first = rng.choice(first_names)
+        last = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9)))
+        data = {"full_name": f"{first.title()} {last.title()}", "last_activity": i}
+        mapping[first] = data
+        mapping[f"{first} {last}"] = data
+        mapping[f"{first}-{last}-{i:x}"] = data
+    return mapping
+
+
+def legacy_lookup(name_mapping: Dict[str, Dict], name: str) -> Optional[Dict]:
+    """The pre-index partial match from get_urns_by_name"""
+    name_lower = name.lower()
+    if name_lower in name_mapping:
+        return name_mapping[name_lower]
+    for mapped_name, data in name_mapping.items():
+        if name_lower in mapped_name or mapped_name in name_lower:
+            return data
+    return None
+
+
+def per_lookup_ms(func, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark linear name matching vs. the NameIndex")
+    parser.add_argument("--threads", type=int, default=20000)
+    parser.add_argument("--iterations", type=int, default=100)
+    args = parser.parse_args()
+
+    mapping = synthetic_name_mapping(args.threads)
+    start = time.perf_counter()
+    index = NameIndex(mapping)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 90)
+    print(f"📊 NAME LOOKUP: {args.threads} threads, {len(mapping)} keys, index built in {build_ms:.0f} ms")
+    print("=" * 90)
+    print(f"{'Query':<14} {'linear ms':>10} {'index ms':>10}  {'linear hit':<22} {'index best':<22}")
+    print("-" * 90)
+    for query in QUERIES:
+        old_ms = per_lookup_ms(lambda: legacy_lookup(mapping, query), args.iterations)
+        new_ms = per_lookup_ms(lambda: index.search(query), args.iterations)
+        old_hit = legacy_lookup(mapping, query)
+        best = index.best(query)
+        print(f"{query:<14} {old_ms:>10.3f} {new_ms:>10.3f}  "
+              f"{(old_hit or {}).get('full_name', '-'):<22} {best.key if best else '-':<22}")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    main()
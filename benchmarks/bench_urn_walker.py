@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+URN Walker Benchmark
+
+Compares the old "json.dumps() + regexes over the string" URN sniffing with the
+structured walker in urn_extraction.py, reporting time per lookup and peak
+memory for both on the recorded profileView fixture and on a synthetic large
+response. The HTML fallback is covered too: the old six findall() passes plus
+pairwise dedupe against one scan_page_urns() pass.
+
+Usage:
+    python benchmarks/bench_urn_walker.py
+    python benchmarks/bench_urn_walker.py --synthetic-size 50000 --iterations 20
+"""
+
+import argparse
+import html
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_extractors import FIXTURE_DIR, synthetic_profile_view_response
+from urn_extraction import dedupe_keep_longest, first_profile_urn_id, profile_urn_candidates, scan_page_urns
+
+
+def legacy_candidates(data: Dict) -> List[str]:
+    """The pre-walker implementation from get_profile_urn_from_public_id"""
+    response_text = json.dumps(data)
+    urn_patterns = [
+        r'urn:li:fsd_profile:([A-Za-z0-9_-]{20,50})',
+        r'urn:li:fsd_profile:([A-Za-z0-9_-]+)',
+        r'"miniProfile":"urn:li:fs_miniProfile:([^"]+)"'
+    ]
+    all_urns = []
+    for pattern in urn_patterns:
+        all_urns.extend(re.findall(pattern, response_text))
+    return list(set(all_urns))
+
+
+def legacy_first_id(data: Dict):
+    """The pre-walker implementation from get_profile_identifiers.get_identifiers"""
+    m = re.search(r"urn:li:fsd_profile:([A-Za-z0-9_-]{20,})", json.dumps(data))
+    return m.group(1) if m else None
+
+
+def legacy_page_candidates(page: str) -> List[str]:
+    """The pre-scanner HTML fallback from extract_profile_urn_from_url"""
+    urn_patterns = [
+        r'urn:li:fsd_profile:([A-Za-z0-9_-]{20,50})',
+        r'"profileUrn":"urn:li:fsd_profile:([^"]+)"',
+        r'&quot;profileUrn&quot;:&quot;urn:li:fsd_profile:([^&]+)&quot;',
+        r'"urn:li:fsd_profile:([^"]+)"',
+        r'"miniProfile":"urn:li:fs_miniProfile:([^"]+)"',
+        r'urn:li:fsd_profile:([A-Za-z0-9_-]+)',
+    ]
+    all_urns = []
+    for pattern in urn_patterns:
+        for match in re.findall(pattern, page):
+            if "ACoAA" in match and len(match) > 20:
+                all_urns.append(match)
+    unique_urns = []
+    for urn in set(all_urns):
+        is_subset = False
+        for existing in unique_urns:
+            if urn in existing:
+                is_subset = True
+                break
+            elif existing in urn:
+                unique_urns.remove(existing)
+                break
+        if not is_subset:
+            unique_urns.append(urn)
+    return unique_urns
+
+
+def scanner_page_candidates(page: str) -> List[str]:
+    candidates = [
+        urn_id for urn_id in scan_page_urns(page).profile_ids(include_mini_profiles=True)
+        if "ACoAA" in urn_id and len(urn_id) > 20
+    ]
+    return dedupe_keep_longest(candidates)
+
+
+def profile_page_html(data: Dict) -> str:
+    """Wrap a response the way profile pages embed it: HTML-escaped inside <code>"""
+    return f'<html><body><code style="display: none">{html.escape(json.dumps(data))}</code></body></html>'
+
+
+def urn_rich_response(size: int) -> Dict:
+    """Synthetic profileView where every included element references a profile URN"""
+    data = synthetic_profile_view_response(size)
+    for i, element in enumerate(data['included']):
+        element['*profile'] = f"urn:li:fsd_profile:ACoAA{i % 50:035d}"
+        element['miniProfile'] = f"urn:li:fs_miniProfile:ACoAA{i % 50:035d}"
+    return data
+
+
+def measure(func: Callable[[object], object], data: object, iterations: int) -> Dict:
+    func(data)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(data)
+    elapsed = (time.perf_counter() - start) / iterations
+
+    tracemalloc.start()
+    try:
+        func(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"ms_per_lookup": elapsed * 1000, "peak_memory_kb": peak / 1024}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark json.dumps+regex URN sniffing vs. the structured walker")
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--synthetic-size", type=int, default=12000)
+    args = parser.parse_args()
+
+    with open(os.path.join(FIXTURE_DIR, "profile_view_small.json"), 'r', encoding='utf-8') as f:
+        recorded = json.load(f)
+
+    datasets = {
+        "recorded profileView": recorded,
+        f"synthetic {args.synthetic_size // 1000}k": urn_rich_response(args.synthetic_size),
+    }
+    pairs = [
+        ("all candidates", legacy_candidates, profile_urn_candidates),
+        ("first profile id", legacy_first_id, first_profile_urn_id),
+    ]
+
+    print("=" * 100)
+    print("📊 URN LOOKUP: json.dumps + regex  vs.  structured walker")
+    print("=" * 100)
+    print(f"{'Dataset':<24} {'Lookup':<18} {'legacy ms':>10} {'walker ms':>10} {'legacy KB':>11} {'walker KB':>11} {'speedup':>8}")
+    print("-" * 100)
+    for dataset_name, data in datasets.items():
+        for lookup_name, legacy, walker in pairs:
+            if set(legacy(data) or []) - set(walker(data) or []) and lookup_name == "all candidates":
+                print(f"⚠️ Candidate mismatch on {dataset_name}")
+            old = measure(legacy, data, args.iterations)
+            new = measure(walker, data, args.iterations)
+            speedup = old["ms_per_lookup"] / new["ms_per_lookup"] if new["ms_per_lookup"] else float('inf')
+            print(f"{dataset_name:<24} {lookup_name:<18} {old['ms_per_lookup']:>10.3f} {new['ms_per_lookup']:>10.3f} "
+                  f"{old['peak_memory_kb']:>11.1f} {new['peak_memory_kb']:>11.1f} {speedup:>7.1f}x")
+
+    print("-" * 100)
+    print(f"{'Page':<24} {'Lookup':<18} {'findall ms':>10} {'scan ms':>10} {'findall KB':>11} {'scan KB':>11} {'speedup':>8}")
+    print("-" * 100)
+    for dataset_name, data in datasets.items():
+        page = profile_page_html(data)
+        if set(legacy_page_candidates(page)) != set(scanner_page_candidates(page)):
+            print(f"⚠️ Candidate mismatch on {dataset_name} page")
+        old = measure(legacy_page_candidates, page, args.iterations)
+        new = measure(scanner_page_candidates, page, args.iterations)
+        speedup = old["ms_per_lookup"] / new["ms_per_lookup"] if new["ms_per_lookup"] else float('inf')
+        print(f"{dataset_name:<24} {'HTML candidates':<18} {old['ms_per_lookup']:>10.3f} {new['ms_per_lookup']:>10.3f} "
+              f"{old['peak_memory_kb']:>11.1f} {new['peak_memory_kb']:>11.1f} {speedup:>7.1f}x")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Voyager Stand-in Server
+
+A local HTTP server that answers the voyager endpoints the scripts call, so
+they can run (and be benchmarked end to end) with no network and no LinkedIn
+account. Point the scripts at it with LINKEDIN_BASE_URL (see linkedin_client.py):
+
+    LINKEDIN_BASE_URL=http://127.0.0.1:8765 python linkedin_messages_viewer.py "Jane Doe"
+
+Routes (everything else is a 404):
+
+    GET  /voyager/api/graphql                              search (make_api_call)
+    GET  /voyager/api/voyagerMessagingGraphQL/graphql      messengerConversations / messengerMessages (by queryId)
+    GET  /voyager/api/identity/profiles/{id}/profileView   profileView
+    GET  /voyager/api/identity/profiles/{id}/networkinfo   network info (other per-profile endpoints get it too)
+    GET  /voyager/api/identity/profiles/{id}               identity
+    GET  /voyager/api/me                                   session check
+    GET  /in/{id}/                                         profile page HTML (URN fallback)
+    POST /voyager/api/...?action=createMessage             message send
+
+Responses come from the recorded fixtures in benchmarks/fixtures (--size 0)
+or from the synthetic generators in bench_extractors.py with --size elements
+per response. Search pages get distinct post URLs per `start`, and the
+conversation inbox pages by lastUpdatedBefore, so paging code runs as it would
+against LinkedIn. Bodies are serialized once and reused.
+
+--latency-ms/--jitter-ms delay every response; --error-rate answers that
+fraction of requests with one of --error-statuses (429 with Retry-After, 403).
+
+Usage:
+    python benchmarks/voyager_server.py
+    python benchmarks/voyager_server.py --size 2000 --latency-ms 150 --jitter-ms 50
+    python benchmarks/voyager_server.py --error-rate 0.1 --error-statuses 429,403 --seed 1
+"""
+
+import argparse
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_extractors import (FIXTURE_DIR, synthetic_conversations_response, synthetic_messages_response,
+                              synthetic_profile_view_response, synthetic_search_response)
+
+# ==========================================
+# SERVER SETTINGS
+# ==========================================
+
+DEFAULT_PORT = 8765
+DEFAULT_SIZE = 0                  # 0 = recorded fixtures, else elements per synthetic response
+DEFAULT_ERROR_STATUSES = "429,403"
+RETRY_AFTER_SECONDS = 1
+
+VOYAGER_PREFIX = "/voyager/api"
+PROFILE_ROUTE = re.compile(r"^/identity/profiles/([^/]+)(?:/([A-Za-z]+))?$")
+
+
+def _load_fixture(name: str) -> Dict:
+    with open(os.path.join(FIXTURE_DIR, name), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _member_urn_id(public_id: str) -> str:
+    """Stable, ACoAA-shaped member id for a public identifier"""
+    return "ACoAA" + hashlib.sha1(public_id.encode("utf-8")).hexdigest()[:34]
+
+
+def _variable(variables: str, name: str) -> Optional[str]:
+    """One value from a restli `variables=(...)` string"""
+    match = re.search(rf"[(,]{name}:([^,)]+)", variables)
+    return unquote(match.group(1)) if match else None
+
+
+class VoyagerPayloads:
+    """Serialized response bodies, built once per distinct request shape"""
+
+    def __init__(self, size: int = DEFAULT_SIZE):
+        self.size = size
+        # The whole inbox, newest first; conversation pages are slices of it
+        if size:
+            self.inbox = synthetic_conversations_response(size)["data"]["messengerConversationsByCategoryQuery"]["elements"]
+        else:
+            self.inbox = _load_fixture("conversations_small.json")["data"]["messengerConversationsByCategoryQuery"]["elements"]
+
+    @functools.lru_cache(maxsize=256)
+    def search(self, start: int) -> bytes:
+        if self.size:
+            data = synthetic_search_response(self.size)
+        else:
+            data = _load_fixture("search_clusters_small.json")
+        # Distinct share URLs per page, so seen-post detection doesn't end paging early
+        body = json.dumps(data)
+        return re.sub(r"urn:li:activity:(\d+)", lambda m: f"urn:li:activity:{int(m.group(1)) + start * 1000}", body).encode("utf-8")
+
+    @functools.lru_cache(maxsize=256)
+    def conversations(self, count: int, before: Optional[int]) -> bytes:
+        elements = [e for e in self.inbox if before is None or e.get("lastActivityAt", 0) < before][:count]
+        return json.dumps({"data": {"messengerConversationsByCategoryQuery": {
+            "elements": elements, "metadata": {"nextCursor": None}}}}).encode("utf-8")
+
+    @functools.lru_cache(maxsize=2)
+    def messages(self, incremental: bool) -> bytes:
+        data = synthetic_messages_response(self.size) if self.size else _load_fixture("messages_small.json")
+        collection = data["data"]["messengerMessagesBySyncToken"]
+        if incremental:
+            # Nothing new since the caller's sync token
+            collection["elements"] = []
+        collection["metadata"] = {"newSyncToken": "stand-in-sync-token"}
+        return json.dumps(data).encode("utf-8")
+
+    @functools.lru_cache(maxsize=1)
+    def profile_view(self) -> bytes:
+        data = synthetic_profile_view_response(self.size) if self.size else _load_fixture("profile_view_small.json")
+        return json.dumps(data).encode("utf-8")
+
+    @functools.lru_cache(maxsize=1)
+    def network_info(self) -> bytes:
+        return json.dumps(_load_fixture("network_info_small.json")).encode("utf-8")
+
+    @functools.lru_cache(maxsize=1024)
+    def identity(self, public_id: str) -> bytes:
+        urn_id = _member_urn_id(public_id)
+        return json.dumps({
+            "data": {"entityUrn": f"urn:li:fs_profile:{urn_id}", "firstName": "Stand", "lastName": "In",
+                     "publicIdentifier": public_id},
+            "included": [{
+                "$type": "com.linkedin.voyager.dash.identity.profile.Profile",
+                "entityUrn": f"urn:li:fsd_profile:{urn_id}",
+                "firstName": "Stand",
+                "lastName": "In",
+                "publicIdentifier": public_id,
+            }],
+        }).encode("utf-8")
+
+    @functools.lru_cache(maxsize=1024)
+    def profile_page(self, public_id: str) -> bytes:
+        urn_id = _member_urn_id(public_id)
+        return (f"<html><body><code>{{\"entityUrn\":\"urn:li:fsd_profile:{urn_id}\","
+                f"\"publicIdentifier\":\"{public_id}\"}}</code></body></html>").encode("utf-8")
+
+
+class VoyagerServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, size: int = DEFAULT_SIZE, latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0, error_statuses: Tuple[int, ...] = (429, 403), seed: Optional[int] = None):
+        super().__init__(address, VoyagerHandler)
+        self.payloads = VoyagerPayloads(size)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.counters: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, name: str) -> None:
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + 1
+
+    def draw(self) -> Tuple[float, Optional[int]]:
+        """Delay (seconds) and injected error status (or None) for one request"""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else self.latency_ms
+            error = self._random.choice(self.error_statuses) if self._random.random() < self.error_rate else None
+        return max(0.0, delay) / 1000, error
+
+
+class VoyagerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        # Headers and body go out in separate writes; don't let Nagle hold the body back
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def do_GET(self):
+        self.handle_request()
+
+    def do_POST(self):
+        # Drain the body so the connection can be reused
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.handle_request()
+
+    def handle_request(self):
+        delay, error = self.server.draw()
+        if delay:
+            time.sleep(delay)
+        if error is not None:
+            self.server.count(str(error))
+            headers = {"Retry-After": str(RETRY_AFTER_SECONDS)} if error == 429 else {}
+            self.reply(error, json.dumps({"status": error}).encode("utf-8"), headers=headers)
+            return
+
+        route, status, body, content_type = self.route()
+        self.server.count(route)
+        self.reply(status, body, content_type)
+
+    def route(self) -> Tuple[str, int, bytes, str]:
+        """(counter name, status, body, content type) for the request"""
+        parts = urlsplit(self.path)
+        path, query = parts.path, parse_qs(parts.query)
+        payloads = self.server.payloads
+        json_type = "application/json"
+
+        if self.command == "POST":
+            if query.get("action") == ["createMessage"]:
+                return "createMessage", 201, json.dumps({"value": {"backendUrn": "urn:li:messagingMessage:stand-in"}}).encode("utf-8"), json_type
+            return "notFound", 404, b'{"status": 404}', json_type
+
+        if path.startswith("/in/"):
+            public_id = path[len("/in/"):].strip("/")
+            return "profilePage", 200, payloads.profile_page(public_id), "text/html; charset=utf-8"
+        if not path.startswith(VOYAGER_PREFIX):
+            return "notFound", 404, b'{"status": 404}', json_type
+        path = path[len(VOYAGER_PREFIX):]
+
+        variables = (query.get("variables") or [""])[0]
+        query_id = (query.get("queryId") or [""])[0]
+        if path == "/graphql":
+            start = _variable(variables, "start")
+            return "search", 200, payloads.search(int(start) if start else 0), json_type
+        if path == "/voyagerMessagingGraphQL/graphql":
+            if query_id.startswith("messengerConversations"):
+                count = _variable(variables, "count")
+                before = _variable(variables, "lastUpdatedBefore")
+                return ("messengerConversations", 200,
+                        payloads.conversations(int(count) if count else 20, int(before) if before else None), json_type)
+            if query_id.startswith("messengerMessages"):
+                return "messengerMessages", 200, payloads.messages(_variable(variables, "syncToken") is not None), json_type
+        if path == "/me":
+            return "me", 200, payloads.identity("me"), json_type
+
+        match = PROFILE_ROUTE.match(path)
+        if match:
+            public_id, action = match.groups()
+            if action is None:
+                return "identity", 200, payloads.identity(public_id), json_type
+            if action == "profileView":
+                return "profileView", 200, payloads.profile_view(), json_type
+            return action, 200, payloads.network_info(), json_type
+        if path.startswith("/relationships/") or path.startswith("/identity/shared/"):
+            return "relationship", 200, payloads.network_info(), json_type
+        return "notFound", 404, b'{"status": 404}', json_type
+
+    def reply(self, status: int, body: bytes, content_type: str = "application/json",
+              headers: Optional[Dict[str, str]] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(port: int = 0, **kwargs) -> VoyagerServer:
+    """Serve on 127.0.0.1 in a background thread (port 0 picks a free port)"""
+    server = VoyagerServer(("127.0.0.1", port), **kwargs)
+    threading.Thread(target=server.serve_forever, name="voyager-server", daemon=True).start()
+    return server
+
+
+def parse_statuses(value: str) -> Tuple[int, ...]:
+    return tuple(int(status) for status in value.split(",") if status.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve stand-in voyager responses on localhost")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE,
+                        help="Elements per synthetic response (0 = recorded fixtures)")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Delay before every response")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="Uniform +/- variation of the delay")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of requests answered with an error")
+    parser.add_argument("--error-statuses", default=DEFAULT_ERROR_STATUSES, help="Comma-separated error statuses")
+    parser.add_argument("--seed", type=int, help="Seed for latency jitter and error injection")
+    args = parser.parse_args()
+
+    server = VoyagerServer(("127.0.0.1", args.port), size=args.size, latency_ms=args.latency_ms,
+                           jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                           error_statuses=parse_statuses(args.error_statuses), seed=args.seed)
+    print(f"🌐 Serving stand-in voyager API on {server.base_url}")
+    print(f"   LINKEDIN_BASE_URL={server.base_url}")
+    print(f"📦 Payloads: {'fixtures' if not args.size else f'{args.size} elements per response'}")
+    print(f"⏱️ Latency: {args.latency_ms:.0f} ± {args.jitter_ms:.0f} ms, errors: {args.error_rate:.0%} ({args.error_statuses})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print("\n📊 Requests served:")
+        for name, count in sorted(server.counters.items()):
+            print(f"   {name}: {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Connection Result Cache
+
+Remembers the outcome of a connection check (distance, profile name, source)
+per public profile slug, so checking the same profile again costs no requests.
+Entries live in a small SQLite database under local_data/.
+
+How long a result is trusted depends on what it says: a 1st-degree connection
+rarely changes, 2nd/3rd degree can shift as your network grows, and a check
+that couldn't determine the distance is only remembered briefly.
+
+Usage:
+    cache = default_connection_cache()
+    cache.get('john-doe')                       # None or the cached result fields
+    cache.put('john-doe', result)               # result of check_connection_status
+    python connection_cache.py --stats
+    python connection_cache.py --invalidate john-doe
+    python connection_cache.py --clear
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+from identity_cache import LOCAL_DATA_DIR, normalize_public_id
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+CONNECTION_CACHE_PATH = os.path.join(LOCAL_DATA_DIR, "connection_cache.db")
+
+# Seconds a result is trusted, by distance (None = couldn't be determined)
+CONNECTION_TTL_SECONDS = {
+    1: 7 * 24 * 3600,
+    2: 24 * 3600,
+    3: 24 * 3600,
+    None: 3600,
+}
+# Any other distance value (out of network, etc.)
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+CONNECTION_CACHE_MAX_ENTRIES = 10000
+
+# Result fields kept in the cache
+RESULT_FIELDS = ("is_connected", "distance", "connection_status", "profile_name", "source", "error")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS connection_results (
+    public_id          TEXT PRIMARY KEY,
+    is_connected       INTEGER NOT NULL,
+    distance           INTEGER,
+    connection_status  TEXT,
+    profile_name       TEXT,
+    source             TEXT,
+    error              TEXT,
+    checked_at         REAL NOT NULL,
+    expires_at         REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_connection_results_expires_at ON connection_results (expires_at);
+CREATE INDEX IF NOT EXISTS idx_connection_results_checked_at ON connection_results (checked_at);
+"""
+
+
+def ttl_for_result(result: Dict) -> float:
+    """TTL (seconds) for a check result, based on its distance"""
+    distance = result.get("distance")
+    return CONNECTION_TTL_SECONDS.get(distance, DEFAULT_TTL_SECONDS)
+
+
+def is_cacheable(result: Dict) -> bool:
+    """
+    Only answers are cached: a distance, or a cascade where at least one
+    endpoint answered (200) without giving one. Bad URLs, exceptions and runs
+    where every endpoint failed (429, 403, expired cookies) are not; the
+    checker reports those with a different error.
+    """
+    if result.get("distance") is not None:
+        return True
+    error = result.get("error") or ""
+    return error.startswith("Could not determine connection status")
+
+
+class ConnectionCache:
+    """SQLite-backed public-id → connection check result cache with per-status TTLs"""
+
+    def __init__(self, db_path: str = CONNECTION_CACHE_PATH, max_entries: int = CONNECTION_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, public_id: str) -> Optional[Dict]:
+        """Cached result fields for `public_id` plus 'checked_at', or None if unknown or expired"""
+        if not public_id:
+            return None
+        row = self._conn.execute(
+            "SELECT * FROM connection_results WHERE public_id = ? AND expires_at > ?",
+            (normalize_public_id(public_id), time.time()),
+        ).fetchone()
+        if row is None:
+            return None
+
+        result = {field: row[field] for field in RESULT_FIELDS}
+        result["is_connected"] = bool(result["is_connected"])
+        result["checked_at"] = row["checked_at"]
+        return result
+
+    def put(self, public_id: str, result: Dict, ttl_seconds: Optional[float] = None,
+            checked_at: Optional[float] = None) -> bool:
+        """
+        Store a check result; the TTL follows from its distance unless given.
+        `checked_at` backdates a result derived from an older response, so it
+        expires when a live check made then would have.
+
+        Returns:
+            False if the result wasn't worth caching (see is_cacheable) or has already expired
+        """
+        if not public_id or not is_cacheable(result):
+            return False
+        now = time.time()
+        checked_at = checked_at if checked_at is not None else now
+        expires_at = checked_at + (ttl_for_result(result) if ttl_seconds is None else ttl_seconds)
+        if expires_at <= now:
+            return False
+        values = [result.get(field) for field in RESULT_FIELDS]
+        values[0] = int(bool(values[0]))
+
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO connection_results (public_id, {', '.join(RESULT_FIELDS)}, "
+                f"checked_at, expires_at) VALUES (?, {', '.join('?' for _ in RESULT_FIELDS)}, ?, ?)",
+                (normalize_public_id(public_id), *values, checked_at, expires_at),
+            )
+            self._evict(now)
+            self._conn.commit()
+        return True
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM connection_results WHERE expires_at <= ?", (now,))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM connection_results WHERE public_id IN "
+                "(SELECT public_id FROM connection_results ORDER BY checked_at LIMIT ?)",
+                (excess,),
+            )
+
+    def invalidate(self, public_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM connection_results WHERE public_id = ?", (normalize_public_id(public_id),))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM connection_results")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        by_distance = {
+            row[0]: row[1] for row in self._conn.execute(
+                "SELECT distance, COUNT(*) FROM connection_results WHERE expires_at > ? GROUP BY distance", (now,)
+            )
+        }
+        return {
+            "entries": len(self),
+            "by_distance": by_distance,
+            "max_entries": self.max_entries,
+            "path": self.db_path,
+        }
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM connection_results").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_default_cache: Optional[ConnectionCache] = None
+
+
+def default_connection_cache() -> ConnectionCache:
+    """Process-wide cache shared by both connection checkers"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ConnectionCache()
+    return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or reset the local connection result cache")
+    parser.add_argument("--stats", action="store_true", help="Print entry counts")
+    parser.add_argument("--lookup", metavar="PUBLIC_ID", help="Show the cached result for a profile slug or URL")
+    parser.add_argument("--invalidate", metavar="PUBLIC_ID", help="Forget one profile")
+    parser.add_argument("--clear", action="store_true", help="Forget every result")
+    args = parser.parse_args()
+
+    cache = default_connection_cache()
+    if args.invalidate:
+        cache.invalidate(args.invalidate)
+        print(f"🗑️ Invalidated {normalize_public_id(args.invalidate)}")
+    if args.clear:
+        cache.clear()
+        print("🗑️ Connection cache cleared")
+    if args.lookup:
+        result = cache.get(args.lookup)
+        print(result if result else f"❌ No cached result for {normalize_public_id(args.lookup)}")
+    if args.stats or not (args.invalidate or args.clear or args.lookup):
+        for key, value in cache.stats().items():
+            print(f"📊 {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Data Export Importer
+
+Loads the account's official data export (Settings → Data privacy → Get a copy
+of your data) into the local store, so lookups that would otherwise need
+several API requests can be answered offline.
+
+- Connections.csv → first-degree connections, used by the connection checker
+- messages.csv    → conversations and message history, read by the
+                    conversation extractor, messages viewer and message search
+
+The export can be given as the downloaded .zip, the extracted folder or a
+CSV file itself. Files are read as a stream, row by row, and messages are
+written in batches, so memory stays flat on exports of hundreds of MB.
+
+Usage:
+    python data_export.py ~/Downloads/Basic_LinkedInDataExport_06-15-2025.zip
+    python data_export.py ~/Downloads/export/Connections.csv
+    python data_export.py ~/Downloads/export/messages.csv --only messages
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import os
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, Iterator, List, Optional, TextIO
+
+from identity_cache import IdentityCache, default_identity_cache, normalize_public_id
+from local_store import LocalStore, default_local_store
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+CONNECTIONS_CSV = "Connections.csv"
+
+# Export column → local_store CONNECTION_FIELDS
+CONNECTION_COLUMNS = {
+    "URL": "profile_url",
+    "First Name": "first_name",
+    "Last Name": "last_name",
+    "Email Address": "email",
+    "Company": "company",
+    "Position": "position",
+    "Connected On": "connected_on",
+}
+
+# 'Connected On' has been written both ways over the years
+CONNECTED_ON_FORMATS = ("%d %b %Y", "%m/%d/%y", "%Y-%m-%d")
+
+MESSAGES_CSV = "messages.csv"
+
+# Your mailbox; imported conversations get URNs in the same form as the API's
+MAILBOX_URN = "urn:li:fsd_profile:ACoAACP6v4EBbrCCbpgNB017RQfDpIJA4cgt_oc"
+
+# The export has no message ids, so imported messages get stable synthetic
+# URNs (re-importing the same file adds nothing)
+EXPORT_MESSAGE_PREFIX = "urn:li:msg_message:export:"
+
+# Message DATE column, always UTC
+MESSAGE_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S %Z", "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S")
+
+MESSAGE_BATCH_SIZE = 5000
+
+
+@contextmanager
+def open_export_csv(path: str, filename: str) -> Iterator[TextIO]:
+    """Text stream of `filename` from an export .zip, an extracted folder or the CSV itself"""
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            member = next((name for name in archive.namelist()
+                           if os.path.basename(name).lower() == filename.lower()), None)
+            if member is None:
+                raise FileNotFoundError(f"{filename} not found in {path}")
+            with archive.open(member) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        return
+
+    if os.path.isdir(path):
+        path = os.path.join(path, filename)
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        yield f
+
+
+def iter_export_rows(stream: TextIO, first_column: str) -> Iterator[Dict[str, str]]:
+    """
+    Rows of an export CSV as dicts.
+
+    Some export files start with a free-text "Notes:" preamble, so everything
+    before the header row (the one starting with `first_column`) is skipped.
+    """
+    reader = csv.reader(stream)
+    for row in reader:
+        if row and row[0].strip() == first_column:
+            header = [column.strip() for column in row]
+            break
+    else:
+        raise ValueError(f"No header row starting with '{first_column}' found")
+
+    for row in reader:
+        if row:
+            yield dict(zip(header, row))
+
+
+def parse_connected_on(value: str) -> str:
+    """'15 Jun 2025' → '2025-06-15'; unknown formats are kept as they are"""
+    value = (value or "").strip()
+    for fmt in CONNECTED_ON_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except ValueError:
+            continue
+    return value
+
+
+def iter_connections(stream: TextIO) -> Iterator[Dict]:
+    """Connections.csv rows in local_store's connection shape"""
+    for row in iter_export_rows(stream, "First Name"):
+        connection = {field: (row.get(column) or "").strip() for column, field in CONNECTION_COLUMNS.items()}
+        connection["connected_on"] = parse_connected_on(connection["connected_on"])
+        yield connection
+
+
+def parse_message_date(value: str) -> int:
+    """'2025-06-15 12:20:00 UTC' → epoch milliseconds (0 if unparseable)"""
+    value = (value or "").strip()
+    try:
+        # Fast path for the usual 'YYYY-MM-DD HH:MM:SS UTC'; strptime is ~10x slower
+        return int(datetime.fromisoformat(value[:19]).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    except ValueError:
+        pass
+    for fmt in MESSAGE_DATE_FORMATS:
+        try:
+            return int(datetime.strptime(value, fmt).replace(tzinfo=timezone.utc).timestamp() * 1000)
+        except ValueError:
+            continue
+    return 0
+
+
+def split_names(value: str) -> List[str]:
+    return [name.strip() for name in (value or "").split(",") if name.strip()]
+
+
+def iter_message_rows(stream: TextIO) -> Iterator[Dict]:
+    """messages.csv rows (drafts skipped) with parsed dates and split recipient lists"""
+    for row in iter_export_rows(stream, "CONVERSATION ID"):
+        if (row.get("IS MESSAGE DRAFT") or "").strip().lower() in ("yes", "true") \
+                or (row.get("FOLDER") or "").strip().upper() == "DRAFT":
+            continue
+        conversation_id = (row.get("CONVERSATION ID") or "").strip()
+        if not conversation_id:
+            continue
+        yield {
+            "conversation_id": conversation_id,
+            "sender_name": (row.get("FROM") or "").strip(),
+            "sender_url": (row.get("SENDER PROFILE URL") or "").strip(),
+            "recipient_names": split_names(row.get("TO")),
+            "recipient_urls": split_names(row.get("RECIPIENT PROFILE URLS")),
+            "delivered_at": parse_message_date(row.get("DATE")),
+            "text": row.get("CONTENT") or "",
+        }
+
+
+class MessageExportImporter:
+    """
+    Streams messages.csv into the local store.
+
+    Messages are appended batch by batch as they are read; only a small
+    per-conversation summary (participants, last activity) is kept in memory
+    and saved as conversations at the end. Your own profile is the one that
+    takes part in the most conversations, and is left out of participants.
+    """
+
+    def __init__(self, store: Optional[LocalStore] = None, identity_cache: Optional[IdentityCache] = None,
+                 mailbox_urn: str = MAILBOX_URN):
+        self.store = store or default_local_store()
+        self.identity_cache = identity_cache if identity_cache is not None else default_identity_cache()
+        self.mailbox_urn = mailbox_urn
+        self._conversations: Dict[str, Dict] = {}
+        self._profile_urns: Dict[str, str] = {}
+        self.rows = 0
+
+    def conversation_urn(self, conversation_id: str) -> str:
+        return f"urn:li:msg_conversation:({self.mailbox_urn},{conversation_id})"
+
+    def profile_urn(self, profile_url: str) -> str:
+        """fsd_profile URN for an export profile URL, without any request ('' if unknown)"""
+        if profile_url not in self._profile_urns:
+            public_id = normalize_public_id(profile_url) if profile_url else ""
+            urn = ""
+            if public_id.startswith("acoa"):
+                # URN-style URL (/in/ACoAA...); the id itself is case-sensitive
+                urn = f"urn:li:fsd_profile:{profile_url.rstrip('/').split('/')[-1]}"
+            elif public_id:
+                urn = self.identity_cache.get_profile_urn(public_id) or ""
+            self._profile_urns[profile_url] = urn
+        return self._profile_urns[profile_url]
+
+    def _remember(self, row: Dict):
+        summary = self._conversations.get(row["conversation_id"])
+        if summary is None:
+            summary = self._conversations[row["conversation_id"]] = {"last_activity": 0, "people": {}}
+        summary["last_activity"] = max(summary["last_activity"], row["delivered_at"])
+
+        people = summary["people"]
+        if row["sender_url"]:
+            # Sender names are reliable; recipient names only when counts line up
+            people[row["sender_url"]] = row["sender_name"]
+        names = row["recipient_names"] if len(row["recipient_names"]) == len(row["recipient_urls"]) else []
+        for position, url in enumerate(row["recipient_urls"]):
+            if not people.get(url):
+                people[url] = names[position] if names else ""
+
+    def _messages(self, stream: TextIO) -> Iterator[Dict]:
+        for row in iter_message_rows(stream):
+            self.rows += 1
+            self._remember(row)
+            digest = hashlib.sha1(f"{row['sender_url']}\n{row['text']}".encode("utf-8")).hexdigest()[:12]
+            first_name, _, last_name = row["sender_name"].partition(" ")
+            yield {
+                "conversation_urn": self.conversation_urn(row["conversation_id"]),
+                "message_urn": f"{EXPORT_MESSAGE_PREFIX}{row['conversation_id']}:{row['delivered_at']}:{digest}",
+                "timestamp": row["delivered_at"],
+                "text": row["text"],
+                "sender_name": row["sender_name"] or "Unknown",
+                "sender_first_name": first_name,
+                "sender_last_name": last_name,
+                "sender_urn": self.profile_urn(row["sender_url"]) if row["sender_url"] else "",
+            }
+
+    def _owner_url(self) -> str:
+        counts: Dict[str, int] = {}
+        for summary in self._conversations.values():
+            for url in summary["people"]:
+                counts[url] = counts.get(url, 0) + 1
+        for url in counts:
+            if self.profile_urn(url) == self.mailbox_urn:
+                return url
+        return max(counts, key=counts.get) if counts else ""
+
+    def _conversation_rows(self) -> List[Dict]:
+        owner_url = self._owner_url()
+        conversations = []
+        for conversation_id, summary in self._conversations.items():
+            participants = []
+            for url, name in summary["people"].items():
+                if url == owner_url:
+                    continue
+                first_name, _, last_name = name.partition(" ")
+                participants.append({
+                    "profile_urn": self.profile_urn(url),
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "full_name": name,
+                    "profile_url": url,
+                    "public_identifier": normalize_public_id(url),
+                })
+            conversations.append({
+                "conversation_urn": self.conversation_urn(conversation_id),
+                "participants": participants,
+                "last_activity": summary["last_activity"],
+                "conversation_url": f"https://www.linkedin.com/messaging/thread/{conversation_id}/",
+            })
+        return conversations
+
+    def run(self, path: str) -> Dict:
+        """Import messages.csv from `path`; returns row, new-message and conversation counts"""
+        with open_export_csv(path, MESSAGES_CSV) as stream:
+            added = self.store.append_messages(self._messages(stream), batch_size=MESSAGE_BATCH_SIZE)
+        # Conversations the API already provided keep their live details,
+        # and the sync cursor is left alone so the next sync still runs
+        conversations = self._conversation_rows()
+        self.store.save_conversations(conversations, mark_synced=False, advance_cursor=False,
+                                      replace_existing=False)
+        return {"rows": self.rows, "new_messages": added, "conversations": len(conversations)}
+
+
+def import_messages(path: str, store: Optional[LocalStore] = None, mailbox_urn: str = MAILBOX_URN) -> Dict:
+    """Import messages.csv into the local conversation/message store (see MessageExportImporter)"""
+    return MessageExportImporter(store=store, mailbox_urn=mailbox_urn).run(path)
+
+
+def import_connections(path: str, store: Optional[LocalStore] = None) -> int:
+    """
+    Replace the stored first-degree connections with those in Connections.csv.
+
+    Connections without a profile URL (hidden by their privacy settings) can't
+    be matched and are skipped.
+
+    Returns:
+        Number of connections stored
+    """
+    store = store or default_local_store()
+    with open_export_csv(path, CONNECTIONS_CSV) as stream:
+        return store.replace_connections(iter_connections(stream))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import LinkedIn's official data export into the local store")
+    parser.add_argument("path", help="Export .zip, extracted export folder, Connections.csv or messages.csv")
+    parser.add_argument("--only", choices=["connections", "messages"],
+                        help="Import just one file (default: whichever the path contains)")
+    parser.add_argument("--mailbox-urn", default=MAILBOX_URN, help="Your fsd_profile URN, used in conversation URNs")
+    args = parser.parse_args()
+
+    # A single CSV only holds one kind of data
+    basename = os.path.basename(args.path).lower()
+    kinds = [args.only] if args.only else ["connections", "messages"]
+    if basename.endswith(".csv"):
+        kinds = [kind for kind in kinds if basename == (CONNECTIONS_CSV if kind == "connections" else MESSAGES_CSV).lower()]
+        if not kinds:
+            expected = {"connections": CONNECTIONS_CSV, "messages": MESSAGES_CSV}.get(args.only) \
+                or f"{CONNECTIONS_CSV} or {MESSAGES_CSV}"
+            print(f"❌ Expected {expected}, got {os.path.basename(args.path)}")
+            return
+
+    print("=" * 80)
+    print(f"📦 Importing LinkedIn data export: {args.path}")
+    print("=" * 80)
+
+    if "connections" in kinds:
+        start = time.perf_counter()
+        try:
+            count = import_connections(args.path)
+            print(f"✅ Imported {count} connections in {time.perf_counter() - start:.2f}s")
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not import {CONNECTIONS_CSV}: {e}")
+
+    if "messages" in kinds:
+        start = time.perf_counter()
+        try:
+            stats = import_messages(args.path, mailbox_urn=args.mailbox_urn)
+            print(f"✅ Imported {stats['rows']} messages ({stats['new_messages']} new) across "
+                  f"{stats['conversations']} conversations in {time.perf_counter() - start:.2f}s")
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not import {MESSAGES_CSV}: {e}")
+
+
+if __name__ == "__main__":
+    main()
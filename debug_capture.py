@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Debug Response Capture
+
+Keeps raw API responses for later debugging without slowing the request path.
+Capture is off by default. When on, each response is kept with probability
+`sample_rate`. capture() only puts the (already parsed) response on a queue.
+A background thread compresses the records and appends them to a response
+archive (see response_archive.py) under local_data/debug_capture/. The
+archive rotates once it passes DEBUG_ARCHIVE_MAX_BYTES, keeping
+DEBUG_ARCHIVE_KEEP older files.
+
+If the writer falls behind, records are dropped rather than blocking a check.
+
+Usage:
+    capture = default_debug_capture()
+    capture.enable(sample_rate=0.25)
+    capture.capture("profileView", "john-doe", data)
+    python linkedin_connection_checker.py https://www.linkedin.com/in/johndoe/ --debug-capture=0.25
+    python debug_capture.py --stats
+    python debug_capture.py --show profileView --key john-doe
+    python debug_capture.py --export debug_responses
+"""
+
+import argparse
+import atexit
+import glob
+import json
+import os
+import queue
+import random
+import re
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from identity_cache import LOCAL_DATA_DIR
+from response_archive import ResponseArchive
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+DEBUG_CAPTURE_DIR = os.path.join(LOCAL_DATA_DIR, "debug_capture")
+DEBUG_ARCHIVE_NAME = "responses.dat"
+
+# Off unless enabled (e.g. with --debug-capture); fraction of responses kept once on
+DEBUG_CAPTURE_ENABLED = False
+DEBUG_SAMPLE_RATE = 1.0
+
+DEBUG_ARCHIVE_MAX_BYTES = 50 * 1024 * 1024
+DEBUG_ARCHIVE_KEEP = 3
+
+# Records waiting for the writer; past this, new records are dropped
+DEBUG_QUEUE_SIZE = 1000
+
+
+class DebugCapture:
+    """Sampled, queue-fed capture of raw responses into a rotating response archive"""
+
+    def __init__(self, directory: str = DEBUG_CAPTURE_DIR, enabled: bool = DEBUG_CAPTURE_ENABLED,
+                 sample_rate: float = DEBUG_SAMPLE_RATE, max_bytes: int = DEBUG_ARCHIVE_MAX_BYTES,
+                 keep: int = DEBUG_ARCHIVE_KEEP):
+        self.directory = directory
+        self.path = os.path.join(directory, DEBUG_ARCHIVE_NAME)
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.max_bytes = max_bytes
+        self.keep = keep
+        self.counters = {"captured": 0, "sampled_out": 0, "dropped": 0, "written": 0}
+
+        self._queue: "queue.Queue" = queue.Queue(maxsize=DEBUG_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def enable(self, sample_rate: Optional[float] = None) -> None:
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+        self.enabled = True
+
+    def capture(self, kind: str, key: str, data) -> bool:
+        """
+        Queue a parsed response for the archive (cheap; never blocks).
+
+        Returns:
+            True if the record was queued
+        """
+        if not self.enabled:
+            return False
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            self.counters["sampled_out"] += 1
+            return False
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait((kind, key, data, time.time()))
+        except queue.Full:
+            self.counters["dropped"] += 1
+            return False
+        self.counters["captured"] += 1
+        return True
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="debug-capture", daemon=True)
+                self._writer.start()
+                atexit.register(self.close)
+
+    def _write_loop(self) -> None:
+        archive = ResponseArchive(self.path)
+        try:
+            stop = False
+            while not stop:
+                record = self._queue.get()
+                if record is None:
+                    break
+                # Write everything already queued in one append
+                batch = [record]
+                while True:
+                    try:
+                        record = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if record is None:
+                        stop = True
+                        break
+                    batch.append(record)
+                try:
+                    archive.append_many(batch)
+                    self.counters["written"] += len(batch)
+                    if archive.size() >= self.max_bytes:
+                        archive.close()
+                        self._rotate()
+                        archive = ResponseArchive(self.path)
+                except (OSError, TypeError, ValueError) as e:
+                    print(f"⚠️ Debug capture write failed: {e}")
+        finally:
+            archive.close()
+
+    def _rotate(self) -> None:
+        """responses.dat -> responses.1.dat -> ... (oldest beyond `keep` is deleted), index files alongside"""
+        for suffix in ("", ".idx"):
+            for index in range(self.keep, 0, -1):
+                source = (self.path if index == 1 else self.rotated_path(index - 1)) + suffix
+                if os.path.exists(source):
+                    os.replace(source, self.rotated_path(index) + suffix)
+            overflow = self.rotated_path(self.keep + 1) + suffix
+            if os.path.exists(overflow):
+                os.remove(overflow)
+
+    def rotated_path(self, index: int) -> str:
+        return self.path.replace(".dat", f".{index}.dat")
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until queued records are written"""
+        deadline = time.time() + timeout
+        while self._writer is not None and not self._queue.empty() and time.time() < deadline:
+            time.sleep(0.01)
+
+    def close(self) -> None:
+        """Write what is queued and stop the writer thread"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(None)
+            writer.join(timeout=10)
+
+    def archive_files(self) -> List[str]:
+        """Archive files, oldest first"""
+        rotated = glob.glob(self.path.replace(".dat", ".*.dat"))
+        rotated.sort(key=lambda path: int(re.search(r"\.(\d+)\.dat$", path).group(1)), reverse=True)
+        return rotated + ([self.path] if os.path.exists(self.path) else [])
+
+    def iter_records(self, kind: Optional[str] = None, key: Optional[str] = None) -> Iterator[Dict]:
+        """Captured records, oldest first, optionally filtered by kind and key"""
+        for path in self.archive_files():
+            archive = ResponseArchive(path)
+            try:
+                for record in archive.iter_records(kind, key):
+                    record["kind"] = record["endpoint"]
+                    yield record
+            finally:
+                archive.close()
+
+    def stats(self) -> Dict:
+        files = self.archive_files()
+        return {
+            "enabled": self.enabled,
+            "sample_rate": self.sample_rate,
+            "files": len(files),
+            "archive_bytes": sum(os.path.getsize(path) for path in files),
+            "path": self.path,
+            **self.counters,
+        }
+
+
+_default_capture: Optional[DebugCapture] = None
+
+
+def default_debug_capture() -> DebugCapture:
+    """Process-wide capture shared by the connection checkers"""
+    global _default_capture
+    if _default_capture is None:
+        _default_capture = DebugCapture()
+    return _default_capture
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect captured debug responses")
+    parser.add_argument("--stats", action="store_true", help="Print archive size and record counts per kind")
+    parser.add_argument("--show", metavar="KIND", help="Print captured responses of this kind (e.g. profileView)")
+    parser.add_argument("--key", help="Only records for this profile slug")
+    parser.add_argument("--export", metavar="DIR", help="Write each record as a pretty-printed JSON file")
+    args = parser.parse_args()
+
+    capture = default_debug_capture()
+    if args.show:
+        for record in capture.iter_records(args.show, args.key):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["captured_at"]))
+            print(f"\n📄 {record['kind']} | {record['key']} | {when}")
+            print(json.dumps(record["data"], indent=2)[:5000])
+    if args.export:
+        os.makedirs(args.export, exist_ok=True)
+        count = 0
+        for record in capture.iter_records(key=args.key):
+            path = os.path.join(args.export, f"{record['kind']}_{record['key']}_{int(record['captured_at'])}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(record["data"], f, indent=2)
+            count += 1
+        print(f"✅ Exported {count} responses to {args.export}")
+    if args.stats or not (args.show or args.export):
+        for key, value in capture.stats().items():
+            print(f"📊 {key}: {value}")
+        by_kind: Dict[str, int] = {}
+        for record in capture.iter_records(key=args.key):
+            by_kind[record["kind"]] = by_kind.get(record["kind"], 0) + 1
+        for kind, count in sorted(by_kind.items()):
+            print(f"   {kind}: {count}")
+
+
+if __name__ == "__main__":
+    main()
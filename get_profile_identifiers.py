@@ -1,9 +1,12 @@
 import requests
-import re
 import json
 import uuid
 import sys
 from typing import Optional, Dict
+from identity_cache import IDENTITY_FIELDS, default_identity_cache
+from linkedin_client import CSRF_TOKEN, VOYAGER_API, default_session
+from profiling import pop_profile_flag, run_profiled
+from urn_extraction import first_profile_urn_id
 
 """
 get_profile_identifiers.py
@@ -19,22 +22,16 @@ this script prints five key identifiers you can feed into
 5. public_identifier  – the URL slug (jane-doe)
 
 It relies on your valid LinkedIn cookies (li_at, JSESSIONID, etc.) exactly like
-other scripts in this repo.  Update the COOKIES dict below with your own
-values before running.
+other scripts in this repo: they are loaded from config.py by linkedin_client.py,
+and requests go through the shared keep-alive session.
 """
 
 # ----------------------------
-# ✨  CONFIG – fill in your own
+# ✨  CONFIG
 # ----------------------------
-COOKIES = {
-    "li_at": "AQEDASP6v4EBfhJ7AAABl8BT3OQAAAGX5GBg5E0AocvtLBfU2unQg6KLYHNi6AG83PSJwqQdkZ2kcjhYnS0jlwh0Xy834jLziuj_Kdg3yOwz-L-QrbzlBOjMqHho03KrmOqhKNRdfYXUPajAOyj_oUg_",
-    "JSESSIONID": "ajax:4763283604314235653",
-    # --- keep the rest identical to your browser session or reuse the big set ---
-}
-
 HEADERS_BASE = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-    "csrf-token": COOKIES.get("JSESSIONID", ""),
+    "csrf-token": CSRF_TOKEN,
     "accept": "application/vnd.linkedin.normalized+json+2.1",
     "accept-language": "en-US,en;q=0.9",
     "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Brave";v="138"',
@@ -43,9 +40,8 @@ HEADERS_BASE = {
     "x-restli-protocol-version": "2.0.0",
 }
 
-SESSION = requests.Session()
-SESSION.cookies.update(COOKIES)
-SESSION.headers.update(HEADERS_BASE)
+# Shared with the other scripts; HEADERS_BASE is passed per request
+SESSION = default_session()
 
 # Default timeout (seconds) for LinkedIn requests
 TIMEOUT = 30
@@ -72,8 +68,8 @@ def extract_public_identifier(url: str) -> str:
 
 
 def fetch_identity(public_id: str) -> Optional[Dict]:
-    url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}"
-    headers = SESSION.headers.copy()
+    url = f"{VOYAGER_API}/identity/profiles/{public_id}"
+    headers = HEADERS_BASE.copy()
     headers.update({
         "referer": f"https://www.linkedin.com/in/{public_id}/",
         "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{uuid.uuid4()}",
@@ -137,6 +133,14 @@ def get_identifiers(profile_url: str) -> Dict:
     Keys: member_id, profile_id, first_name, last_name, public_identifier
     """
     public_id = extract_public_identifier(profile_url)
+
+    # Answer from the local identity cache when all five are already known
+    cache = default_identity_cache()
+    cached = cache.get(public_id)
+    if cached and all(cached.get(k) for k in IDENTITY_FIELDS):
+        cached["public_identifier"] = public_id
+        return cached
+
     data = fetch_identity(public_id)
     if not data:
         return {}
@@ -145,8 +149,8 @@ def get_identifiers(profile_url: str) -> Dict:
 
     # Fallback for profile_id as done in main()
     if not info.get("profile_id"):
-        pv_url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/profileView"
-        headers = SESSION.headers.copy()
+        pv_url = f"{VOYAGER_API}/identity/profiles/{public_id}/profileView"
+        headers = HEADERS_BASE.copy()
         headers.update({
             "referer": f"https://www.linkedin.com/in/{public_id}/",
             "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{uuid.uuid4()}",
@@ -158,42 +162,18 @@ def get_identifiers(profile_url: str) -> Dict:
                 pv_json = pv_resp.json()
             except json.JSONDecodeError:
                 pv_json = {}
-            combined_text = json.dumps(pv_json)
-            m = re.search(r"urn:li:fsd_profile:([A-Za-z0-9_-]{20,})", combined_text)
-            if m:
-                info["profile_id"] = m.group(1)
+            profile_id = first_profile_urn_id(pv_json)
+            if profile_id:
+                info["profile_id"] = profile_id
 
+    cache.put(public_id, **{k: info.get(k) for k in IDENTITY_FIELDS})
     return info
 
 
 def main(url: str):
-    public_id = extract_public_identifier(url)
-    data = fetch_identity(public_id)
-    if not data:
+    info = get_identifiers(url)
+    if not info:
         sys.exit(1)
-    info = sniff_member_and_name(data)
-    info["public_identifier"] = public_id
-
-    # Fallback: if profile_id missing, hit the /profileView endpoint and search for fsd_profile URN
-    if not info.get("profile_id"):
-        pv_url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/profileView"
-        headers = SESSION.headers.copy()
-        headers.update({
-            "referer": f"https://www.linkedin.com/in/{public_id}/",
-            "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{uuid.uuid4()}",
-            "accept": "application/vnd.linkedin.normalized+json+2.1",
-        })
-        pv_resp = safe_get(pv_url, headers=headers)
-        if pv_resp.status_code == 200:
-            try:
-                pv_json = pv_resp.json()
-            except json.JSONDecodeError:
-                pv_json = {}
-            combined_text = json.dumps(pv_json)
-            m = re.search(r"urn:li:fsd_profile:([A-Za-z0-9_-]{20,})", combined_text)
-            if m:
-                info["profile_id"] = m.group(1)
-        # else ignore
 
     missing = [k for k, v in info.items() if not v]
     if missing:
@@ -202,7 +182,9 @@ def main(url: str):
 
 
 if __name__ == "__main__":
+    # --profile[=sample] writes pstats and collapsed stacks (see profiling.py)
+    profile_mode = pop_profile_flag()
     if len(sys.argv) < 2:
-        print("Usage: python get_profile_identifiers.py <profile_url>")
+        print("Usage: python get_profile_identifiers.py <profile_url> [--profile[=sample]]")
         sys.exit(1)
-    main(sys.argv[1]) 
\ No newline at end of file
+    run_profiled(profile_mode, "get_profile_identifiers", main, sys.argv[1]) 
\ No newline at end of file
@@ -13,61 +13,20 @@ import html
 from typing import Dict, Optional
 import sys
 import uuid
+from identity_cache import IdentityCache, default_identity_cache
+from linkedin_client import VOYAGER_API, api_headers, default_session, site_url
+from profiling import pop_profile_flag, run_profiled
+from response_index import ResponseIndex
+from urn_extraction import (
+    MEMBER_ID_GROUPS, PageUrnScan, dedupe_keep_longest, profile_urn_candidates, scan_page_urns,
+)
 
 class LinkedInProfileURNExtractor:
-    def __init__(self):
-        self.session = requests.Session()
-        self.setup_session()
+    def __init__(self, identity_cache: Optional[IdentityCache] = None, session: Optional[requests.Session] = None):
+        self.session = session if session is not None else default_session()
+        self.headers = api_headers()
+        self.identity_cache = identity_cache if identity_cache is not None else default_identity_cache()
         
-    def setup_session(self):
-        """Setup session with cookies and headers from script"""
-        
-        # Updated cookies from PowerShell script
-        cookies = {
-            "bcookie": "v=2&12e9e7e4-3797-4b9d-8b85-e67c6fbbcf80",
-            "li_sugr": "9c83b1f7-b3ab-47d6-8f9c-aac27e761ba1",
-            "bscookie": "v=1&20250507140639ea67aaf7-6f73-48ff-8813-9f6383cea24eAQEBEVVX01KNZ7vWOUKdmFDVKvhshdNt",
-            "JSESSIONID": "ajax:4763283604314235653",
-            "_guid": "c4c27323-6441-4b94-8a60-e2dae58ecd41",
-            "dfpfpt": "3c04e81e591e469e8cf3481efad5f950",
-            "timezone": "Asia/Dubai",
-            "li_theme": "light",
-            "li_theme_set": "app",
-            "lang": "v=2&lang=en-us",
-            "sdui_ver": "sdui-flagship:0.1.7528+sdui-flagship.production",
-            "AnalyticsSyncHistory": "AQK_eRy5LiZXJwAAAZe_qwIzZO_LbAvR1FcGJx_R_9rnkDNCrWvjKOrN4xZRuE9zGUzaO0h_W6fvC-YYrXQ8_g",
-            "lms_ads": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "lms_analytics": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "fptctx2": "taBcrIH61PuCVH7eNCyH0I1otfYAPn9VOPY9aMX8tO1OZsqBMQoiv4L3v0T63VjmZLQa16kvaMUYVUosFXHHtS3l3aC7%252bp1EFIAkHKyNtQRBhoos8j9BfdkViImt83dvAFqcppQGcz5heoO6EHiT%252f2WMpn0HnQ95d0aiXGAk8qxAFHAMLZtFLr%252blIlevK84W1%252b%252bkBdGvNOFAGbYVWU9%252bRQrmV1NCHYTbXWOVIMufooVyvn%252b2lWgJdSY0VV9at63Pp9oekq7qQy4YLLD0O7%252blXCahZrDDNixWQiWnqhEunmFk2yWWGzorslBwL41%252fpFSaILdUYnycPsPgWuVPqOAFnuNVzPw7iXHOHljjkisgY7M%253d",
-            "AMCVS_14215E3D5995C57C0A495C55%40AdobeOrg": "1",
-            "AMCV_14215E3D5995C57C0A495C55%40AdobeOrg": "-637568504%7CMCIDTS%7C20270%7CMCMID%7C27573806750435840703114589459359274076%7CMCOPTOUT-1751285608s%7CNONE%7CvVersion%7C5.1.1",
-            "g_state": '{"i_l":0}',
-            "liap": "true",
-            "li_at": "AQEDASP6v4EBfhJ7AAABl8BT3OQAAAGX5GBg5E0AocvtLBfU2unQg6KLYHNi6AG83PSJwqQdkZ2kcjhYnS0jlwh0Xy834jLziuj_Kdg3yOwz-L-QrbzlBOjMqHho03KrmOqhKNRdfYXUPajAOyj_oUg_",
-            "UserMatchHistory": "AQIopFDFe5LoIwAAAZfBXhApKuszIAJZaXyTcOyZXQdY12yUWz18W0E-pj5F2LJfj9w-GwjhOtHH89ymxGphxiJGi_Kc_ArWucsmtND9hvPSfUwEXF_izt_JYMuTE2QZYx2T2f_bIG_VjX7lJV2EGyixr7vCY7JkHfMylkO5PAyuxL2Chep7GhpJP5ocXNXnls0exgVhn8g2uzxs9eHGc2yLIxaTiqh_q_DfFIyekEjPzGrE7Htey--cyh2Xkzq01RRJWqohQrGMrpHO_PbVN5ItuyU6xEIS3n15tAL5ZoJRnAmJ5T0hYw_redRrD34bYewRR6RrsJTZv_UAqNnnD2VELr97P8tZDMOd5wQM7Fbz8ClCLQ",
-            "lidc": 'b=VB85:s=V:r=V:a=V:p=V:g=5950:u=788:x=1:i=1751295857:t=1751377341:v=2:sig=AQF0M2-1z0rTjk9jqZtQFPrF42H7id2O',
-        }
-        
-        # Set cookies in session
-        self.session.cookies.update(cookies)
-        
-        # Set User-Agent and other headers
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "csrf-token": "ajax:4763283604314235653",
-            "accept": "application/json",
-            "accept-language": "en-US,en;q=0.9",
-            "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Brave";v="138"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "same-origin",
-            "sec-gpc": "1",
-            "x-li-lang": "en_US",
-            "x-restli-protocol-version": "2.0.0"
-        })
-
     def clean_urn(self, urn: str) -> str:
         """Clean URN by removing HTML entities and unwanted characters"""
         if not urn:
@@ -111,61 +70,44 @@ class LinkedInProfileURNExtractor:
                 else:
                     profile_url = f"https://www.linkedin.com/in/{profile_url}/"
             
-            # First, let's try the voyager API for more reliable extraction
             public_id = self.get_public_identifier_from_url(profile_url)
+            
+            # Profiles resolved before are answered from the local identity cache
+            if public_id:
+                cached_urn = self.identity_cache.get_profile_urn(public_id)
+                if cached_urn:
+                    print(f"✅ Found cached URN: {cached_urn}")
+                    return cached_urn
+            
+            # First, let's try the voyager API for more reliable extraction
             if public_id:
                 urn = self.get_profile_urn_from_public_id(public_id)
                 if urn:
+                    self.identity_cache.put_profile_urn(public_id, urn)
                     return urn
             
             # Fallback method: Try to extract URN from page source
-            profile_headers = self.session.headers.copy()
+            profile_headers = self.headers.copy()
             profile_headers.update({
                 'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
                 'referer': 'https://www.linkedin.com/',
                 'x-li-page-instance': f"urn:li:page:d_flagship3_profile_view_base;{uuid.uuid4()}",
             })
             
-            response = self.session.get(profile_url, headers=profile_headers)
+            response = self.session.get(site_url(profile_url), headers=profile_headers)
             
             if response.status_code == 200:
-                # Look for profile URN in the page source with multiple patterns
-                urn_patterns = [
-                    # Specifically target patterns that look for OTHER profiles, not your own
-                    r'urn:li:fsd_profile:([A-Za-z0-9_-]{20,50})',  # Extended pattern for full URN
-                    r'"profileUrn":"urn:li:fsd_profile:([^"]+)"',
-                    r'&quot;profileUrn&quot;:&quot;urn:li:fsd_profile:([^&]+)&quot;',
-                    r'"urn:li:fsd_profile:([^"]+)"',
-                    r'"miniProfile":"urn:li:fs_miniProfile:([^"]+)"',
-                    r'urn:li:fsd_profile:([A-Za-z0-9_-]+)',  # Catch-all pattern
-                ]
-                
-                all_urns = []
+                # Scan the page once for every URN shape the fallback understands
+                scan = scan_page_urns(response.text)
                 your_urn_id = "ACoAACP6v4EBbrCCbpgNB017RQfDpIJA4cgt_oc"  # Your own URN ID to filter out
                 
-                for pattern in urn_patterns:
-                    matches = re.findall(pattern, response.text)
-                    for match in matches:
-                        # Clean up the match and ensure it's a valid URN
-                        if match and match != your_urn_id and "ACoAA" in match and len(match) > 20:
-                            all_urns.append(match)
+                all_urns = [
+                    urn_id for urn_id in scan.profile_ids(include_mini_profiles=True)
+                    if "ACoAA" in urn_id and len(urn_id) > 20 and your_urn_id not in urn_id
+                ]
                 
-                # Filter out duplicates and your own URN, keep longest versions
-                unique_urns = []
-                for urn in set(all_urns):
-                    if your_urn_id not in urn:
-                        # If we have multiple versions, keep the longest one
-                        is_subset = False
-                        for existing in unique_urns:
-                            if urn in existing:  # This URN is a subset of an existing one
-                                is_subset = True
-                                break
-                            elif existing in urn:  # Existing URN is subset of this one
-                                unique_urns.remove(existing)
-                                break
-                        
-                        if not is_subset:
-                            unique_urns.append(urn)
+                # Filter out duplicates, keep longest versions, in page order
+                unique_urns = dedupe_keep_longest(all_urns)
                 
                 if unique_urns:
                     # Use the first URN that's not yours
@@ -173,14 +115,17 @@ class LinkedInProfileURNExtractor:
                     full_urn = f"urn:li:fsd_profile:{urn_id}"
                     cleaned_urn = self.clean_urn(full_urn)
                     print(f"✅ Found URN: {cleaned_urn}")
+                    if public_id:
+                        self.identity_cache.put_profile_urn(public_id, cleaned_urn)
                     return cleaned_urn
                 
                 print(f"⚠️ Found {len(all_urns)} URNs but couldn't find one matching the profile")
                 
                 # Try direct API method as a last resort
                 print("🔄 Trying direct API lookup...")
-                member_urn = self.get_member_urn_from_page(response.text, profile_url)
+                member_urn = self.get_member_urn_from_page(response.text, profile_url, scan)
                 if member_urn:
+                    # Not cached: these heuristics (photo ids etc.) are too weak to remember
                     return member_urn
             else:
                 print(f"❌ Failed to access profile. Status code: {response.status_code}")
@@ -191,54 +136,42 @@ class LinkedInProfileURNExtractor:
             print(f"❌ Error extracting profile URN: {e}")
             return None
     
-    def get_member_urn_from_page(self, page_content: str, profile_url: str) -> Optional[str]:
+    def get_member_urn_from_page(self, page_content: str, profile_url: str,
+                                 scan: Optional[PageUrnScan] = None) -> Optional[str]:
         """Extract member URN from page content using various methods"""
         try:
+            if scan is None:
+                scan = scan_page_urns(page_content)
+            
             # Look for entityUrn in various formats
-            entity_patterns = [
-                r'"memberEntityUrn":"([^"]+)"',
-                r'"entityUrn":"([^"]+)"',
-                r'entityUrn=([^&]+)',
-                r'"urn:li:member:([^"]+)"'
-            ]
+            entity_matches = (
+                scan.urns_in_field('fsd_profile', field='memberEntityUrn')
+                + scan.urns_in_field('fsd_profile', field='entityUrn')
+                + scan.urns_in_field('fsd_profile', param='entityUrn')
+            )
+            if entity_matches:
+                return self.clean_urn(entity_matches[0].urn)
             
-            for pattern in entity_patterns:
-                matches = re.findall(pattern, page_content)
-                if matches:
-                    for entity_urn in matches:
-                        if ":" in entity_urn and "fsd_profile:" in entity_urn:
-                            return self.clean_urn(entity_urn)
-                        elif entity_urn.isdigit() or entity_urn.startswith("ACoAA"):
-                            return f"urn:li:fsd_profile:{entity_urn}"
+            for match in scan.urns_in_field('member'):
+                if match.quoted and match.urn_id.isdigit():
+                    return f"urn:li:fsd_profile:{match.urn_id}"
             
             # Try to find member ID in meta tags or specific divs
-            member_id_patterns = [
-                r'data-member-id="(\d+)"',
-                r'data-profileid="(\d+)"',
-                r'member-id=(\d+)',
-                r'memberId=(\d+)',
-                r'fs_miniProfile:(\w+)'
-            ]
+            for group in MEMBER_ID_GROUPS:
+                member_ids = scan.member_ids[group]
+                if member_ids:
+                    return f"urn:li:fsd_profile:{member_ids[0]}"
             
-            for pattern in member_id_patterns:
-                matches = re.findall(pattern, page_content)
-                if matches:
-                    member_id = matches[0]
-                    if member_id.isdigit() or member_id.startswith("ACoAA"):
-                        return f"urn:li:fsd_profile:{member_id}"
+            mini_profiles = scan.urns_in_field('fs_miniProfile')
+            if mini_profiles:
+                member_id = mini_profiles[0].urn_id
+                if member_id.isdigit() or member_id.startswith("ACoAA"):
+                    return f"urn:li:fsd_profile:{member_id}"
             
             # Try extracting from image URLs which often contain profile IDs
-            img_patterns = [
-                r'profile-displayphoto-shrink_\d+_\d+/\d+/\d+/\d+/([^/]+)/',
-                r'media-exp\d+-\d+\.licdn\.com/dms/image/[^/]+/profile-displayphoto-shrink_\d+_\d+/\d+/\d+/\d+/([^/\?]+)'
-            ]
-            
-            for pattern in img_patterns:
-                matches = re.findall(pattern, page_content)
-                if matches:
-                    for img_id in matches:
-                        if img_id != "person-placeholder" and len(img_id) > 20:  # LinkedIn URNs are typically longer
-                            return f"urn:li:fsd_profile:{img_id}"
+            for img_id in scan.photo_ids:
+                if img_id != "person-placeholder" and len(img_id) > 20:  # LinkedIn URNs are typically longer
+                    return f"urn:li:fsd_profile:{img_id}"
             
             return None
             
@@ -252,9 +185,9 @@ class LinkedInProfileURNExtractor:
             print(f"🔍 Looking up URN for public ID: {public_id}")
             
             # Use the voyager identity API
-            url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}"
+            url = f"{VOYAGER_API}/identity/profiles/{public_id}"
             
-            headers = self.session.headers.copy()
+            headers = self.headers.copy()
             headers.update({
                 "accept": "application/vnd.linkedin.normalized+json+2.1",
                 "referer": f"https://www.linkedin.com/in/{public_id}/",
@@ -270,62 +203,49 @@ class LinkedInProfileURNExtractor:
                     
                     # Extract profile URN from the response
                     entity_urn = None
+                    index = ResponseIndex(data)
                     
                     # Look in included elements for profile URNs
-                    if 'included' in data:
-                        candidate_urns = []
-                        for element in data['included']:
-                            if 'entityUrn' in element:
-                                urn = element['entityUrn']
-                                if 'fsd_profile' in urn:
-                                    urn_id = urn.split(':')[-1]
-                                    if urn_id.startswith("ACoAA") and "CP6v4" not in urn_id and len(urn_id) > 20:  # Skip your own URN
-                                        candidate_urns.append(urn)
-                        
-                        # Get the longest (most complete) URN
-                        if candidate_urns:
-                            entity_urn = sorted(candidate_urns, key=len, reverse=True)[0]
+                    candidate_urns = []
+                    for element in index.in_namespace('fsd_profile'):
+                        urn = element['entityUrn']
+                        urn_id = urn.split(':')[-1]
+                        if urn_id.startswith("ACoAA") and "CP6v4" not in urn_id and len(urn_id) > 20:  # Skip your own URN
+                            candidate_urns.append(urn)
+                    
+                    # Get the longest (most complete) URN
+                    if candidate_urns:
+                        entity_urn = max(candidate_urns, key=len)
                     
                     # Check main object if not found in included
                     if not entity_urn and 'entityUrn' in data:
                         entity_urn = data['entityUrn']
                     
                     # Check for miniProfile with publicIdentifier match
-                    if not entity_urn and 'included' in data:
+                    if not entity_urn:
                         your_urn_id = "ACoAACP6v4EBbrCCbpgNB017RQfDpIJA4cgt_oc"  # Your URN to exclude
-                        for element in data['included']:
-                            if 'publicIdentifier' in element and element.get('publicIdentifier') == public_id:
-                                if 'entityUrn' in element:
-                                    urn = element['entityUrn']
-                                    urn_id = urn.split(':')[-1] if ':' in urn else urn
-                                    if urn_id != your_urn_id and len(urn_id) > 20:
-                                        entity_urn = urn
-                                        break
+                        for element in index.by_public_id(public_id):
+                            if 'entityUrn' in element:
+                                urn = element['entityUrn']
+                                urn_id = urn.split(':')[-1] if ':' in urn else urn
+                                if urn_id != your_urn_id and len(urn_id) > 20:
+                                    entity_urn = urn
+                                    break
                     
                     if entity_urn and 'fsd_profile' in entity_urn:
                         cleaned_urn = self.clean_urn(entity_urn)
                         print(f"✅ Found URN via API: {cleaned_urn}")
                         return cleaned_urn
                     
-                    # Backup method: Search through entire response for URNs
-                    response_text = json.dumps(data)
-                    urn_patterns = [
-                        r'urn:li:fsd_profile:([A-Za-z0-9_-]{20,50})',  # Extended pattern for full URN
-                        r'urn:li:fsd_profile:([A-Za-z0-9_-]+)',  # Catch-all pattern
-                        r'"miniProfile":"urn:li:fs_miniProfile:([^"]+)"'
-                    ]
-                    
-                    all_urns = []
-                    for pattern in urn_patterns:
-                        matches = re.findall(pattern, response_text)
-                        all_urns.extend(matches)
+                    # Backup method: Walk the whole response for URN-bearing fields
+                    all_urns = profile_urn_candidates(data)
                     
                     # Filter out your own URN and keep longest versions
                     your_urn_id = "ACoAACP6v4EBbrCCbpgNB017RQfDpIJA4cgt_oc"  # Your URN to exclude
                     
                     # Filter and prioritize longer URNs
                     valid_urns = []
-                    for urn in set(all_urns):
+                    for urn in all_urns:
                         if your_urn_id not in urn and urn.startswith("ACoAA") and len(urn) > 20:
                             valid_urns.append(urn)
                     
@@ -458,4 +378,5 @@ def main():
         print("3. Try with a different profile")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # --profile[=sample] writes pstats and collapsed stacks (see profiling.py)
+    run_profiled(pop_profile_flag(), "get_profile_urns", main)
\ No newline at end of file
@@ -2,9 +2,13 @@
 """
 Simple LinkedIn URN Getter
 Get mailbox_urn and conversation_urn by person name
+
+Lookups are served from the cached conversation list; pass --refresh (or pick
+"Refresh conversations" in the menu) to fetch conversations updated since the
+last sync, or --full-sync to walk the whole inbox again.
 """
 
-from linkedin_conversation_extractor import LinkedInConversationExtractor
+from linkedin_conversation_extractor import default_conversation_extractor
 
 def get_linkedin_urns_by_name(name: str):
     """
@@ -23,9 +27,8 @@ def get_linkedin_urns_by_name(name: str):
     print("-" * 50)
     
     try:
-        # Create extractor and get URNs
-        extractor = LinkedInConversationExtractor()
-        result = extractor.get_urns_by_name(name)
+        # Get URNs from the shared extractor
+        result = default_conversation_extractor().get_urns_by_name(name)
         
         if result:
             print("✅ FOUND!")
@@ -62,16 +65,15 @@ def get_all_conversation_mapping():
     print("=" * 70)
     
     try:
-        extractor = LinkedInConversationExtractor()
+        extractor = default_conversation_extractor()
         
         # Get all conversations
-        api_response = extractor.get_conversations()
-        if not api_response:
+        conversations = extractor.load_conversations()
+        if conversations is None:
             print("❌ Failed to get conversations")
             return {}
         
-        conversations = extractor.extract_conversation_data(api_response)
-        name_mapping = extractor.create_name_mapping(conversations)
+        name_mapping = extractor.get_name_mapping()
         
         print(f"📊 Found {len(conversations)} conversations")
         print(f"🔑 Created {len(name_mapping)} name mappings")
@@ -96,11 +98,22 @@ def get_all_conversation_mapping():
 
 if __name__ == "__main__":
     import sys
+    from profiling import pop_profile_flag, run_profiled
+    
+    # --profile[=sample] writes pstats and collapsed stacks (see profiling.py)
+    profile_mode = pop_profile_flag()
+    args = sys.argv[1:]
+    if "--full-sync" in args:
+        args.remove("--full-sync")
+        default_conversation_extractor().invalidate_conversation_cache(full=True)
+    if "--refresh" in args:
+        args.remove("--refresh")
+        default_conversation_extractor().invalidate_conversation_cache()
     
-    if len(sys.argv) > 1:
-        # Command line usage: python get_urns.py "oussama"
-        name = " ".join(sys.argv[1:])
-        get_linkedin_urns_by_name(name)
+    if args:
+        # Command line usage: python get_urns.py "oussama" [--profile[=sample]]
+        name = " ".join(args)
+        run_profiled(profile_mode, "get_urns", get_linkedin_urns_by_name, name)
     else:
         # Interactive usage
         print("🚀 LinkedIn URN Getter")
@@ -110,28 +123,33 @@ if __name__ == "__main__":
             print("\nOptions:")
             print("1. Get URNs for specific person")
             print("2. Show all conversation mappings") 
-            print("3. Exit")
+            print("3. Refresh conversations")
+            print("4. Exit")
             
-            choice = input("\nChoose an option (1-3): ").strip()
+            choice = input("\nChoose an option (1-4): ").strip()
             
             if choice == "1":
                 name = input("Enter person's name: ").strip()
                 if name:
                     print()
-                    get_linkedin_urns_by_name(name)
+                    run_profiled(profile_mode, "get_urns", get_linkedin_urns_by_name, name)
                 else:
                     print("❌ Please enter a name")
                     
             elif choice == "2":
                 print()
-                get_all_conversation_mapping()
+                run_profiled(profile_mode, "get_urns", get_all_conversation_mapping)
                 
             elif choice == "3":
+                default_conversation_extractor().invalidate_conversation_cache()
+                print("🔄 Conversation cache cleared; the next lookup refetches it")
+                
+            elif choice == "4":
                 print("👋 Goodbye!")
                 break
                 
             else:
-                print("❌ Invalid option. Please choose 1-3.")
+                print("❌ Invalid option. Please choose 1-4.")
                 
             input("\nPress Enter to continue...")
 
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+LinkedIn HTTP Response Cache
+
+A requests transport adapter that keeps GET responses from mostly-static
+endpoints (profile identity, contact info, public profile pages) on disk, with
+zlib-compressed bodies in a SQLite database under local_data/.
+
+Each endpoint family has its own max-age (ENDPOINT_MAX_AGE). A fresh entry is
+answered from disk with no request. A stale entry that came with an ETag or
+Last-Modified is revalidated with If-None-Match / If-Modified-Since: a 304
+costs only headers, and the stored body is returned and kept for another
+max-age. Endpoints that carry connection state (networkinfo, relationships,
+messaging) aren't listed and always go to the network.
+
+A request sent with "Cache-Control: no-cache" is always revalidated, and one
+sent with "no-store" bypasses the cache. A response marked "no-store" is never
+kept (and replaces nothing). "private" responses are kept: entries are per
+account already.
+
+linkedin_client.default_session() mounts the adapter for www.linkedin.com, so
+every class sharing that session benefits.
+
+Usage:
+    session.mount("https://www.linkedin.com/", CachingAdapter(default_http_cache()))
+    response.headers["X-Cache"]                 # HIT, REVALIDATED, MISS
+    python http_cache.py --stats
+    python http_cache.py --invalidate /identity/profiles/john-doe
+    python http_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib.parse import urlsplit
+
+from identity_cache import LOCAL_DATA_DIR
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+HTTP_CACHE_PATH = os.path.join(LOCAL_DATA_DIR, "http_cache.db")
+
+# (URL path pattern, max-age in seconds) - first match wins; unlisted paths are never cached.
+# profileView also carries the connection distance, so it is only trusted briefly.
+ENDPOINT_MAX_AGE = [
+    (r"^/voyager/api/identity/profiles/[^/]+/profileView$", 3600),
+    (r"^/voyager/api/identity/profiles/[^/]+/profileContactInfo$", 7 * 24 * 3600),
+    (r"^/voyager/api/identity/profiles/[^/]+$", 7 * 24 * 3600),
+    (r"^/voyager/api/identity/dash/profiles$", 7 * 24 * 3600),
+    (r"^/in/[^/]+/?$", 24 * 3600),
+]
+
+# Stale entries are kept this long past their max-age so they can still be revalidated
+STALE_RETENTION_SECONDS = 30 * 24 * 3600
+
+HTTP_CACHE_MAX_ENTRIES = 5000
+ZLIB_LEVEL = 6
+
+# Response headers that describe the wire format rather than the (decoded) stored body
+DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_responses (
+    cache_key      TEXT PRIMARY KEY,
+    url            TEXT NOT NULL,
+    status_code    INTEGER NOT NULL,
+    headers        TEXT NOT NULL,
+    body           BLOB NOT NULL,
+    body_size      INTEGER NOT NULL,
+    etag           TEXT,
+    last_modified  TEXT,
+    stored_at      REAL NOT NULL,
+    expires_at     REAL NOT NULL,
+    last_used      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_http_responses_last_used ON http_responses (last_used);
+CREATE INDEX IF NOT EXISTS idx_http_responses_expires_at ON http_responses (expires_at);
+"""
+
+_COMPILED_MAX_AGE = [(re.compile(pattern), max_age) for pattern, max_age in ENDPOINT_MAX_AGE]
+_LI_AT_PATTERN = re.compile(r"(?:^|;\s*)li_at=([^;]+)")
+
+
+def max_age_for_url(url: str) -> Optional[int]:
+    """Configured max-age for `url`, or None if its endpoint isn't cached"""
+    path = urlsplit(url).path
+    for pattern, max_age in _COMPILED_MAX_AGE:
+        if pattern.match(path):
+            return max_age
+    return None
+
+
+def cache_key(request) -> str:
+    """
+    Entries are per URL, Accept header and account (li_at cookie), so a
+    normalized+json response isn't served to a caller asking for plain json and
+    one account's view of a profile isn't served to another.
+    """
+    account = _LI_AT_PATTERN.search(request.headers.get("Cookie", ""))
+    parts = (request.url, request.headers.get("Accept", ""), account.group(1) if account else "")
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class HTTPCache:
+    """SQLite-backed store of compressed GET responses with validators"""
+
+    def __init__(self, db_path: str = HTTP_CACHE_PATH, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "revalidated": 0, "misses": 0, "bytes_saved": 0}
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Stored entry (body decompressed), fresh or stale, or None"""
+        row = self._conn.execute("SELECT * FROM http_responses WHERE cache_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        entry = dict(row)
+        entry["body"] = zlib.decompress(entry["body"])
+        entry["headers"] = json.loads(entry["headers"])
+        return entry
+
+    def put(self, key: str, url: str, status_code: int, headers: Dict[str, str], body: bytes,
+            max_age: float) -> None:
+        now = time.time()
+        stored_headers = {k: v for k, v in headers.items() if k.lower() not in DROPPED_HEADERS}
+        lowered = {k.lower(): v for k, v in headers.items()}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_responses (cache_key, url, status_code, headers, body, body_size, "
+                "etag, last_modified, stored_at, expires_at, last_used) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status_code, json.dumps(stored_headers), zlib.compress(body, ZLIB_LEVEL), len(body),
+                 lowered.get("etag"), lowered.get("last-modified"), now, now + max_age, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def refresh(self, key: str, max_age: float, headers: Dict[str, str]) -> None:
+        """Extend a revalidated entry (304) and pick up new validators"""
+        now = time.time()
+        lowered = {k.lower(): v for k, v in headers.items()}
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_responses SET stored_at = ?, expires_at = ?, last_used = ?, "
+                "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE cache_key = ?",
+                (now, now + max_age, now, lowered.get("etag"), lowered.get("last-modified"), key),
+            )
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM http_responses WHERE cache_key = ?", (key,))
+            self._conn.commit()
+
+    def touch(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("UPDATE http_responses SET last_used = ? WHERE cache_key = ?", (time.time(), key))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM http_responses WHERE expires_at <= ?", (now - STALE_RETENTION_SECONDS,))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM http_responses WHERE cache_key IN "
+                "(SELECT cache_key FROM http_responses ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def invalidate(self, url_fragment: str) -> int:
+        """Forget every entry whose URL contains `url_fragment`; returns how many"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM http_responses WHERE instr(url, ?) > 0", (url_fragment,))
+            self._conn.commit()
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM http_responses")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT COUNT(*), SUM(expires_at > ?), COALESCE(SUM(body_size), 0), COALESCE(SUM(length(body)), 0) "
+            "FROM http_responses", (now,)
+        ).fetchone()
+        return {
+            "entries": row[0],
+            "fresh": row[1] or 0,
+            "body_bytes": row[2],
+            "stored_bytes": row[3],
+            "max_entries": self.max_entries,
+            "path": self.db_path,
+            **self.counters,
+        }
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM http_responses").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def _cache_directives(message) -> Tuple[bool, bool]:
+    """(no_cache, no_store) from a request's or response's Cache-Control header"""
+    value = message.headers.get("Cache-Control", "").lower()
+    return "no-cache" in value, "no-store" in value
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that serves and revalidates GETs for the endpoints in ENDPOINT_MAX_AGE"""
+
+    def __init__(self, cache: Optional[HTTPCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache if cache is not None else default_http_cache()
+
+    def send(self, request, **kwargs):
+        max_age = max_age_for_url(request.url) if request.method == "GET" else None
+        if max_age is None:
+            return super().send(request, **kwargs)
+        no_cache, no_store = _cache_directives(request)
+        if no_store:
+            return super().send(request, **kwargs)
+
+        key = cache_key(request)
+        entry = self.cache.get(key)
+        if entry and not no_cache and entry["expires_at"] > time.time():
+            self.cache.touch(key)
+            self.cache.counters["hits"] += 1
+            self.cache.counters["bytes_saved"] += entry["body_size"]
+            return self.build_cached_response(request, entry, "HIT")
+
+        if entry:
+            if entry["etag"]:
+                request.headers["If-None-Match"] = entry["etag"]
+            if entry["last_modified"]:
+                request.headers["If-Modified-Since"] = entry["last_modified"]
+
+        response = super().send(request, **kwargs)
+
+        if entry and response.status_code == 304:
+            response.close()
+            self.cache.refresh(key, max_age, dict(response.headers))
+            self.cache.counters["revalidated"] += 1
+            self.cache.counters["bytes_saved"] += entry["body_size"]
+            return self.build_cached_response(request, entry, "REVALIDATED")
+
+        self.cache.counters["misses"] += 1
+        if response.status_code == 200:
+            if _cache_directives(response)[1]:
+                # The server forbids keeping this response; a stored copy would be outdated too
+                if entry:
+                    self.cache.delete(key)
+            else:
+                # Reads (and decodes) the body now; Session.send would do the same unless stream=True
+                self.cache.put(key, request.url, response.status_code, dict(response.headers), response.content,
+                               max_age)
+        response.headers["X-Cache"] = "MISS"
+        return response
+
+    def build_cached_response(self, request, entry: Dict, status: str) -> Response:
+        response = Response()
+        response.status_code = entry["status_code"]
+        response.reason = "OK"
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers["X-Cache"] = status
+        response._content = entry["body"]
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+
+_default_cache: Optional[HTTPCache] = None
+
+
+def default_http_cache() -> HTTPCache:
+    """Process-wide cache used by the shared LinkedIn session"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HTTPCache()
+    return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or reset the local HTTP response cache")
+    parser.add_argument("--stats", action="store_true", help="Print entry counts and stored sizes")
+    parser.add_argument("--invalidate", metavar="URL_PART", help="Forget entries whose URL contains this text")
+    parser.add_argument("--clear", action="store_true", help="Forget every response")
+    args = parser.parse_args()
+
+    cache = default_http_cache()
+    if args.invalidate:
+        print(f"🗑️ Invalidated {cache.invalidate(args.invalidate)} responses")
+    if args.clear:
+        cache.clear()
+        print("🗑️ HTTP cache cleared")
+    if args.stats or not (args.invalidate or args.clear):
+        for key, value in cache.stats().items():
+            print(f"📊 {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
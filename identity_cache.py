@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Identity Cache
+
+Remembers what a public profile slug (the part after /in/) resolves to, so the
+URN resolvers don't hit the network again for a profile they have already
+seen. Entries live in a small SQLite database under local_data/ and hold the
+member id, fsd_profile id, first/last name and public identifier.
+
+Each entry expires after its TTL, and the least recently used entries are
+evicted once the cache grows past its size limit.
+
+Usage:
+    cache = default_identity_cache()
+    cache.get('john-doe')                       # None or {'profile_id': ..., ...}
+    cache.put('john-doe', profile_id='ACoAA...', first_name='John')
+    python identity_cache.py --stats
+    python identity_cache.py --clear
+"""
+
+import argparse
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+LOCAL_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_data")
+IDENTITY_CACHE_PATH = os.path.join(LOCAL_DATA_DIR, "identity_cache.db")
+IDENTITY_TTL_SECONDS = 30 * 24 * 3600     # profile ids practically never change
+IDENTITY_CACHE_MAX_ENTRIES = 10000
+
+IDENTITY_FIELDS = ("member_id", "profile_id", "first_name", "last_name")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS identities (
+    public_id   TEXT PRIMARY KEY,
+    member_id   TEXT,
+    profile_id  TEXT,
+    first_name  TEXT,
+    last_name   TEXT,
+    updated_at  REAL NOT NULL,
+    expires_at  REAL NOT NULL,
+    last_used   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_identities_last_used ON identities (last_used);
+CREATE INDEX IF NOT EXISTS idx_identities_expires_at ON identities (expires_at);
+"""
+
+
+def normalize_public_id(public_id: str) -> str:
+    """Lower-case slug without URL parts, so 'John-Doe/' and 'john-doe' share an entry"""
+    if "/in/" in public_id:
+        public_id = public_id.split("/in/")[-1]
+    return public_id.split("?")[0].split("#")[0].strip("/").lower()
+
+
+class IdentityCache:
+    """SQLite-backed public-id → identity cache with per-entry TTL and LRU eviction"""
+
+    def __init__(self, db_path: str = IDENTITY_CACHE_PATH, ttl_seconds: float = IDENTITY_TTL_SECONDS,
+                 max_entries: int = IDENTITY_CACHE_MAX_ENTRIES):
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        # WAL + NORMAL keeps the per-lookup LRU touch from costing an fsync
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def get(self, public_id: str) -> Optional[Dict]:
+        """Cached identity for `public_id`, or None if unknown or expired"""
+        if not public_id:
+            return None
+        key = normalize_public_id(public_id)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM identities WHERE public_id = ? AND expires_at > ?", (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE identities SET last_used = ? WHERE public_id = ?", (now, key))
+            self._conn.commit()
+
+        identity = {field: row[field] for field in IDENTITY_FIELDS}
+        identity["public_identifier"] = row["public_id"]
+        return identity
+
+    def get_profile_urn(self, public_id: str) -> Optional[str]:
+        """Cached urn:li:fsd_profile:<id> for `public_id`, or None"""
+        identity = self.get(public_id)
+        if identity and identity.get("profile_id"):
+            return f"urn:li:fsd_profile:{identity['profile_id']}"
+        return None
+
+    def put(self, public_id: str, ttl_seconds: Optional[float] = None, **fields) -> None:
+        """
+        Store identity fields for `public_id`.
+
+        Fields left as None keep their cached value, so resolvers that only
+        know the profile id don't wipe names stored by a richer resolver.
+        """
+        if not public_id:
+            return
+        unknown = set(fields) - set(IDENTITY_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown identity fields: {', '.join(sorted(unknown))}")
+
+        key = normalize_public_id(public_id)
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        values = [fields.get(field) for field in IDENTITY_FIELDS]
+
+        with self._lock:
+            self._conn.execute(
+                """
+                INSERT INTO identities (public_id, member_id, profile_id, first_name, last_name,
+                                        updated_at, expires_at, last_used)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(public_id) DO UPDATE SET
+                    member_id  = COALESCE(excluded.member_id, member_id),
+                    profile_id = COALESCE(excluded.profile_id, profile_id),
+                    first_name = COALESCE(excluded.first_name, first_name),
+                    last_name  = COALESCE(excluded.last_name, last_name),
+                    updated_at = excluded.updated_at,
+                    expires_at = excluded.expires_at,
+                    last_used  = excluded.last_used
+                """,
+                (key, *values, now, expires_at, now),
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def put_profile_urn(self, public_id: str, profile_urn: str) -> None:
+        """Store the ID part of a resolved profile URN"""
+        if profile_urn:
+            self.put(public_id, profile_id=profile_urn.split(":")[-1])
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM identities WHERE expires_at <= ?", (now,))
+        excess = len(self) - self.max_entries
+        if excess > 0:
+            self._conn.execute(
+                "DELETE FROM identities WHERE public_id IN "
+                "(SELECT public_id FROM identities ORDER BY last_used LIMIT ?)",
+                (excess,),
+            )
+
+    def invalidate(self, public_id: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM identities WHERE public_id = ?", (normalize_public_id(public_id),))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM identities")
+            self._conn.commit()
+
+    def stats(self) -> Dict:
+        now = time.time()
+        total = len(self)
+        expired = self._conn.execute("SELECT COUNT(*) FROM identities WHERE expires_at <= ?", (now,)).fetchone()[0]
+        return {"entries": total, "expired": expired, "max_entries": self.max_entries, "path": self.db_path}
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM identities").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_default_cache: Optional[IdentityCache] = None
+
+
+def default_identity_cache() -> IdentityCache:
+    """Process-wide cache shared by every resolver"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = IdentityCache()
+    return _default_cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or reset the local LinkedIn identity cache")
+    parser.add_argument("--stats", action="store_true", help="Print entry counts")
+    parser.add_argument("--lookup", metavar="PUBLIC_ID", help="Show the cached identity for a profile slug or URL")
+    parser.add_argument("--invalidate", metavar="PUBLIC_ID", help="Forget one profile")
+    parser.add_argument("--clear", action="store_true", help="Forget every profile")
+    args = parser.parse_args()
+
+    cache = default_identity_cache()
+    if args.invalidate:
+        cache.invalidate(args.invalidate)
+        print(f"🗑️ Invalidated {normalize_public_id(args.invalidate)}")
+    if args.clear:
+        cache.clear()
+        print("🗑️ Identity cache cleared")
+    if args.lookup:
+        identity = cache.get(args.lookup)
+        print(identity if identity else f"❌ No cached identity for {normalize_public_id(args.lookup)}")
+    if args.stats or not (args.invalidate or args.clear or args.lookup):
+        for key, value in cache.stats().items():
+            print(f"📊 {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
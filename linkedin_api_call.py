@@ -7,14 +7,20 @@ Uses GraphQL endpoint for clean structured data extraction and messaging API for
 
 import requests
 import json
-import csv
 import time
 import random
-from datetime import datetime
 import urllib.parse
 from typing import Dict, List, Optional
 import logging
 import uuid
+from linkedin_client import VOYAGER_API, default_session
+from metrics import span, timed, timed_json
+from profiling import pop_profile_flag, run_profiled
+from response_archive import ResponseArchive, default_response_archive
+from post_sink import PostSink
+from post_extraction import extract_posts
+from local_store import post_key
+from seen_posts import SeenPostIndex, default_seen_posts
 
 # ==========================================
 # CONFIGURATION SETTINGS - EDIT THESE VALUES
@@ -38,6 +44,8 @@ REQUEST_TIMEOUT = 30                      # Request timeout (seconds)
 
 # Output settings
 OUTPUT_PREFIX = "linkedin_search_results"  # Prefix for output files
+RESUME_INTERRUPTED_RUNS = True            # Continue an unfinished run instead of refetching its pages
+SKIP_SEEN_POSTS = True                    # Skip posts collected by earlier runs; stop at a page of only those
 ENABLE_LOGGING = True                     # Enable detailed logging
 
 # ==========================================
@@ -47,8 +55,7 @@ ENABLE_LOGGING = True                     # Enable detailed logging
 # Import sensitive authentication data from separate config file
 try:
     from config import (
-        CSRF_TOKEN, JSESSIONID, LI_AT_TOKEN, LI_RM_TOKEN,
-        BCOOKIE, BSCOOKIE, LIDC_COOKIE, PAGE_INSTANCE, QUERY_ID
+        CSRF_TOKEN, JSESSIONID, LI_AT_TOKEN, LI_RM_TOKEN, PAGE_INSTANCE, QUERY_ID
     )
     print("✅ Authentication config loaded successfully")
 except ImportError:
@@ -79,8 +86,15 @@ logger = logging.getLogger(__name__)
 class LinkedInScraper:
     """Enhanced LinkedIn scraper with anti-detection measures and messaging capabilities"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, session: Optional[requests.Session] = None, archive: Optional[ResponseArchive] = None,
+                 seen_posts: Optional[SeenPostIndex] = None):
+        # Shared keep-alive session; cookies come from config.py via linkedin_client
+        self.session = session if session is not None else default_session()
+        self.archive = archive if archive is not None else default_response_archive()
+        # Loaded on the first scrape_posts run (see seen_posts.py)
+        self.seen_posts = seen_posts
+        # Posts skipped as already seen by the last extract_posts_from_json call
+        self.seen_skipped = 0
         self.base_delay = BASE_DELAY  # Base delay between requests in seconds
         self.max_retries = MAX_RETRIES
         self.timeout = REQUEST_TIMEOUT
@@ -120,7 +134,6 @@ class LinkedInScraper:
             'x-restli-symbol-table-name': 'voyager-21304',
             'x-li-lang': 'en_US',
             'accept': 'application/json',
-            'cookie': f"JSESSIONID={JSESSIONID}; bcookie={BCOOKIE}; bscookie={BSCOOKIE}; lang=v=2&lang=en_US; li_at={LI_AT_TOKEN}; li_rm={LI_RM_TOKEN}; liap=true; lidc={LIDC_COOKIE}",
             'priority': 'u=0, i'
         }
         
@@ -140,8 +153,7 @@ class LinkedInScraper:
             'sec-fetch-site': 'same-origin',
             'sec-gpc': '1',
             'x-li-lang': 'en_US',
-            'x-restli-protocol-version': '2.0.0',
-            'cookie': f"bcookie={BCOOKIE}; bscookie={BSCOOKIE}; liap=true; JSESSIONID={JSESSIONID}; timezone=Asia/Dubai; li_theme=light; li_theme_set=app; li_at={LI_AT_TOKEN}; lang=v=2&lang=en-us; lidc={LIDC_COOKIE}"
+            'x-restli-protocol-version': '2.0.0'
         }
     
     def get_random_headers(self, for_messaging: bool = False) -> Dict[str, str]:
@@ -217,11 +229,12 @@ class LinkedInScraper:
             delay = self.base_delay * (2 ** attempt) + random.uniform(1.0, 3.0)
         
         logger.info(f"Applying rate limit: {delay:.2f} seconds")
-        time.sleep(delay)
+        with span("rate_limit_sleep", "messaging" if is_messaging else "retry" if attempt else "pacing"):
+            time.sleep(delay)
     
     def send_message(self, conversation_urn: str, message_text: str, mailbox_urn: str = None) -> bool:
         """Send a message to a LinkedIn conversation"""
-        url = "https://www.linkedin.com/voyager/api/voyagerMessagingDashMessengerMessages?action=createMessage"
+        url = f"{VOYAGER_API}/voyagerMessagingDashMessengerMessages?action=createMessage"
         
         # Generate unique tokens
         origin_token = str(uuid.uuid4())
@@ -279,7 +292,8 @@ class LinkedInScraper:
                     return True
                 elif response.status_code == 429:
                     logger.warning("Rate limited by LinkedIn. Waiting longer...")
-                    time.sleep(60 + random.uniform(10, 30))
+                    with span("rate_limit_sleep", "429_backoff"):
+                        time.sleep(60 + random.uniform(10, 30))
                     continue
                 elif response.status_code == 403:
                     logger.error("Access forbidden. Credentials may be expired or insufficient permissions.")
@@ -345,7 +359,7 @@ class LinkedInScraper:
         keywords = SEARCH_KEYWORDS
         
         # Build URL with proper encoding
-        base_url = "https://www.linkedin.com/voyager/api/graphql"
+        base_url = f"{VOYAGER_API}/graphql"
         variables = f"(query:(flagshipSearchIntent:SEARCH_SRP,includeFiltersInResponse:false,keywords:{urllib.parse.quote(keywords)},queryParameters:(resultType:List(CONTENT),sortBy:List(date_posted)),spellCorrectionEnabled:true),origin:GLOBAL_SEARCH_HEADER,count:{count},start:{start_page})"
         query_name = "SearchClusterCollection"
         query_id = QUERY_ID
@@ -372,11 +386,12 @@ class LinkedInScraper:
                 logger.info(f"Response status: {response.status_code}")
                 
                 if response.status_code == 200:
-                    return response.json()
+                    return timed_json(response)
                 elif response.status_code == 429:
                     # Rate limited - wait longer
                     logger.warning("Rate limited by LinkedIn. Waiting longer...")
-                    time.sleep(60 + random.uniform(10, 30))
+                    with span("rate_limit_sleep", "429_backoff"):
+                        time.sleep(60 + random.uniform(10, 30))
                     continue
                 elif response.status_code == 403:
                     logger.error("Access forbidden. Credentials may be expired.")
@@ -395,190 +410,101 @@ class LinkedInScraper:
         
         return None
     
-    @staticmethod
-    def clean_profile_url(url: str) -> str:
-        """Clean profile URL by removing query parameters"""
-        if not url or 'URL not found' in url:
-            return url
-        
-        # For individual profiles, clean up the URL
-        if '/in/' in url and '?' in url:
-            return url.split('?')[0]
-        
-        return url
+    @timed("extract", "posts")
+    def extract_posts_from_json(self, json_data: Dict, seen: Optional[SeenPostIndex] = None) -> List[Dict]:
+        """
+        Extract posts data from the structured JSON response (see post_extraction.py)
+        
+        With `seen`, posts collected before are skipped (counted in self.seen_skipped);
+        those with a share URL are skipped before their fields are extracted.
+        """
+        posts, self.seen_skipped = extract_posts(json_data, seen)
+        return posts
     
-    def extract_posts_from_json(self, json_data: Dict) -> List[Dict]:
-        """Extract posts data from the structured JSON response"""
-        posts = []
-        
-        try:
-            elements = json_data.get('data', {}).get('searchDashClustersByAll', {}).get('elements', [])
-            
-            for element in elements:
-                items = element.get('items', [])
-                for item_wrapper in items:
-                    item = item_wrapper.get('item', {})
-                    
-                    search_feed_update = item.get('searchFeedUpdate')
-                    if search_feed_update:
-                        update = search_feed_update.get('update', {})
-                        if update:
-                            post_data = self._extract_post_data(update)
-                            
-                            # Only add posts with meaningful content
-                            if post_data.get('post_content') and post_data.get('author_name'):
-                                posts.append(post_data)
-            
-            return posts
-            
-        except Exception as e:
-            logger.error(f"Error extracting posts: {e}")
-            return []
-    
-    def _extract_post_data(self, update: Dict) -> Dict:
-        """Extract individual post data from update object"""
-        post_data = {}
-        
-        # Extract actor (author) information
-        actor = update.get('actor', {})
-        if actor:
-            name_obj = actor.get('name', {})
-            if name_obj:
-                post_data['author_name'] = name_obj.get('text', 'Unknown')
-            
-            nav_context = actor.get('navigationContext', {})
-            if nav_context:
-                action_target = nav_context.get('actionTarget', '')
-                post_data['profile_url'] = self.clean_profile_url(action_target)
-            else:
-                post_data['profile_url'] = 'URL not found'
-        
-        # Extract post content from commentary
-        commentary = update.get('commentary', {})
-        if commentary:
-            text_obj = commentary.get('text', {})
-            if text_obj:
-                post_data['post_content'] = text_obj.get('text', '')
+    def scrape_posts(self, target_posts: int = TARGET_POSTS, posts_per_page: int = POSTS_PER_PAGE,
+                     sink: Optional[PostSink] = None, resume: bool = RESUME_INTERRUPTED_RUNS) -> PostSink:
+        """
+        Main scraping function with intelligent pagination
+        
+        Each page's posts are written through `sink` as soon as they're extracted
+        (see post_sink.py), so nothing is held until the end of the run. If the
+        last run for this search stopped early (403, crash, Ctrl+C), it is resumed
+        from its checkpoint without refetching its pages.
+        
+        Posts collected by earlier runs are skipped (see seen_posts.py), and since
+        results are sorted by date, paging stops at the first page of only those.
+        
+        Returns:
+            The sink, with the output file names, post count and a sample of posts
+        """
+        logger.info(f"[START] LinkedIn scraper - Target: {target_posts} posts")
         
-        # Extract social content for post URL
-        social_content = update.get('socialContent', {})
-        if social_content:
-            post_data['post_url'] = social_content.get('shareUrl', '')
+        sink = sink or PostSink(SEARCH_KEYWORDS, posts_per_page, OUTPUT_PREFIX, archive=self.archive)
+        if sink.open(resume=resume):
+            logger.info(f"[RESUME] Continuing earlier run from post {sink.next_start} "
+                        f"({sink.post_count} posts already saved)")
         
-        return post_data
-    
-    def save_to_csv(self, posts: List[Dict], filename_prefix: str = OUTPUT_PREFIX) -> Optional[str]:
-        """Save posts to CSV file with UTF-8 encoding"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        csv_filename = f"{filename_prefix}_{timestamp}.csv"
+        seen = None
+        if SKIP_SEEN_POSTS:
+            self.seen_posts = self.seen_posts if self.seen_posts is not None else default_seen_posts()
+            seen = self.seen_posts
         
-        headers = ['Post_Number', 'Author_Name', 'Profile_URL', 'Post_Content', 'Post_URL']
+        page = sink.next_start // posts_per_page
+        max_empty_pages = 2
+        max_pages = MAX_PAGES  # Safety limit
+        finished = True
         
         try:
-            with open(csv_filename, 'w', newline='', encoding='utf-8-sig') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
+            while sink.post_count < target_posts and page < max_pages:
+                start_page = page * posts_per_page
                 
-                for i, post in enumerate(posts, 1):
-                    row = [
-                        i,
-                        post.get('author_name', 'Unknown'),
-                        post.get('profile_url', 'Not found'),
-                        post.get('post_content', 'No content'),
-                        post.get('post_url', 'No URL')
-                    ]
-                    writer.writerow(row)
-            
-            logger.info(f"[SUCCESS] CSV file saved with UTF-8 encoding: {csv_filename}")
-            return csv_filename
-            
-        except Exception as e:
-            logger.error(f"[ERROR] Error saving CSV: {e}")
-            return None
-    
-    def save_backup_files(self, raw_data: Dict, posts: List[Dict], filename_prefix: str = OUTPUT_PREFIX) -> tuple:
-        """Save backup files (JSON and TXT)"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Save raw JSON
-        raw_filename = f"{filename_prefix}_raw_{timestamp}.json"
-        try:
-            with open(raw_filename, 'w', encoding='utf-8') as f:
-                json.dump(raw_data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Raw data saved: {raw_filename}")
-        except Exception as e:
-            logger.error(f"Error saving raw data: {e}")
-            raw_filename = None
-        
-        # Save parsed TXT
-        parsed_filename = f"{filename_prefix}_parsed_{timestamp}.txt"
-        try:
-            with open(parsed_filename, 'w', encoding='utf-8') as f:
-                f.write("=== LinkedIn Marketing Jobs in Dubai ===\n\n")
+                logger.info(f"[PAGE] Fetching page {page + 1} (posts: {start_page}-{start_page + posts_per_page - 1})")
                 
-                for i, post in enumerate(posts, 1):
-                    f.write(f"POST #{i}\n")
-                    f.write("-" * 50 + "\n")
-                    f.write(f"Author: {post.get('author_name', 'Unknown')}\n")
-                    f.write(f"Profile: {post.get('profile_url', 'Not found')}\n")
-                    f.write(f"Content: {post.get('post_content', 'No content')}\n")
-                    f.write(f"URL: {post.get('post_url', 'No URL')}\n")
-                    f.write("\n")
-            
-            logger.info(f"Parsed results saved: {parsed_filename}")
-        except Exception as e:
-            logger.error(f"Error saving parsed results: {e}")
-            parsed_filename = None
-        
-        return raw_filename, parsed_filename
-    
-    def scrape_posts(self, target_posts: int = TARGET_POSTS, posts_per_page: int = POSTS_PER_PAGE) -> List[Dict]:
-        """Main scraping function with intelligent pagination"""
-        logger.info(f"[START] LinkedIn scraper - Target: {target_posts} posts")
-        
-        all_posts = []
-        page = 0
-        consecutive_empty_pages = 0
-        max_empty_pages = 2
-        max_pages = MAX_PAGES  # Safety limit
-        
-        while len(all_posts) < target_posts and page < max_pages:
-            start_page = page * posts_per_page
-            
-            logger.info(f"[PAGE] Fetching page {page + 1} (posts: {start_page}-{start_page + posts_per_page - 1})")
-            
-            # Apply rate limiting before each request
-            if page > 0:
-                self.apply_rate_limiting()
-            
-            json_data = self.make_api_call(start_page=start_page, count=posts_per_page)
-            
-            if json_data:
-                posts = self.extract_posts_from_json(json_data)
+                # Apply rate limiting before each request
+                if page > 0:
+                    self.apply_rate_limiting()
                 
-                if posts:
-                    all_posts.extend(posts)
-                    consecutive_empty_pages = 0
-                    logger.info(f"[SUCCESS] Found {len(posts)} posts. Total: {len(all_posts)}")
-                else:
-                    consecutive_empty_pages += 1
-                    logger.warning(f"No posts found on page {page + 1}")
+                json_data = self.make_api_call(start_page=start_page, count=posts_per_page)
+                
+                if json_data:
+                    # Limit to target number of posts
+                    posts = self.extract_posts_from_json(json_data, seen)[:target_posts - sink.post_count]
+                    sink.write_page(start_page, json_data, posts)
+                    if seen is not None:
+                        seen.add_many(post_key(post) for post in posts)
                     
-                    if consecutive_empty_pages >= max_empty_pages:
-                        logger.info("Multiple empty pages detected. Stopping.")
+                    if posts:
+                        logger.info(f"[SUCCESS] Found {len(posts)} posts. Total: {sink.post_count}"
+                                    f"{f' ({self.seen_skipped} already seen)' if self.seen_skipped else ''}")
+                    elif self.seen_skipped:
+                        # Results are sorted by date: everything from here on was collected before
+                        logger.info(f"[SEEN] All {self.seen_skipped} posts on page {page + 1} were collected before. Stopping.")
                         break
-            else:
-                logger.error(f"[ERROR] API call failed for page {page + 1}")
-                break
-            
-            page += 1
-        
-        # Limit to target number of posts
-        if len(all_posts) > target_posts:
-            all_posts = all_posts[:target_posts]
-            logger.info(f"Limited results to {target_posts} posts as requested")
-        
-        return all_posts
+                    else:
+                        logger.warning(f"No posts found on page {page + 1}")
+                        
+                        if sink.empty_pages >= max_empty_pages:
+                            logger.info("Multiple empty pages detected. Stopping.")
+                            break
+                else:
+                    logger.error(f"[ERROR] API call failed for page {page + 1}")
+                    # Keep the checkpoint so the next run picks up from this page
+                    finished = False
+                    break
+                
+                page += 1
+        except BaseException:
+            sink.close()
+            raise
+        finally:
+            if seen is not None:
+                seen.save()
+        
+        if finished:
+            sink.finish()
+        else:
+            sink.close()
+        return sink
 
 def main():
     """Main execution function"""
@@ -607,22 +533,15 @@ def main():
         
         scraper = LinkedInScraper()
         
-        # Scrape posts
-        posts = scraper.scrape_posts(target_posts=TARGET_POSTS)
+        # Scrape posts (written to CSV/TXT, the archive and the local store page by page)
+        sink = scraper.scrape_posts(target_posts=TARGET_POSTS)
         
-        if posts:
-            logger.info(f"[COMPLETE] Successfully scraped {len(posts)} posts!")
-            
-            # Save to CSV
-            csv_file = scraper.save_to_csv(posts)
-            
-            # Save backup files (use the last successful API response)
-            # For simplicity, we'll just save the parsed results
-            raw_file, parsed_file = scraper.save_backup_files({}, posts)
+        if sink.post_count:
+            logger.info(f"[COMPLETE] Successfully scraped {sink.post_count} posts!")
             
             # Show sample results
             logger.info("[SAMPLE] Sample Results (first 3 posts):")
-            for i, post in enumerate(posts[:3], 1):
+            for i, post in enumerate(sink.sample, 1):
                 logger.info(f"\nPost #{i}:")
                 logger.info(f"Author: {post.get('author_name', 'Unknown')}")
                 logger.info(f"Profile: {post.get('profile_url', 'Not found')}")
@@ -631,10 +550,13 @@ def main():
             print("\n" + "=" * 60)
             print("✅ SCRAPING COMPLETED SUCCESSFULLY!")
             print("=" * 60)
-            print(f"📊 CSV File: {csv_file}")
-            print(f"📄 Text File: {parsed_file}")
-            print(f"📝 Total Posts: {len(posts)}")
+            print(f"📊 CSV File: {sink.csv_file}")
+            print(f"📄 Text File: {sink.txt_file}")
+            print(f"🗄️ Raw Archive: {scraper.archive.path}")
+            print(f"📝 Total Posts: {sink.post_count}")
             print(f"🔍 Search: '{SEARCH_KEYWORDS}'")
+            if not sink.finished:
+                print("⏸️ Stopped before the target; run again to resume from the next page")
             print("=" * 60)
             
         else:
@@ -650,6 +572,7 @@ def main():
     except KeyboardInterrupt:
         logger.info("[STOP] Scraping interrupted by user")
         print("\n⏹️ Scraping stopped by user.")
+        print("💾 Pages fetched so far are saved; run again to resume.")
     except Exception as e:
         logger.error(f"[ERROR] Unexpected error: {e}")
         print(f"\n💥 Error occurred: {e}")
@@ -657,4 +580,5 @@ def main():
             print("🔧 This looks like an authentication error. Try updating your tokens!")
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    # --profile[=sample] writes pstats and collapsed stacks (see profiling.py)
+    run_profiled(pop_profile_flag(), "linkedin_api_call", main)
\ No newline at end of file
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Shared LinkedIn HTTP Client
+
+One authenticated requests.Session for the whole process. Credentials are
+loaded once from config.py (see config_template.py), and the session keeps a
+pool of keep-alive connections to www.linkedin.com. Every request after the
+first reuses an open TCP/TLS connection instead of paying a new handshake.
+
+Each class takes an optional `session` and uses default_session() when none
+is given, so the scraper, extractor, viewer, connection checkers and URN
+extractor all share the same connections.
+
+Without config.py the client exits with instructions to create it, except
+in replay mode (below), which runs on placeholder credentials.
+
+Requests to www.linkedin.com go through http_cache.CachingAdapter, which answers
+mostly-static profile endpoints from disk and revalidates them with ETag /
+If-Modified-Since (set HTTP_CACHE_ENABLED = False to turn it off).
+
+With LINKEDIN_TRANSPORT=record or replay, requests are recorded to or
+replayed from a cassette instead (see transport.py), so scripts and
+benchmarks can run without live cookies.
+
+Usage:
+    from linkedin_client import default_session, api_headers
+    session = default_session()
+    response = session.get(url, headers=api_headers())
+    python linkedin_client.py --check
+"""
+
+import argparse
+import os
+import re
+import sys
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_cache import CachingAdapter, HTTPCache
+from metrics import default_metrics
+from transport import TRANSPORT_MODE, cassette_adapter
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+# Where requests go. Point it at a stand-in server (benchmarks/voyager_server.py)
+# to run the scripts without LinkedIn, e.g. LINKEDIN_BASE_URL=http://127.0.0.1:8765
+LINKEDIN_BASE_URL = os.environ.get("LINKEDIN_BASE_URL", "https://www.linkedin.com").rstrip("/")
+VOYAGER_API = LINKEDIN_BASE_URL + "/voyager/api"
+
+# Connection pools kept (one per host) and connections kept open per pool.
+# Only a few hosts are ever contacted (www.linkedin.com, sometimes linkedin.com).
+POOL_CONNECTIONS = 4
+POOL_MAXSIZE = 10
+
+# Serve/revalidate static profile endpoints from local_data/http_cache.db
+HTTP_CACHE_ENABLED = True
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
+
+# Cookie and CSRF values used when replaying without config.py
+REPLAY_PLACEHOLDER = "replay"
+
+
+# ==========================================
+# CREDENTIALS (loaded once per process)
+# ==========================================
+
+def load_credentials() -> Dict:
+    """
+    Cookies and CSRF token from config.py; exits with instructions if it is missing.
+
+    In replay mode a missing config.py is fine: replayed responses are looked
+    up by URL, so placeholder credentials are used instead.
+
+    Returns:
+        {'cookies': {...}, 'csrf_token': str, 'source': 'config.py' or 'placeholder'}
+    """
+    try:
+        from config import CSRF_TOKEN, JSESSIONID, LI_AT_TOKEN, LI_RM_TOKEN, BCOOKIE, BSCOOKIE, LIDC_COOKIE
+    except ImportError:
+        if TRANSPORT_MODE == "replay":
+            print("📼 Replay mode without config.py: using placeholder credentials")
+            token = REPLAY_PLACEHOLDER
+            return {"cookies": _cookie_jar(f"ajax:{token}", token, token, token, token, token),
+                    "csrf_token": f"ajax:{token}", "source": "placeholder"}
+        print("❌ ERROR: config.py not found!")
+        print("📋 Please copy config_template.py to config.py and add your LinkedIn tokens")
+        print("📖 See linkedin_auth_guide.md for instructions on getting tokens")
+        sys.exit(1)
+
+    return {"cookies": _cookie_jar(JSESSIONID, BCOOKIE, BSCOOKIE, LI_AT_TOKEN, LI_RM_TOKEN, LIDC_COOKIE),
+            "csrf_token": CSRF_TOKEN, "source": "config.py"}
+
+
+def _cookie_jar(jsessionid: str, bcookie: str, bscookie: str, li_at: str, li_rm: str, lidc: str) -> Dict[str, str]:
+    return {
+        "JSESSIONID": jsessionid,
+        "bcookie": bcookie,
+        "bscookie": bscookie,
+        "lang": "v=2&lang=en-us",
+        "li_at": li_at,
+        "li_rm": li_rm,
+        "liap": "true",
+        "lidc": lidc,
+    }
+
+
+CREDENTIALS = load_credentials()
+CSRF_TOKEN = CREDENTIALS["csrf_token"]
+
+
+def site_url(url: str) -> str:
+    """A linkedin.com page URL (e.g. a profile) moved onto LINKEDIN_BASE_URL"""
+    return re.sub(r"^https?://(www\.)?linkedin\.com", LINKEDIN_BASE_URL, url)
+
+
+def api_headers(accept: str = "application/json") -> Dict[str, str]:
+    """Default headers for voyager API calls; callers copy and extend them"""
+    return {
+        "csrf-token": CSRF_TOKEN,
+        "accept": accept,
+        "accept-language": "en-US,en;q=0.9",
+        "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Brave";v="138"',
+        "sec-ch-ua-mobile": "?0",
+        "sec-ch-ua-platform": '"Windows"',
+        "sec-fetch-dest": "empty",
+        "sec-fetch-mode": "cors",
+        "sec-fetch-site": "same-origin",
+        "sec-gpc": "1",
+        "x-li-lang": "en_US",
+        "x-restli-protocol-version": "2.0.0",
+    }
+
+
+# ==========================================
+# SESSION
+# ==========================================
+
+def new_session(pool_connections: int = POOL_CONNECTIONS, pool_maxsize: int = POOL_MAXSIZE,
+                http_cache: Optional[HTTPCache] = None, use_http_cache: bool = HTTP_CACHE_ENABLED,
+                transport_mode: str = TRANSPORT_MODE) -> requests.Session:
+    """
+    Authenticated session with a keep-alive connection pool.
+
+    Only the cookies, User-Agent and CSRF token are set on the session; other
+    headers are passed per request, so classes sharing it don't leak their
+    defaults into each other's calls.
+    """
+    session = requests.Session()
+    adapter = cassette_adapter(transport_mode, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    if adapter is not None:
+        # Every request has to reach the cassette, so the HTTP cache stays out of the way
+        use_http_cache = False
+    else:
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if use_http_cache:
+        # Longest prefix wins, so LinkedIn requests use the caching adapter (and its own pool)
+        session.mount(LINKEDIN_BASE_URL + "/", CachingAdapter(
+            http_cache, pool_connections=pool_connections, pool_maxsize=pool_maxsize))
+    # Round-trip time and status of every response (see metrics.py)
+    session.hooks["response"].append(default_metrics().record_response)
+    session.cookies.update(CREDENTIALS["cookies"])
+    session.headers.update({
+        "User-Agent": USER_AGENT,
+        "csrf-token": CSRF_TOKEN,
+    })
+    return session
+
+
+_default_session: Optional[requests.Session] = None
+_default_session_lock = threading.Lock()
+
+
+def default_session() -> requests.Session:
+    """Process-wide session shared by every LinkedIn class and script"""
+    global _default_session
+    if _default_session is None:
+        with _default_session_lock:
+            if _default_session is None:
+                _default_session = new_session()
+    return _default_session
+
+
+def close_default_session() -> None:
+    """Close the pooled connections (the next default_session() call opens new ones)"""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is not None:
+            _default_session.close()
+            _default_session = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the shared LinkedIn session")
+    parser.add_argument("--check", action="store_true",
+                        help="Make one authenticated request and report whether the cookies still work")
+    args = parser.parse_args()
+
+    print(f"🍪 Credentials from: {CREDENTIALS['source']}")
+    print(f"🍪 Cookies: {', '.join(sorted(CREDENTIALS['cookies']))}")
+    print(f"🔌 Pool: {POOL_CONNECTIONS} hosts × {POOL_MAXSIZE} connections")
+    print(f"💾 HTTP cache: {'on' if HTTP_CACHE_ENABLED and TRANSPORT_MODE == 'passthrough' else 'off'}")
+    print(f"🔌 Transport: {TRANSPORT_MODE}")
+    print(f"🌐 Base URL: {LINKEDIN_BASE_URL}")
+
+    if args.check:
+        session = default_session()
+        response = session.get(f"{VOYAGER_API}/me", headers=api_headers(), timeout=30)
+        if response.status_code == 200:
+            print("✅ Session is authenticated")
+        else:
+            print(f"❌ Status {response.status_code}: cookies may have expired (update config.py)")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,64 +15,43 @@ import requests
 import json
 import re
 import sys
-from typing import Dict, Optional, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import quote
 import uuid
+from identity_cache import IdentityCache, default_identity_cache
+from linkedin_client import VOYAGER_API, api_headers, default_session
+from local_store import LocalStore, default_local_store
+from metrics import timed, timed_json
+from profiling import pop_profile_flag, run_profiled
+from connection_cache import ConnectionCache, default_connection_cache
+from debug_capture import DebugCapture, default_debug_capture
+from resolver_pipeline import ResolverPipeline, Strategy
+from response_index import ResponseIndex, PROFILE_TYPE, MINI_PROFILE_TYPE
+
+# Relationship endpoints, each tried as its own strategy ({public_id} is filled in)
+RELATIONSHIP_ENDPOINTS = {
+    "networkinfo": VOYAGER_API + "/identity/profiles/{public_id}/networkinfo",
+    "connectionDistance": VOYAGER_API + "/relationships/connectionDistance?profiles=List({public_id})",
+    "profileRelationship": VOYAGER_API + "/identity/profiles/{public_id}/relationship",
+    "relationship": VOYAGER_API + "/relationships/relationship/{public_id}",
+    "sharedConnections": VOYAGER_API + "/identity/shared/connections/{public_id}",
+}
 
 class LinkedInConnectionChecker:
-    def __init__(self):
-        self.session = requests.Session()
-        self.setup_session()
-        
-    def setup_session(self):
-        """Setup session with cookies and headers from existing scripts"""
-        
-        # Updated cookies from your existing scripts
-        cookies = {
-            "bcookie": "v=2&12e9e7e4-3797-4b9d-8b85-e67c6fbbcf80",
-            "li_sugr": "9c83b1f7-b3ab-47d6-8f9c-aac27e761ba1",
-            "bscookie": "v=1&20250507140639ea67aaf7-6f73-48ff-8813-9f6383cea24eAQEBEVVX01KNZ7vWOUKdmFDVKvhshdNt",
-            "JSESSIONID": "ajax:4763283604314235653",
-            "_guid": "c4c27323-6441-4b94-8a60-e2dae58ecd41",
-            "dfpfpt": "3c04e81e591e469e8cf3481efad5f950",
-            "timezone": "Asia/Dubai",
-            "li_theme": "light",
-            "li_theme_set": "app",
-            "lang": "v=2&lang=en-us",
-            "sdui_ver": "sdui-flagship:0.1.7528+sdui-flagship.production",
-            "AnalyticsSyncHistory": "AQK_eRy5LiZXJwAAAZe_qwIzZO_LbAvR1FcGJx_R_9rnkDNCrWvjKOrN4xZRuE9zGUzaO0h_W6fvC-YYrXQ8_g",
-            "lms_ads": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "lms_analytics": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "fptctx2": "taBcrIH61PuCVH7eNCyH0I1otfYAPn9VOPY9aMX8tO1OZsqBMQoiv4L3v0T63VjmZLQa16kvaMUYVUosFXHHtS3l3aC7%2bp1EFIAkHKyNtQRBhoos8j9BfdkViImt83dvAFqcppQGcz5heoO6EHiT%2f2WMpn0HnQ95d0aiXGAk8qxAFHAMLZtFLr%2blIlevK84W1%2b%2bkBdGvNOFAGbYVWU9%2bRQrmV1NCHYTbXWOVIMufooVyvn%2b2lWgJdSY0VV9at63Pp9oekq7qQy4YLLD0O7%2blXCahZrDDNixWQiWnqhEunmFk2yWWGzorslBwL41%2fpFSaILdUYnycPsPgWuVPqOAFnuNVzPw7iXHOHljjkisgY7M%3d",
-            "AMCVS_14215E3D5995C57C0A495C55@AdobeOrg": "1",
-            "AMCV_14215E3D5995C57C0A495C55@AdobeOrg": "-637568504|MCIDTS|20270|MCMID|27573806750435840703114589459359274076|MCOPTOUT-1751285608s|NONE|vVersion|5.1.1",
-            "g_state": '{"i_l":0}',
-            "liap": "true",
-            "li_at": "AQEDASP6v4EBfhJ7AAABl8BT3OQAAAGX5GBg5E0AocvtLBfU2unQg6KLYHNi6AG83PSJwqQdkZ2kcjhYnS0jlwh0Xy834jLziuj_Kdg3yOwz-L-QrbzlBOjMqHho03KrmOqhKNRdfYXUPajAOyj_oUg_",
-            "UserMatchHistory": "AQKiB7Llh0h5CQAAAZfAzXrmCXAhnShmdUN0FvF8Es2ZeNaRCmct8q0-S1Ddqopi_SycvSKRb49MiK9AS3cJKZrwp_sa8bRYUrSwYtHjWey1gs7IdGFey4EkhbDn-gacF7IVWHbEq853dlv3k51Xg_QnSRDWZj7W8OWyQEAkzh5Opv9FX2epXGZQl0CmkaVhpnBrf9h6MwAGmxFlkXANNJ3CKSTBv61DQw87g5a_Cm86FS_GsBO9c7shNBmraSgxD-C3jxl8gBJ8UECnagqMbKfEknF3ZM5LBATJhV6LPTDiqSmaQc0nX1jE63pH3OPqgPYWcHzhBak1uE2Hl8Dvbhc-i9A9ZO7k87B_IBjYsd-47qITiw",
-            "lidc": "b=OGST08:s=O:r=O:a=O:p=O:g=3239:u=1:x=1:i=1751286381:t=1751372781:v=2:sig=AQFU3gS41--2hDPcPVRLGY0B5NNnW-3M"
-        }
+    def __init__(self, identity_cache: Optional[IdentityCache] = None, store: Optional[LocalStore] = None,
+                 connection_cache: Optional[ConnectionCache] = None, session: Optional[requests.Session] = None,
+                 debug_capture: Optional[DebugCapture] = None):
+        self.session = session if session is not None else default_session()
+        self.headers = api_headers("application/vnd.linkedin.normalized+json+2.1")
+        self.identity_cache = identity_cache if identity_cache is not None else default_identity_cache()
+        self.store = store or default_local_store()
+        self.connection_cache = connection_cache if connection_cache is not None else default_connection_cache()
+        self.debug_capture = debug_capture if debug_capture is not None else default_debug_capture()
+        self.pipeline = ResolverPipeline("connection_status", self.connection_strategies(), store=self.store)
+        # 200 responses during the current resolve_connection_status call
+        self.answered = 0
         
-        # Set cookies in session
-        self.session.cookies.update(cookies)
-        
-        # Set headers similar to existing scripts
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "csrf-token": "ajax:4763283604314235653",
-            "accept": "application/vnd.linkedin.normalized+json+2.1",
-            "accept-language": "en-US,en;q=0.9",
-            "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Brave";v="138"',
-            "sec-ch-ua-mobile": "?0",
-            "sec-ch-ua-platform": '"Windows"',
-            "sec-fetch-dest": "empty",
-            "sec-fetch-mode": "cors",
-            "sec-fetch-site": "same-origin",
-            "sec-gpc": "1",
-            "x-li-lang": "en_US",
-            "x-restli-protocol-version": "2.0.0"
-        })
-
     def get_public_identifier_from_url(self, profile_url: str) -> Optional[str]:
         """Extract public identifier from LinkedIn profile URL"""
         try:
@@ -86,24 +65,73 @@ class LinkedInConnectionChecker:
             print(f"❌ Error extracting public ID from URL: {e}")
         return None
 
-    def check_connection_status(self, profile_url: str) -> Dict:
+    def decode(self, response: requests.Response) -> Dict:
+        """JSON body of a 200 response; counts it as an endpoint having answered"""
+        self.answered += 1
+        return timed_json(response)
+
+    def new_result(self, profile_url: str) -> Dict:
+        """Empty check result for `profile_url`"""
+        return {
+            "profile_url": profile_url,
+            "is_connected": False,
+            "distance": None,
+            "connection_status": "Unknown",
+            "profile_name": None,
+            "error": None
+        }
+
+    def check_connection_status(self, profile_url: str, use_cache: bool = True) -> Dict:
         """
         Check connection status with a LinkedIn profile
         
+        Connections imported from the data export answer first, then the result
+        of an earlier check if it hasn't expired. Only otherwise are the API
+        endpoints tried, and their answer is cached for next time (how long
+        depends on the distance found, see connection_cache.py).
+        
         Args:
             profile_url: LinkedIn profile URL
+            use_cache: False ignores any cached result and checks again
+                (the fresh result still replaces the cached one)
             
         Returns:
             Dict containing connection status and details
         """
-        result = {
-            "profile_url": profile_url,
-            "is_connected": False,
-            "distance": None,
-            "connection_status": "Unknown",
-            "profile_name": None,
-            "error": None
-        }
+        public_id = self.get_public_identifier_from_url(profile_url)
+        if public_id:
+            # Connections imported from the data export (no request)
+            export_data = self.check_via_data_export(public_id)
+            if export_data:
+                return {**self.new_result(profile_url), **export_data}
+            
+            if use_cache:
+                cached = self.connection_cache.get(public_id)
+                if cached:
+                    age = time.time() - cached.pop("checked_at")
+                    print(f"💾 Using cached result for {public_id} (checked {int(age)}s ago)")
+                    return {**self.new_result(profile_url), **cached, "cached": True}
+        
+        # Without the cache, make the HTTP cache revalidate profile responses too (see http_cache.py)
+        headers = self.headers if use_cache else {**self.headers, "Cache-Control": "no-cache"}
+        result = self.resolve_connection_status(profile_url, headers)
+        if public_id:
+            self.connection_cache.put(public_id, result)
+        return result
+
+    def resolve_connection_status(self, profile_url: str, base_headers: Optional[Dict[str, str]] = None) -> Dict:
+        """
+        Check connection status with a LinkedIn profile via the API endpoints
+        
+        Args:
+            profile_url: LinkedIn profile URL
+            base_headers: Headers every request of this call starts from (default self.headers)
+            
+        Returns:
+            Dict containing connection status and details
+        """
+        result = self.new_result(profile_url)
+        self.answered = 0
         
         try:
             # Extract public identifier
@@ -114,56 +142,29 @@ class LinkedInConnectionChecker:
                 
             print(f"🔍 Checking connection with profile: {public_id}")
             
-            # Method 1: Try the profileView endpoint (for name, basic info)
-            connection_data = self.check_via_profile_view(public_id)
-            if connection_data:
-                # Keep the profile name from this response
-                if connection_data.get('profile_name'):
-                    result['profile_name'] = connection_data['profile_name']
-                
-                # If we found distance info, use it
-                if connection_data.get('distance') is not None:
-                    result.update(connection_data)
-                    return result
-            
-            # Method 2: Try relationship endpoints (specifically for connection info)
-            relationship_data = self.check_via_relationship_endpoint(public_id)
-            if relationship_data and relationship_data.get('distance') is not None:
-                # Merge with existing data (keep the name from profileView if we have it)
-                if result.get('profile_name'):
-                    relationship_data['profile_name'] = result['profile_name']
-                result.update(relationship_data)
-                return result
-                
-            # Method 3: Try profile actions endpoint (for connection buttons/status)
-            actions_data = self.check_via_profile_actions(public_id)
-            if actions_data and actions_data.get('distance') is not None:
-                # Merge with existing data
-                if result.get('profile_name'):
-                    actions_data['profile_name'] = result['profile_name']
-                result.update(actions_data)
-                return result
+            # Strategies run in the order that has paid off best so far (see resolver_pipeline.py)
+            outcome = self.pipeline.run(public_id, base_headers)
+            if outcome.skipped:
+                print(f"⏭️ Skipping strategies that keep failing: {', '.join(outcome.skipped)}")
             
-            # Method 4: Try the general identity endpoint
-            identity_data = self.check_via_identity_api(public_id)
-            if identity_data:
-                # Merge with existing data
-                if result.get('profile_name'):
-                    identity_data['profile_name'] = result['profile_name']
-                result.update(identity_data)
-                return result
-                
-            # Method 5: Try hovering card endpoint (last resort)
-            card_data = self.check_via_hovering_card(public_id)
-            if card_data:
-                # Merge with existing data
+            # A name from an earlier response (e.g. profileView without distance) wins
+            for partial in outcome.partials:
+                if partial.get('profile_name') and not result.get('profile_name'):
+                    result['profile_name'] = partial['profile_name']
+            
+            if outcome.answer:
+                answer = dict(outcome.answer)
                 if result.get('profile_name'):
-                    card_data['profile_name'] = result['profile_name']
-                result.update(card_data)
+                    answer['profile_name'] = result['profile_name']
+                result.update(answer)
+                print(f"✅ Answered by {outcome.strategy} after {len(outcome.tried)} request(s)")
                 return result
                 
             # If we got here, we couldn't determine connection status but we might have the name
-            if result.get('profile_name'):
+            if not self.answered:
+                # Every endpoint failed (429, 403, expired cookies): not an answer, so not cached
+                result["error"] = "No endpoint answered (rate limited, blocked or signed out)"
+            elif result.get('profile_name'):
                 result["error"] = "Could not determine connection status, but found profile name"
             else:
                 result["error"] = "Could not determine connection status using any method"
@@ -173,12 +174,27 @@ class LinkedInConnectionChecker:
             result["error"] = f"Exception occurred: {str(e)}"
             return result
 
-    def check_via_profile_view(self, public_id: str) -> Optional[Dict]:
+    def check_via_data_export(self, public_id: str) -> Optional[Dict]:
+        """Check connection via the Connections.csv import (see data_export.py)"""
+        connection = self.store.find_connection(public_id)
+        if not connection:
+            return None
+        print(f"💾 Found in imported connections (connected on {connection['connected_on'] or 'unknown date'})")
+        return {
+            "is_connected": True,
+            "distance": 1,
+            "connection_status": "1st degree - Direct connection",
+            "profile_name": f"{connection['first_name']} {connection['last_name']}".strip() or None,
+            "connected_on": connection['connected_on'],
+            "source": "data_export",
+        }
+
+    def check_via_profile_view(self, public_id: str, base_headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         """Check connection via profileView endpoint"""
         try:
-            url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/profileView"
+            url = f"{VOYAGER_API}/identity/profiles/{public_id}/profileView"
             
-            headers = self.session.headers.copy()
+            headers = (base_headers or self.headers).copy()
             headers.update({
                 "referer": f"https://www.linkedin.com/in/{public_id}/",
                 "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{str(uuid.uuid4())}"
@@ -188,18 +204,10 @@ class LinkedInConnectionChecker:
             response = self.session.get(url, headers=headers)
             
             if response.status_code == 200:
-                data = response.json()
-                
-                # Save raw response for debugging
-                import os
-                debug_dir = "debug_responses"
-                if not os.path.exists(debug_dir):
-                    os.makedirs(debug_dir)
+                data = self.decode(response)
                 
-                debug_file = os.path.join(debug_dir, f"profileView_{public_id}.json")
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                print(f"💾 Saved raw response to: {debug_file}")
+                # Raw response for debugging (off unless --debug-capture; written in the background)
+                self.debug_capture.capture("profileView", public_id, data)
                 
                 return self.extract_connection_info(data, "profileView")
             else:
@@ -211,12 +219,12 @@ class LinkedInConnectionChecker:
             
         return None
 
-    def check_via_identity_api(self, public_id: str) -> Optional[Dict]:
+    def check_via_identity_api(self, public_id: str, base_headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         """Check connection via identity profiles endpoint"""
         try:
-            url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}"
+            url = f"{VOYAGER_API}/identity/profiles/{public_id}"
             
-            headers = self.session.headers.copy()
+            headers = (base_headers or self.headers).copy()
             headers.update({
                 "referer": f"https://www.linkedin.com/in/{public_id}/",
                 "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{str(uuid.uuid4())}"
@@ -226,18 +234,10 @@ class LinkedInConnectionChecker:
             response = self.session.get(url, headers=headers)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self.decode(response)
                 
-                # Save raw response for debugging
-                import os
-                debug_dir = "debug_responses"
-                if not os.path.exists(debug_dir):
-                    os.makedirs(debug_dir)
-                
-                debug_file = os.path.join(debug_dir, f"identity_{public_id}.json")
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                print(f"💾 Saved raw response to: {debug_file}")
+                # Raw response for debugging (off unless --debug-capture; written in the background)
+                self.debug_capture.capture("identity", public_id, data)
                 
                 return self.extract_connection_info(data, "identity")
             else:
@@ -249,20 +249,20 @@ class LinkedInConnectionChecker:
             
         return None
 
-    def check_via_hovering_card(self, public_id: str) -> Optional[Dict]:
+    def check_via_hovering_card(self, public_id: str, base_headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         """Check connection via hovering card endpoint"""
         try:
             # First get the profile to find the URN
-            profile_urn = self.get_profile_urn_for_public_id(public_id)
+            profile_urn = self.get_profile_urn_for_public_id(public_id, base_headers)
             if not profile_urn:
                 return None
                 
             # Extract just the ID part
             urn_id = profile_urn.split(':')[-1] if ':' in profile_urn else profile_urn
             
-            url = f"https://www.linkedin.com/voyager/api/identity/profiles/{urn_id}/profileContactInfo"
+            url = f"{VOYAGER_API}/identity/profiles/{urn_id}/profileContactInfo"
             
-            headers = self.session.headers.copy()
+            headers = (base_headers or self.headers).copy()
             headers.update({
                 "referer": f"https://www.linkedin.com/in/{public_id}/",
                 "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{str(uuid.uuid4())}"
@@ -272,7 +272,7 @@ class LinkedInConnectionChecker:
             response = self.session.get(url, headers=headers)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self.decode(response)
                 return self.extract_connection_info(data, "hoveringCard")
             else:
                 print(f"❌ Hovering card endpoint failed: {response.status_code}")
@@ -282,67 +282,69 @@ class LinkedInConnectionChecker:
             
         return None
 
-    def check_via_relationship_endpoint(self, public_id: str) -> Optional[Dict]:
-        """Check connection via relationship/network endpoint"""
+    def check_via_relationship_url(self, public_id: str, template: str,
+                                   base_headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
+        """Check connection via one relationship/network endpoint (a template from RELATIONSHIP_ENDPOINTS)"""
+        endpoint = template.format(public_id=public_id)
         try:
-            # Try multiple relationship endpoints
-            relationship_endpoints = [
-                f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/networkinfo",
-                f"https://www.linkedin.com/voyager/api/relationships/connectionDistance?profiles=List({public_id})",
-                f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/relationship",
-                f"https://www.linkedin.com/voyager/api/relationships/relationship/{public_id}",
-                f"https://www.linkedin.com/voyager/api/identity/shared/connections/{public_id}"
-            ]
-            
-            headers = self.session.headers.copy()
+            headers = (base_headers or self.headers).copy()
             headers.update({
                 "referer": f"https://www.linkedin.com/in/{public_id}/",
                 "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{str(uuid.uuid4())}"
             })
             
-            for endpoint in relationship_endpoints:
-                try:
-                    print(f"📞 Trying relationship endpoint: {endpoint}")
-                    response = self.session.get(endpoint, headers=headers)
-                    
-                    if response.status_code == 200:
-                        data = response.json()
-                        
-                        # Save debug data
-                        import os
-                        debug_dir = "debug_responses"
-                        if not os.path.exists(debug_dir):
-                            os.makedirs(debug_dir)
-                        
-                        endpoint_name = endpoint.split('/')[-1]
-                        debug_file = os.path.join(debug_dir, f"relationship_{endpoint_name}_{public_id}.json")
-                        with open(debug_file, 'w', encoding='utf-8') as f:
-                            json.dump(data, f, indent=2)
-                        print(f"💾 Saved relationship response to: {debug_file}")
-                        
-                        result = self.extract_connection_info(data, f"relationship_{endpoint_name}")
-                        if result and result.get('distance') is not None:
-                            return result
-                            
-                    else:
-                        print(f"❌ Endpoint failed: {response.status_code}")
-                        
-                except Exception as e:
-                    print(f"❌ Error with endpoint {endpoint}: {e}")
-                    continue
-                    
+            print(f"📞 Trying relationship endpoint: {endpoint}")
+            response = self.session.get(endpoint, headers=headers)
+            
+            if response.status_code == 200:
+                data = self.decode(response)
+                
+                endpoint_name = endpoint.split('/')[-1]
+                # Raw response for debugging (off unless --debug-capture; written in the background)
+                self.debug_capture.capture(f"relationship_{endpoint_name}", public_id, data)
+                
+                return self.extract_connection_info(data, f"relationship_{endpoint_name}")
+            else:
+                print(f"❌ Endpoint failed: {response.status_code}")
+                
         except Exception as e:
-            print(f"❌ Relationship endpoint method error: {e}")
+            print(f"❌ Error with endpoint {endpoint}: {e}")
             
         return None
 
-    def check_via_profile_actions(self, public_id: str) -> Optional[Dict]:
+    def connection_strategies(self) -> List[Strategy]:
+        """
+        The endpoint cascade as pipeline strategies, in the original order.
+        
+        Distance-bearing endpoints must return a distance to answer; the
+        identity and hovering card endpoints accept any parsed response
+        (usually "Not Connected") and so only run as fallbacks.
+        """
+        def has_distance(data: Dict) -> bool:
+            return data.get('distance') is not None
+        
+        strategies = [Strategy("profileView", self.check_via_profile_view, has_distance)]
+        for name, template in RELATIONSHIP_ENDPOINTS.items():
+            strategies.append(Strategy(
+                f"relationship_{name}",
+                lambda public_id, base_headers=None, template=template:
+                    self.check_via_relationship_url(public_id, template, base_headers),
+                has_distance,
+            ))
+        strategies += [
+            Strategy("profileActions", self.check_via_profile_actions, has_distance),
+            Strategy("identity", self.check_via_identity_api, bool, fallback=True),
+            Strategy("hoveringCard", self.check_via_hovering_card, bool, fallback=True),
+        ]
+        return strategies
+
+    def check_via_profile_actions(self, public_id: str, base_headers: Optional[Dict[str, str]] = None) -> Optional[Dict]:
         """Check connection via profile actions/cta endpoint"""
         try:
             # Try the profile CTA (Call To Action) endpoint which often has connection info
-            url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/profileActions"
+            url = f"{VOYAGER_API}/identity/profiles/{public_id}/profileActions"
             
-            headers = self.session.headers.copy()
+            headers = (base_headers or self.headers).copy()
             headers.update({
                 "referer": f"https://www.linkedin.com/in/{public_id}/",
                 "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;{str(uuid.uuid4())}"
@@ -352,18 +354,10 @@ class LinkedInConnectionChecker:
             response = self.session.get(url, headers=headers)
             
             if response.status_code == 200:
-                data = response.json()
+                data = self.decode(response)
                 
-                # Save debug data
-                import os
-                debug_dir = "debug_responses"
-                if not os.path.exists(debug_dir):
-                    os.makedirs(debug_dir)
-                
-                debug_file = os.path.join(debug_dir, f"profileActions_{public_id}.json")
-                with open(debug_file, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, indent=2)
-                print(f"💾 Saved profile actions response to: {debug_file}")
+                # Raw response for debugging (off unless --debug-capture; written in the background)
+                self.debug_capture.capture("profileActions", public_id, data)
                 
                 return self.extract_connection_info(data, "profileActions")
             else:
@@ -375,29 +369,36 @@ class LinkedInConnectionChecker:
             
         return None
 
-    def get_profile_urn_for_public_id(self, public_id: str) -> Optional[str]:
+    def get_profile_urn_for_public_id(self, public_id: str,
+                                      base_headers: Optional[Dict[str, str]] = None) -> Optional[str]:
         """Get profile URN for a public identifier"""
         try:
-            url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}"
-            response = self.session.get(url)
+            cached_urn = self.identity_cache.get_profile_urn(public_id)
+            if cached_urn:
+                print(f"✅ Found cached URN: {cached_urn}")
+                return cached_urn
+            
+            url = f"{VOYAGER_API}/identity/profiles/{public_id}"
+            response = self.session.get(url, headers=base_headers or self.headers)
             
             if response.status_code == 200:
-                data = response.json()
-                if 'entityUrn' in data:
-                    return data['entityUrn']
-                    
-                # Check in included elements
-                if 'included' in data:
-                    for element in data['included']:
-                        if 'entityUrn' in element and 'fsd_profile' in element['entityUrn']:
-                            return element['entityUrn']
+                data = self.decode(response)
+                # Top-level entityUrn (often fs_profile), else the fsd_profile in included elements
+                found_urn = data.get('entityUrn') or ResponseIndex(data).first_urn_in_namespace('fsd_profile')
+                if found_urn:
+                    # Same form the identity cache returns, whichever namespace the response used
+                    profile_urn = f"urn:li:fsd_profile:{found_urn.split(':')[-1]}"
+                    self.identity_cache.put_profile_urn(public_id, profile_urn)
+                    return profile_urn
                             
         except Exception as e:
             print(f"❌ Error getting profile URN: {e}")
             
         return None
 
-    def extract_connection_info(self, data: Dict, source: str) -> Optional[Dict]:
+    @classmethod
+    @timed("extract", "connection_info")
+    def extract_connection_info(cls, data: Dict, source: str) -> Optional[Dict]:
         """Extract connection information from API response"""
         try:
             result = {
@@ -413,8 +414,11 @@ class LinkedInConnectionChecker:
             if 'included' in data:
                 print(f"📊 Found {len(data['included'])} included elements")
             
+            # Index the included elements once; every lookup below uses it
+            index = ResponseIndex(data)
+            
             # Extract profile name with improved logic
-            name = self.extract_profile_name(data)
+            name = cls.extract_profile_name(data, index)
             if name:
                 result["profile_name"] = name
                 print(f"👤 Extracted name: {name}")
@@ -449,8 +453,8 @@ class LinkedInConnectionChecker:
                         pass
             
             # Method 2: Look in included elements for distance
-            if distance is None and 'included' in data:
-                for i, element in enumerate(data['included']):
+            if distance is None:
+                for i, element in index.with_field('distance', 'connectionDegree', 'relationshipDistance'):
                     if 'distance' in element:
                         print(f"🔍 Found distance in element {i}: {element['distance']}")
                         distance_data = element['distance']
@@ -527,7 +531,7 @@ class LinkedInConnectionChecker:
             
             # Method 4: Check for messaging availability
             if distance is None:
-                if self.check_messaging_availability(data):
+                if cls.check_messaging_availability(data):
                     distance = 1
                     print("🔍 Inferred connection from messaging availability")
             
@@ -559,8 +563,33 @@ class LinkedInConnectionChecker:
             traceback.print_exc()
             return None
 
-    def extract_profile_name(self, data: Dict) -> Optional[str]:
-        """Extract profile name from API response"""
+    @staticmethod
+    def _element_name_parts(element: Dict, position: int) -> Tuple[str, str]:
+        """Return (first, last) name strings from an included element"""
+        elem_first = ""
+        elem_last = ""
+        
+        for name_field in ['firstName', 'lastName']:
+            if name_field in element:
+                name_data = element[name_field]
+                print(f"🔍 Element {position} {name_field}: {name_data}")
+                
+                name_value = ""
+                if isinstance(name_data, str):
+                    name_value = name_data.strip()
+                elif isinstance(name_data, dict) and 'text' in name_data:
+                    name_value = name_data['text'].strip()
+                
+                if name_field == 'firstName':
+                    elem_first = name_value
+                else:
+                    elem_last = name_value
+        
+        return elem_first, elem_last
+
+    @classmethod
+    def extract_profile_name(cls, data: Dict, index: Optional[ResponseIndex] = None) -> Optional[str]:
+        """Extract profile name from API response (pass `index` to reuse an existing ResponseIndex)"""
         try:
             print(f"🔍 DEBUG: Looking for profile name...")
             
@@ -600,111 +629,53 @@ class LinkedInConnectionChecker:
                 return full_name
             
             # Method 3: Look in included elements for person profile
-            if 'included' in data:
-                print(f"🔍 Searching through {len(data['included'])} included elements...")
+            if index is None:
+                index = ResponseIndex(data)
+            
+            if index.included:
+                print(f"🔍 Searching through {len(index.included)} included elements...")
                 
                 # First, look for the main Profile and MiniProfile elements (most reliable)
-                person_profile_types = [
-                    'com.linkedin.voyager.identity.profile.Profile',
-                    'com.linkedin.voyager.identity.shared.MiniProfile'
-                ]
+                person_profile_types = [PROFILE_TYPE, MINI_PROFILE_TYPE]
                 
                 for target_type in person_profile_types:
-                    for i, element in enumerate(data['included']):
-                        element_type = element.get('$type', '')
+                    for i in index.positions_of_type(target_type):
+                        element = index.included[i]
+                        print(f"🔍 Found {target_type} at element {i}")
                         
-                        if element_type == target_type:
-                            print(f"🔍 Found {target_type} at element {i}")
-                            
-                            # Try to extract names from this element
-                            elem_first = ""
-                            elem_last = ""
-                            
-                            for name_field in ['firstName', 'lastName']:
-                                if name_field in element:
-                                    name_data = element[name_field]
-                                    print(f"🔍 Element {i} {name_field}: {name_data}")
-                                    
-                                    name_value = ""
-                                    if isinstance(name_data, str):
-                                        name_value = name_data.strip()
-                                    elif isinstance(name_data, dict) and 'text' in name_data:
-                                        name_value = name_data['text'].strip()
-                                    
-                                    if name_field == 'firstName':
-                                        elem_first = name_value
-                                    else:
-                                        elem_last = name_value
-                            
-                            if elem_first or elem_last:
-                                full_name = f"{elem_first} {elem_last}".strip()
-                                print(f"🔍 Found person name in {target_type}: '{full_name}'")
-                                return full_name
+                        elem_first, elem_last = cls._element_name_parts(element, i)
+                        if elem_first or elem_last:
+                            full_name = f"{elem_first} {elem_last}".strip()
+                            print(f"🔍 Found person name in {target_type}: '{full_name}'")
+                            return full_name
                 
                 # Fallback: look for any profile-related elements
-                for i, element in enumerate(data['included']):
-                    element_type = element.get('$type', '')
-                    entity_urn = element.get('entityUrn', '')
-                    
+                # Filtering happens once per distinct $type rather than once per element
+                person_positions = []
+                for element_type in index.types():
+                    type_lower = element_type.lower()
                     # Look for person-specific indicators, but exclude companies
-                    is_person = (
-                        'profile' in element_type.lower() and 
-                        'company' not in element_type.lower() and
-                        'minicompany' not in element_type.lower()
-                    )
+                    if 'profile' in type_lower and 'company' not in type_lower:
+                        person_positions.extend(index.positions_of_type(element_type))
+                
+                for i in sorted(person_positions):
+                    element = index.included[i]
+                    print(f"🔍 Found person-related element {i}: {element.get('$type', '')}")
                     
-                    if is_person:
-                        print(f"🔍 Found person-related element {i}: {element_type}")
-                        
-                        # Try to extract names from this element
-                        elem_first = ""
-                        elem_last = ""
-                        
-                        for name_field in ['firstName', 'lastName']:
-                            if name_field in element:
-                                name_data = element[name_field]
-                                print(f"🔍 Element {i} {name_field}: {name_data}")
-                                
-                                name_value = ""
-                                if isinstance(name_data, str):
-                                    name_value = name_data.strip()
-                                elif isinstance(name_data, dict) and 'text' in name_data:
-                                    name_value = name_data['text'].strip()
-                                
-                                if name_field == 'firstName':
-                                    elem_first = name_value
-                                else:
-                                    elem_last = name_value
-                        
-                        if elem_first or elem_last:
-                            full_name = f"{elem_first} {elem_last}".strip()
-                            print(f"🔍 Found person name in element {i}: '{full_name}'")
-                            return full_name
+                    elem_first, elem_last = cls._element_name_parts(element, i)
+                    if elem_first or elem_last:
+                        full_name = f"{elem_first} {elem_last}".strip()
+                        print(f"🔍 Found person name in element {i}: '{full_name}'")
+                        return full_name
                 
                 # Fallback: look for any firstName/lastName combination
                 print(f"🔍 Fallback: looking for any firstName/lastName in elements...")
-                for i, element in enumerate(data['included']):
-                    if 'firstName' in element and 'lastName' in element:
-                        first_data = element['firstName']
-                        last_data = element['lastName']
-                        
-                        elem_first = ""
-                        elem_last = ""
-                        
-                        if isinstance(first_data, str):
-                            elem_first = first_data.strip()
-                        elif isinstance(first_data, dict) and 'text' in first_data:
-                            elem_first = first_data['text'].strip()
-                        
-                        if isinstance(last_data, str):
-                            elem_last = last_data.strip()
-                        elif isinstance(last_data, dict) and 'text' in last_data:
-                            elem_last = last_data['text'].strip()
-                        
-                        if elem_first or elem_last:
-                            full_name = f"{elem_first} {elem_last}".strip()
-                            print(f"🔍 Found fallback name in element {i}: '{full_name}'")
-                            return full_name
+                for i in index.positions_with_all_fields('firstName', 'lastName'):
+                    elem_first, elem_last = cls._element_name_parts(index.included[i], i)
+                    if elem_first or elem_last:
+                        full_name = f"{elem_first} {elem_last}".strip()
+                        print(f"🔍 Found fallback name in element {i}: '{full_name}'")
+                        return full_name
             
             print(f"❌ Could not extract profile name")
             return None
@@ -715,7 +686,8 @@ class LinkedInConnectionChecker:
             traceback.print_exc()
             return None
 
-    def check_messaging_availability(self, data: Dict) -> bool:
+    @staticmethod
+    def check_messaging_availability(data: Dict) -> bool:
         """Check if messaging is available (indication of connection)"""
         try:
             data_str = json.dumps(data).lower()
@@ -761,32 +733,44 @@ class LinkedInConnectionChecker:
                 lines.append(f"📏 Network Distance: {result['distance']} degree(s)")
             
             if 'source' in result:
-                lines.append(f"🔍 Data Source: {result['source']}")
+                lines.append(f"🔍 Data Source: {result['source']}{' (cached)' if result.get('cached') else ''}")
         
         lines.append("=" * 80)
         
         return "\n".join(lines)
 
-def check_connection(profile_url: str) -> Dict:
+def check_connection(profile_url: str, use_cache: bool = True) -> Dict:
     """
     Simple function to check connection with a LinkedIn profile
     
     Args:
         profile_url: LinkedIn profile URL
+        use_cache: False re-checks even if a cached result exists
         
     Returns:
         Dict with connection status information
     """
     checker = LinkedInConnectionChecker()
-    result = checker.check_connection_status(profile_url)
+    result = checker.check_connection_status(profile_url, use_cache=use_cache)
     print(checker.format_result(result))
     return result
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
-        # Command line usage: python linkedin_connection_checker.py "https://linkedin.com/in/johndoe"
-        profile_url = sys.argv[1]
-        check_connection(profile_url)
+    # --profile[=sample] writes pstats and collapsed stacks (see profiling.py)
+    profile_mode = pop_profile_flag()
+    args = [arg for arg in sys.argv[1:] if arg != "--no-cache" and not arg.startswith("--debug-capture")]
+    
+    # --debug-capture keeps every raw response, --debug-capture=0.1 a 10% sample (see debug_capture.py)
+    for arg in sys.argv[1:]:
+        if arg.startswith("--debug-capture"):
+            rate = arg.partition("=")[2]
+            default_debug_capture().enable(float(rate) if rate else None)
+    
+    if args:
+        # Command line usage: python linkedin_connection_checker.py "https://linkedin.com/in/johndoe" [--no-cache] [--debug-capture[=RATE]] [--profile[=sample]]
+        profile_url = args[0]
+        run_profiled(profile_mode, "linkedin_connection_checker", check_connection,
+                     profile_url, use_cache="--no-cache" not in sys.argv)
     else:
         # Interactive usage
         checker = LinkedInConnectionChecker()
@@ -805,7 +789,8 @@ if __name__ == "__main__":
                 profile_url = input("Enter LinkedIn profile URL: ").strip()
                 if profile_url:
                     print("\n🔍 Checking connection status...")
-                    result = checker.check_connection_status(profile_url)
+                    result = run_profiled(profile_mode, "linkedin_connection_checker",
+                                          checker.check_connection_status, profile_url)
                     print(checker.format_result(result))
                     
                     # Ask if they want to save to file
@@ -2,78 +2,75 @@
 """
 LinkedIn Conversation Extractor
 Converts PowerShell API call to Python and extracts conversation URNs with name mapping
+
+The conversation list is kept in the local store (local_data/linkedin_local.db)
+and reused for CONVERSATION_CACHE_MAX_AGE seconds, so name lookups only hit
+LinkedIn when that copy is stale or has been invalidated. Refreshing it only
+fetches conversations updated since the newest one already stored. Every
+page fetched is kept in the raw response archive (see response_archive.py),
+so an improved extract_conversation_data can be rerun offline (reextract.py).
 """
 
 import requests
 import json
 import re
-from typing import Dict, List, Optional
+import time
+from typing import Dict, List, Optional, Tuple
 from urllib.parse import unquote
+from linkedin_client import CSRF_TOKEN, VOYAGER_API, default_session
+from local_store import LocalStore, default_local_store
+from metrics import timed, timed_json
+from name_index import NameIndex
+from response_archive import ResponseArchive, default_response_archive
 
-class LinkedInConversationExtractor:
-    def __init__(self):
-        self.session = requests.Session()
-        self.setup_session()
-        
-    def setup_session(self):
-        """Setup session with cookies and headers from PowerShell script"""
-        
-        # Updated cookies from your PowerShell script
-        cookies = {
-            "bcookie": "v=2&12e9e7e4-3797-4b9d-8b85-e67c6fbbcf80",
-            "li_sugr": "9c83b1f7-b3ab-47d6-8f9c-aac27e761ba1",
-            "bscookie": "v=1&20250507140639ea67aaf7-6f73-48ff-8813-9f6383cea24eAQEBEVVX01KNZ7vWOUKdmFDVKvhshdNt",
-            "JSESSIONID": "ajax:4763283604314235653",
-            "_guid": "c4c27323-6441-4b94-8a60-e2dae58ecd41",
-            "dfpfpt": "3c04e81e591e469e8cf3481efad5f950",
-            "timezone": "Asia/Dubai",
-            "li_theme": "light",
-            "li_theme_set": "app",
-            "lang": "v=2&lang=en-us",
-            "sdui_ver": "sdui-flagship:0.1.7528+sdui-flagship.production",
-            "AnalyticsSyncHistory": "AQK_eRy5LiZXJwAAAZe_qwIzZO_LbAvR1FcGJx_R_9rnkDNCrWvjKOrN4xZRuE9zGUzaO0h_W6fvC-YYrXQ8_g",
-            "lms_ads": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "lms_analytics": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "fptctx2": "taBcrIH61PuCVH7eNCyH0I1otfYAPn9VOPY9aMX8tO1OZsqBMQoiv4L3v0T63VjmZLQa16kvaMUYVUosFXHHtS3l3aC7%2bp1EFIAkHKyNtQRBhoos8j9BfdkViImt83dvAFqcppQGcz5heoO6EHiT%2f2WMpn0HnQ95d0aiXGAk8qxAFHAMLZtFLr%2blIlevK84W1%2b%2bkBdGvNOFAGbYVWU9%2bRQrmV1NCHYTbXWOVIMufooVyvn%2b2lWgJdSY0VV9at63Pp9oekq7qQy4YLLD0O7%2blXCahZrDDNixWQiWnqhEunmFk2yWWGzorslBwL41%2fpFSaILdUYnycPsPgWuVPqOAFnuNVzPw7iXHOHljjkisgY7M%3d",
-            "AMCVS_14215E3D5995C57C0A495C55@AdobeOrg": "1",
-            "AMCV_14215E3D5995C57C0A495C55@AdobeOrg": "-637568504|MCIDTS|20270|MCMID|27573806750435840703114589459359274076|MCOPTOUT-1751285608s|NONE|vVersion|5.1.1",
-            "g_state": '{"i_l":0}',
-            "liap": "true",
-            "li_at": "AQEDASP6v4EBfhJ7AAABl8BT3OQAAAGX5GBg5E0AocvtLBfU2unQg6KLYHNi6AG83PSJwqQdkZ2kcjhYnS0jlwh0Xy834jLziuj_Kdg3yOwz-L-QrbzlBOjMqHho03KrmOqhKNRdfYXUPajAOyj_oUg_",
-            "UserMatchHistory": "AQL952eah0yO1AAAAZfAf9ErXs9clfIaj4p_9O-EDIFvc9FTn07iQmplQcIggzP4oed3hB2u6qsGEpNjkWEglV-l6J0PryQSpFSGQ4qc1sEBEKRLo0JylLt5JgxGfkDmtqboWW2jQ7O8IR2L7EwzKSm-uI_Btw9wjtCUyER0D_SNZqWdybzLFnCBhF6eCP4hYO5X_5TvwkLDbRMuQxLxeNfPyXwmgouqF2TSxbmCbievRu6LDYiKCVh9JKPuNV9Y51agNEshKYNvq5GXwYXyGKCzNVlzX6lTRNXoed8FBC2uqMln5G6wc_UYURRjiENgAYCbw94TUuySeDKmTEhLM1pzCgK1QCX46H4ekkBOK8z_t5s67g",
-            "lidc": "b=VB85:s=V:r=V:a=V:p=V:g=5950:u=786:x=1:i=1751281293:t=1751364351:v=2:sig=AQEPC_Arm-2jtVZwbPC2G1qP4qzCtncR"
-        }
-        
-        # Set cookies in session
-        self.session.cookies.update(cookies)
-        
-        # Set User-Agent
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
-        })
+# How long a synced conversation list is trusted before refetching (seconds)
+CONVERSATION_CACHE_MAX_AGE = 15 * 60
+
+# Incremental sync paging: conversations per request and a cap on requests per sync
+SYNC_PAGE_SIZE = 20
+SYNC_MAX_PAGES = 50
 
-    def get_conversations(self, mailbox_urn: str = None, count: int = 20) -> Optional[Dict]:
+class LinkedInConversationExtractor:
+    def __init__(self, store: Optional[LocalStore] = None, max_age: float = CONVERSATION_CACHE_MAX_AGE,
+                 session: Optional[requests.Session] = None, archive: Optional[ResponseArchive] = None):
+        self.session = session if session is not None else default_session()
+        self.store = store or default_local_store()
+        self.archive = archive if archive is not None else default_response_archive()
+        self.max_age = max_age
+        
+        # In-memory copy of the conversation list and name mapping
+        self._conversations: Optional[List[Dict]] = None
+        self._name_mapping: Optional[Dict[str, Dict]] = None
+        self._name_index: Optional[NameIndex] = None
+        self._loaded_at = 0.0
+        
+    def get_conversations(self, mailbox_urn: str = None, count: int = 20,
+                          last_updated_before: Optional[int] = None) -> Optional[Dict]:
         """
         Get LinkedIn conversations using GraphQL API
         
         Args:
             mailbox_urn: Your mailbox URN (if None, uses default from PowerShell)
             count: Number of conversations to fetch
+            last_updated_before: Only conversations last active before this time (ms);
+                defaults to now, i.e. the most recent page
             
         Returns:
             JSON response from LinkedIn API
         """
+        if last_updated_before is None:
+            last_updated_before = int(time.time() * 1000)
         
         # Default mailbox URN from your PowerShell script
         if not mailbox_urn:
             mailbox_urn = "urn:li:fsd_profile:ACoAACP6v4EBbrCCbpgNB017RQfDpIJA4cgt_oc"
         
         # GraphQL endpoint and parameters from your PowerShell script
-        base_url = "https://www.linkedin.com/voyager/api/voyagerMessagingGraphQL/graphql"
+        base_url = f"{VOYAGER_API}/voyagerMessagingGraphQL/graphql"
         query_id = "messengerConversations.45338e053010d1c19147f92de6de3ae6"
         
         # Build variables parameter
-        variables = f"(query:(predicateUnions:List((conversationCategoryPredicate:(category:INBOX)))),count:{count},mailboxUrn:{mailbox_urn.replace(':', '%3A')},lastUpdatedBefore:1749318066019)"
+        variables = f"(query:(predicateUnions:List((conversationCategoryPredicate:(category:INBOX)))),count:{count},mailboxUrn:{mailbox_urn.replace(':', '%3A')},lastUpdatedBefore:{last_updated_before})"
         
         # Complete URL
         url = f"{base_url}?queryId={query_id}&variables={variables}"
@@ -84,7 +81,7 @@ class LinkedInConversationExtractor:
             "accept": "application/graphql",
             "accept-encoding": "gzip, deflate, br, zstd",
             "accept-language": "en-US,en;q=0.7",
-            "csrf-token": "ajax:4763283604314235653",
+            "csrf-token": CSRF_TOKEN,
             "priority": "u=1, i",
             "referer": "https://www.linkedin.com/messaging/thread/2-OTFiMjZmY2EtYzEwMC00MjE4LWEyNTMtY2YwNjM1YjVmZDkzXzAxMg==/",
             "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Brave";v="138"',
@@ -103,14 +100,21 @@ class LinkedInConversationExtractor:
         try:
             print(f"🔍 Fetching conversations from LinkedIn...")
             print(f"📧 Mailbox URN: {mailbox_urn}")
-            print(f"📊 Count: {count}")
+            print(f"📊 Count: {count}, updated before: {last_updated_before}")
             
             response = self.session.get(url, headers=headers)
             
             print(f"📈 Status Code: {response.status_code}")
             
             if response.status_code == 200:
-                return response.json()
+                data = timed_json(response)
+                # Keep the raw page for offline re-extraction (reextract.py)
+                try:
+                    self.archive.append("messengerConversations",
+                                        f"{mailbox_urn}|lastUpdatedBefore={last_updated_before}", data)
+                except OSError as e:
+                    print(f"⚠️ Could not archive conversations page: {e}")
+                return data
             else:
                 print(f"❌ Error: {response.status_code}")
                 print(f"Response: {response.text}")
@@ -120,7 +124,9 @@ class LinkedInConversationExtractor:
             print(f"❌ Exception occurred: {e}")
             return None
 
-    def extract_conversation_data(self, api_response: Dict) -> List[Dict]:
+    @staticmethod
+    @timed("extract", "conversations")
+    def extract_conversation_data(api_response: Dict) -> List[Dict]:
         """
         Extract conversation data from LinkedIn API response
         
@@ -241,7 +247,8 @@ class LinkedInConversationExtractor:
                 if profile_urn == your_urn:
                     continue
                 
-                if profile_urn and (full_name or first_name):
+                # Conversations imported from the data export may only know the public id
+                if (profile_urn or public_id) and (full_name or first_name):
                     # Create multiple mappings for easier lookup
                     keys_to_map = []
                     
@@ -270,6 +277,164 @@ class LinkedInConversationExtractor:
         
         return name_mapping
 
+    def sync_conversations(self, full: bool = False, count: int = SYNC_PAGE_SIZE,
+                           max_pages: int = SYNC_MAX_PAGES) -> Optional[List[Dict]]:
+        """
+        Fetch conversations updated since the last sync and merge them into the local store.
+        
+        Pages go newest first, each one asking for conversations updated before the
+        oldest seen so far (lastUpdatedBefore). Paging stops at the first conversation
+        not newer than the stored cursor, so a routine refresh is a single request.
+        
+        If paging stops before that (a failed page, max_pages), the newest part of
+        the inbox is still current: the cursor advances and the list counts as
+        synced, and where paging stopped is saved as the backfill point. Later
+        syncs spend the pages they have left after catching up on continuing
+        from there, until the gap is closed.
+        
+        Args:
+            full: Ignore the cursor and walk back through the whole inbox (up to max_pages)
+            count: Conversations per request
+            max_pages: Upper bound on requests for this sync
+            
+        Returns:
+            The new or updated conversations, or None if the first request failed
+        """
+        cursor = None if full else self.store.conversation_cursor()
+        backfill = None if full else self.store.conversation_backfill()
+        # Keyed by URN: the conversations on a page boundary are fetched twice
+        changed: Dict[str, Dict] = {}
+        
+        resume, pages = self._walk_conversations(changed, None, cursor, count, max_pages)
+        if not pages:
+            return None
+        if resume is not None:
+            # The new gap runs down to the cursor, or past it to the end of a pending backfill
+            backfill = (resume, backfill[1] if backfill else cursor)
+        elif backfill is not None and pages < max_pages:
+            resume, _ = self._walk_conversations(changed, backfill[0], backfill[1], count, max_pages - pages)
+            backfill = (resume, backfill[1]) if resume is not None else None
+        
+        changed_list = list(changed.values())
+        # Resume point first: if the process dies in between, the next sync refetches a little
+        self.store.set_conversation_backfill(backfill)
+        self.store.save_conversations(changed_list)
+        if backfill is not None:
+            print("⚠️ Older conversations are still missing; the next sync continues fetching them")
+        print(f"🔄 Synced {len(changed_list)} new/updated conversations "
+              f"({'full' if cursor is None else 'since ' + str(cursor)})")
+        return changed_list
+    
+    def _walk_conversations(self, changed: Dict[str, Dict], before: Optional[int], until: Optional[int],
+                            count: int, max_pages: int) -> Tuple[Optional[int], int]:
+        """
+        Page back from `before` (None = now), adding conversations active after
+        `until` (None = all) to `changed`.
+        
+        Returns:
+            (where to resume, pages fetched): the lastUpdatedBefore for the next
+            page, or None once `until` or the end of the inbox was reached
+        """
+        for page in range(max_pages):
+            api_response = self.get_conversations(count=count, last_updated_before=before)
+            if not api_response:
+                return before if before is not None else int(time.time() * 1000), page
+            
+            conversations = self.extract_conversation_data(api_response)
+            if not conversations:
+                return None, page + 1
+            
+            newer = [c for c in conversations if until is None or c.get('last_activity', 0) > until]
+            for conversation in newer:
+                changed[conversation.get('conversation_urn') or str(id(conversation))] = conversation
+            
+            oldest = min(c.get('last_activity', 0) for c in conversations)
+            if len(newer) < len(conversations) or len(conversations) < count or not oldest:
+                # Reached `until`, or the end of the inbox
+                return None, page + 1
+            # lastUpdatedBefore is strict; ask from just past the oldest timestamp so
+            # conversations sharing it aren't skipped (unless a whole page shares it)
+            before = oldest if before == oldest + 1 else oldest + 1
+        return before, max_pages
+
+    def load_conversations(self, refresh: bool = False, offline: bool = False) -> Optional[List[Dict]]:
+        """
+        Conversation list from memory, then the local store, then LinkedIn.
+        
+        When the stored list is stale only the conversations updated since the
+        last sync are fetched (see sync_conversations) and merged into it.
+        
+        Args:
+            refresh: Sync with LinkedIn even if the cached copies are still fresh
+            offline: Never sync; use the stored list however old (or empty) it is
+            
+        Returns:
+            List of conversation data (see extract_conversation_data) or None if the fetch failed
+        """
+        if offline:
+            if self._conversations is None:
+                age = self.store.conversations_age()
+                conversations = self.store.load_conversations()
+                print(f"💾 Using {len(conversations)} stored conversations (offline)")
+                # Loaded, but still stale for the next online lookup unless recently synced
+                self._remember(conversations, time.time() - age if age is not None else 0.0)
+            return self._conversations
+        
+        if not refresh and self._conversations is not None and time.time() - self._loaded_at < self.max_age:
+            return self._conversations
+        
+        if not refresh:
+            age = self.store.conversations_age()
+            if age is not None and age < self.max_age:
+                conversations = self.store.load_conversations()
+                print(f"💾 Using {len(conversations)} stored conversations (synced {int(age)}s ago)")
+                self._remember(conversations, time.time() - age)
+                return conversations
+        
+        if self.sync_conversations() is None:
+            return None
+        
+        conversations = self.store.load_conversations()
+        self._remember(conversations, time.time())
+        return conversations
+    
+    def _remember(self, conversations: List[Dict], loaded_at: float):
+        self._conversations = conversations
+        self._name_mapping = None
+        self._name_index = None
+        self._loaded_at = loaded_at
+    
+    def get_name_mapping(self, refresh: bool = False, offline: bool = False) -> Optional[Dict[str, Dict]]:
+        """Name → URN mapping built from the (possibly cached) conversation list"""
+        conversations = self.load_conversations(refresh=refresh, offline=offline)
+        if conversations is None:
+            return None
+        if self._name_mapping is None:
+            self._name_mapping = self.create_name_mapping(conversations)
+        return self._name_mapping
+    
+    def get_name_index(self, refresh: bool = False, offline: bool = False) -> Optional[NameIndex]:
+        """Ranked fuzzy index over the name mapping, built on first use"""
+        name_mapping = self.get_name_mapping(refresh=refresh, offline=offline)
+        if name_mapping is None:
+            return None
+        if self._name_index is None:
+            self._name_index = NameIndex(name_mapping)
+        return self._name_index
+    
+    def invalidate_conversation_cache(self, full: bool = False):
+        """
+        Forget the cached conversation list so the next lookup syncs it.
+        
+        With `full`, that sync walks the whole inbox again instead of only
+        fetching conversations updated since the last one.
+        """
+        self._conversations = None
+        self._name_mapping = None
+        self._name_index = None
+        self._loaded_at = 0.0
+        self.store.invalidate_conversations(drop_cursor=full)
+
     def extract_public_id_from_url(self, profile_url: str) -> Optional[str]:
         """
         Extract public identifier from LinkedIn profile URL
@@ -313,27 +478,22 @@ class LinkedInConversationExtractor:
         # This would require LinkedIn search API which has different limitations
         return False
 
-    def get_urns_by_name(self, name_or_url: str) -> Optional[Dict]:
+    def get_urns_by_name(self, name_or_url: str, refresh: bool = False, offline: bool = False) -> Optional[Dict]:
         """
         Get URNs for a specific person by name or LinkedIn profile URL
         
         Args:
             name_or_url: Person's name (first name, full name) or LinkedIn profile URL
+            refresh: Refetch the conversation list instead of using the cached one
+            offline: Only look in the stored conversation list, never sync it
             
         Returns:
             Dictionary with mailbox_urn and conversation_urn
         """
-        # Get fresh conversation data
-        api_response = self.get_conversations()
-        if not api_response:
+        name_mapping = self.get_name_mapping(refresh=refresh, offline=offline)
+        if name_mapping is None:
             return None
         
-        # Extract conversations
-        conversations = self.extract_conversation_data(api_response)
-        
-        # Create name mapping
-        name_mapping = self.create_name_mapping(conversations)
-        
         # Check if input is a LinkedIn URL
         if 'linkedin.com/in/' in name_or_url:
             print(f"🔗 Detected LinkedIn profile URL: {name_or_url}")
@@ -345,11 +505,11 @@ class LinkedInConversationExtractor:
                     print(f"✅ Found by public ID: {public_id}")
                     return name_mapping[public_id]
                 
-                # Try partial matching for public ID
-                for mapped_name, data in name_mapping.items():
-                    if public_id in mapped_name or mapped_name in public_id:
-                        print(f"✅ Found by partial public ID match: {mapped_name}")
-                        return data
+                # Try partial matching for public ID (typos are too risky for URLs)
+                match = self.get_name_index(refresh=refresh, offline=offline).search(public_id, limit=1, fuzzy=False)
+                if match:
+                    print(f"✅ Found by partial public ID match: {match[0].key}")
+                    return match[0].data
             
             print(f"❌ No conversation found for LinkedIn URL: {name_or_url}")
             return None
@@ -362,25 +522,31 @@ class LinkedInConversationExtractor:
             print(f"✅ Found by exact name match: {name_lower}")
             return name_mapping[name_lower]
         
-        # Try partial matching
-        for mapped_name, data in name_mapping.items():
-            if name_lower in mapped_name or mapped_name in name_lower:
-                print(f"✅ Found by partial name match: {mapped_name}")
-                return data
+        # Ranked prefix / substring / typo matching
+        matches = self.get_name_index(refresh=refresh, offline=offline).search(name_lower, limit=5)
+        if matches and matches[0].kind != "fuzzy":
+            best = matches[0]
+            print(f"✅ Found by {best.kind} name match: {best.key} (score {best.score:.2f})")
+            others = [m.key for m in matches[1:] if m.data is not best.data]
+            if others:
+                print(f"   Other candidates: {', '.join(others)}")
+            return best.data
         
         print(f"❌ No conversation found for name: {name_or_url}")
+        if matches:
+            # Typo matches are only suggestions: a message must never go to a different person
+            print(f"   Did you mean: {', '.join(m.key for m in matches)}?")
         return None
 
     def print_all_conversations(self):
         """Print all conversations with participant details"""
         
-        api_response = self.get_conversations()
-        if not api_response:
+        conversations = self.load_conversations()
+        if conversations is None:
             print("❌ Failed to get conversations")
             return
         
-        conversations = self.extract_conversation_data(api_response)
-        name_mapping = self.create_name_mapping(conversations)
+        name_mapping = self.get_name_mapping()
         
         print("\n" + "="*80)
         print("📋 ALL LINKEDIN CONVERSATIONS")
@@ -412,6 +578,15 @@ class LinkedInConversationExtractor:
             print(f"      -> Conversation: {data['conversation_urn']}")
             print()
 
+_default_extractor: Optional[LinkedInConversationExtractor] = None
+
+def default_conversation_extractor() -> LinkedInConversationExtractor:
+    """Process-wide extractor, so repeated lookups reuse its in-memory mapping"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = LinkedInConversationExtractor()
+    return _default_extractor
+
 # Quick helper functions
 def get_urns_for_person(name_or_url: str) -> Optional[Dict]:
     """
@@ -2,6 +2,10 @@
 """
 LinkedIn Messages Viewer
 Shows all messages between you and a specific person by name
+
+Messages are appended to the local store (local_data/linkedin_local.db) as
+they are fetched. Viewing a conversation again only asks LinkedIn for what is
+newer than the last stored message and renders the rest from disk.
 """
 
 import requests
@@ -10,56 +14,25 @@ from datetime import datetime
 from typing import Dict, List, Optional
 from urllib.parse import quote
 from linkedin_conversation_extractor import LinkedInConversationExtractor
+from linkedin_client import CSRF_TOKEN, VOYAGER_API, default_session
+from local_store import LocalStore, default_local_store
+from metrics import timed, timed_json
+from data_export import EXPORT_MESSAGE_PREFIX
 
 class LinkedInMessagesViewer:
-    def __init__(self):
-        self.session = requests.Session()
-        self.setup_session()
-        self.extractor = LinkedInConversationExtractor()
-        
-    def setup_session(self):
-        """Setup session with cookies and headers from PowerShell script"""
-        
-        # Updated cookies from your PowerShell script
-        cookies = {
-            "bcookie": "v=2&12e9e7e4-3797-4b9d-8b85-e67c6fbbcf80",
-            "li_sugr": "9c83b1f7-b3ab-47d6-8f9c-aac27e761ba1",
-            "bscookie": "v=1&20250507140639ea67aaf7-6f73-48ff-8813-9f6383cea24eAQEBEVVX01KNZ7vWOUKdmFDVKvhshdNt",
-            "JSESSIONID": "ajax:4763283604314235653",
-            "_guid": "c4c27323-6441-4b94-8a60-e2dae58ecd41",
-            "dfpfpt": "3c04e81e591e469e8cf3481efad5f950",
-            "timezone": "Asia/Dubai",
-            "li_theme": "light",
-            "li_theme_set": "app",
-            "lang": "v=2&lang=en-us",
-            "sdui_ver": "sdui-flagship:0.1.7528+sdui-flagship.production",
-            "AnalyticsSyncHistory": "AQK_eRy5LiZXJwAAAZe_qwIzZO_LbAvR1FcGJx_R_9rnkDNCrWvjKOrN4xZRuE9zGUzaO0h_W6fvC-YYrXQ8_g",
-            "lms_ads": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "lms_analytics": "AQFoZ9eixF7W9QAAAZe_qwNjC795bG516Cjoay0Fp4cps3lqbp22VjVaACbyOztnJzCZ6lCz7HhEPJ3UOOWXqkL1SFU_gjmk",
-            "fptctx2": "taBcrIH61PuCVH7eNCyH0I1otfYAPn9VOPY9aMX8tO1OZsqBMQoiv4L3v0T63VjmZLQa16kvaMUYVUosFXHHtS3l3aC7%2bp1EFIAkHKyNtQRBhoos8j9BfdkViImt83dvAFqcppQGcz5heoO6EHiT%2f2WMpn0HnQ95d0aiXGAk8qxAFHAMLZtFLr%2blIlevK84W1%2b%2bkBdGvNOFAGbYVWU9%2bRQrmV1NCHYTbXWOVIMufooVyvn%2b2lWgJdSY0VV9at63Pp9oekq7qQy4YLLD0O7%2blXCahZrDDNixWQiWnqhEunmFk2yWWGzorslBwL41%2fpFSaILdUYnycPsPgWuVPqOAFnuNVzPw7iXHOHljjkisgY7M%3d",
-            "AMCVS_14215E3D5995C57C0A495C55@AdobeOrg": "1",
-            "AMCV_14215E3D5995C57C0A495C55@AdobeOrg": "-637568504|MCIDTS|20270|MCMID|27573806750435840703114589459359274076|MCOPTOUT-1751285608s|NONE|vVersion|5.1.1",
-            "g_state": '{"i_l":0}',
-            "liap": "true",
-            "li_at": "AQEDASP6v4EBfhJ7AAABl8BT3OQAAAGX5GBg5E0AocvtLBfU2unQg6KLYHNi6AG83PSJwqQdkZ2kcjhYnS0jlwh0Xy834jLziuj_Kdg3yOwz-L-QrbzlBOjMqHho03KrmOqhKNRdfYXUPajAOyj_oUg_",
-            "UserMatchHistory": "AQKiB7Llh0h5CQAAAZfAzXrmCXAhnShmdUN0FvF8Es2ZeNaRCmct8q0-S1Ddqopi_SycvSKRb49MiK9AS3cJKZrwp_sa8bRYUrSwYtHjWey1gs7IdGFey4EkhbDn-gacF7IVWHbEq853dlv3k51Xg_QnSRDWZj7W8OWyQEAkzh5Opv9FX2epXGZQl0CmkaVhpnBrf9h6MwAGmxFlkXANNJ3CKSTBv61DQw87g5a_Cm86FS_GsBO9c7shNBmraSgxD-C3jxl8gBJ8UECnagqMbKfEknF3ZM5LBATJhV6LPTDiqSmaQc0nX1jE63pH3OPqgPYWcHzhBak1uE2Hl8Dvbhc-i9A9ZO7k87B_IBjYsd-47qITiw",
-            "lidc": "b=OGST08:s=O:r=O:a=O:p=O:g=3239:u=1:x=1:i=1751286381:t=1751372781:v=2:sig=AQFU3gS41--2hDPcPVRLGY0B5NNnW-3M"
-        }
-        
-        # Set cookies in session
-        self.session.cookies.update(cookies)
-        
-        # Set User-Agent
-        self.session.headers.update({
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36"
-        })
-
-    def get_messages(self, conversation_urn: str) -> Optional[Dict]:
+    def __init__(self, store: Optional[LocalStore] = None, session: Optional[requests.Session] = None):
+        self.session = session if session is not None else default_session()
+        self.store = store or default_local_store()
+        self.extractor = LinkedInConversationExtractor(store=self.store, session=self.session)
+        
+    def get_messages(self, conversation_urn: str, sync_token: Optional[str] = None) -> Optional[Dict]:
         """
-        Get all messages from a specific conversation using GraphQL API
+        Get messages from a specific conversation using GraphQL API
         
         Args:
             conversation_urn: The conversation URN to fetch messages from
+            sync_token: newSyncToken from an earlier response; only messages
+                since that response are returned
             
         Returns:
             JSON response from LinkedIn messages API
@@ -67,12 +40,15 @@ class LinkedInMessagesViewer:
         
         try:
             # GraphQL endpoint and parameters from your PowerShell script
-            base_url = "https://www.linkedin.com/voyager/api/voyagerMessagingGraphQL/graphql"
+            base_url = f"{VOYAGER_API}/voyagerMessagingGraphQL/graphql"
             query_id = "messengerMessages.455dde239612d966346c1d1c4352f648"
             
             # URL encode the conversation URN
             encoded_urn = quote(conversation_urn, safe='')
-            variables = f"(conversationUrn:{encoded_urn})"
+            if sync_token:
+                variables = f"(syncToken:{quote(sync_token, safe='')},conversationUrn:{encoded_urn})"
+            else:
+                variables = f"(conversationUrn:{encoded_urn})"
             
             # Complete URL
             url = f"{base_url}?queryId={query_id}&variables={variables}"
@@ -86,7 +62,7 @@ class LinkedInMessagesViewer:
                 "accept": "application/graphql",
                 "accept-encoding": "gzip, deflate, br, zstd",
                 "accept-language": "en-US,en;q=0.7",
-                "csrf-token": "ajax:4763283604314235653",
+                "csrf-token": CSRF_TOKEN,
                 "priority": "u=1, i",
                 "referer": f"https://www.linkedin.com/messaging/thread/{conversation_urn.split(',')[-1].rstrip(')')}/",
                 "sec-ch-ua": '"Not)A;Brand";v="8", "Chromium";v="138", "Brave";v="138"',
@@ -107,7 +83,7 @@ class LinkedInMessagesViewer:
             print(f"📈 Status Code: {response.status_code}")
             
             if response.status_code == 200:
-                return response.json()
+                return timed_json(response)
             else:
                 print(f"❌ Error: {response.status_code}")
                 print(f"Response: {response.text}")
@@ -117,12 +93,15 @@ class LinkedInMessagesViewer:
             print(f"❌ Exception occurred: {e}")
             return None
 
-    def extract_messages(self, api_response: Dict) -> List[Dict]:
+    @timed("extract", "messages")
+    def extract_messages(self, api_response: Dict, newer_than: Optional[int] = None) -> List[Dict]:
         """
         Extract message data from LinkedIn messages API response
         
         Args:
             api_response: JSON response from LinkedIn messages API
+            newer_than: Skip messages delivered at or before this time (ms),
+                i.e. the ones already in the local store
             
         Returns:
             List of message data with text, sender, timestamp, etc.
@@ -138,6 +117,11 @@ class LinkedInMessagesViewer:
             print(f"📊 Found {len(elements)} messages")
             
             for element in elements:
+                # Get timestamp
+                delivered_at = element.get('deliveredAt', 0)
+                if newer_than is not None and (delivered_at or 0) <= newer_than:
+                    continue
+                
                 message = {}
                 
                 # Get message text
@@ -145,8 +129,6 @@ class LinkedInMessagesViewer:
                 message_text = body.get('text', '') if body else ''
                 message['text'] = message_text
                 
-                # Get timestamp
-                delivered_at = element.get('deliveredAt', 0)
                 message['timestamp'] = delivered_at
                 message['datetime'] = datetime.fromtimestamp(delivered_at / 1000) if delivered_at else None
                 
@@ -184,6 +166,40 @@ class LinkedInMessagesViewer:
             
         return messages
 
+    def sync_messages(self, conversation_urn: str) -> Optional[int]:
+        """
+        Append messages newer than the last stored one to the local store.
+        
+        Uses the conversation's stored syncToken so LinkedIn only returns what
+        changed since the previous fetch; without one (first view, or the token
+        was rejected) the full list is fetched once. Either way only messages
+        delivered after the newest stored message are parsed and appended.
+        
+        Returns:
+            Number of new messages, or None if LinkedIn could not be reached
+        """
+        newest = self.store.newest_message_time(conversation_urn)
+        sync_token = self.store.message_sync_token(conversation_urn)
+        if newest is not None:
+            latest = self.store.load_messages(conversation_urn, limit=1)
+            if latest and latest[0]['message_urn'].startswith(EXPORT_MESSAGE_PREFIX):
+                # Export dates are to the second; don't re-add that message with its API timestamp
+                newest += 999
+        
+        api_response = self.get_messages(conversation_urn, sync_token=sync_token)
+        if not api_response and sync_token:
+            print("⚠️ Sync token rejected, fetching the full conversation")
+            self.store.drop_message_sync_token(conversation_urn)
+            api_response = self.get_messages(conversation_urn)
+        if not api_response:
+            return None
+        
+        messages = self.extract_messages(api_response, newer_than=newest)
+        metadata = (api_response.get('data', {}).get('messengerMessagesBySyncToken') or {}).get('metadata') or {}
+        added = self.store.save_messages(conversation_urn, messages, sync_token=metadata.get('newSyncToken'))
+        print(f"🔄 {added} new messages, {self.store.message_count(conversation_urn)} stored")
+        return added
+
     def format_messages(self, messages: List[Dict], participant_name: str) -> str:
         """
         Format messages for display in chat format
@@ -252,12 +268,14 @@ class LinkedInMessagesViewer:
         
         return "\n".join(formatted)
 
-    def view_messages_by_name(self, person_name: str) -> str:
+    def view_messages_by_name(self, person_name: str, sync: bool = True) -> str:
         """
         Get and display all messages with a specific person by their name
         
         Args:
             person_name: Name of the person to view messages with
+            sync: Fetch messages newer than the stored ones first; with False
+                only the local store is read (conversation list included)
             
         Returns:
             Formatted conversation string
@@ -267,7 +285,7 @@ class LinkedInMessagesViewer:
         print("-" * 50)
         
         # Step 1: Get the conversation URN for this person
-        result = self.extractor.get_urns_by_name(person_name)
+        result = self.extractor.get_urns_by_name(person_name, offline=not sync)
         
         if not result:
             return f"❌ No conversation found with '{person_name}'. Make sure you have an existing conversation with this person."
@@ -278,14 +296,14 @@ class LinkedInMessagesViewer:
         print(f"✅ Found conversation with: {full_name}")
         print(f"📞 Conversation URN: {conversation_urn}")
         
-        # Step 2: Get all messages from this conversation
-        api_response = self.get_messages(conversation_urn)
+        # Step 2: Append new messages to the local store
+        if sync and self.sync_messages(conversation_urn) is None:
+            if not self.store.message_count(conversation_urn):
+                return f"❌ Failed to fetch messages from conversation with {full_name}"
+            print("⚠️ Could not reach LinkedIn, showing stored messages")
         
-        if not api_response:
-            return f"❌ Failed to fetch messages from conversation with {full_name}"
-        
-        # Step 3: Extract and format messages
-        messages = self.extract_messages(api_response)
+        # Step 3: Render the whole conversation from disk
+        messages = self.store.load_messages(conversation_urn)
         
         if not messages:
             return f"❌ No messages found in conversation with {full_name}"
@@ -295,25 +313,33 @@ class LinkedInMessagesViewer:
         
         return formatted_conversation
 
-def view_conversation(person_name: str):
+def view_conversation(person_name: str, sync: bool = True):
     """
     Simple function to view conversation with a person
     
     Args:
         person_name: Name of the person to view messages with
+        sync: Fetch new messages first (False renders only what is stored)
     """
     viewer = LinkedInMessagesViewer()
-    conversation = viewer.view_messages_by_name(person_name)
+    conversation = viewer.view_messages_by_name(person_name, sync=sync)
     print(conversation)
     return conversation
 
 if __name__ == "__main__":
     import sys
+    from profiling import pop_profile_flag, run_profiled
+    
+    # --profile[=sample] writes pstats and collapsed stacks (see profiling.py)
+    profile_mode = pop_profile_flag()
+    args = sys.argv[1:]
+    offline = "--offline" in args
+    args = [arg for arg in args if arg != "--offline"]
     
-    if len(sys.argv) > 1:
-        # Command line usage: python linkedin_messages_viewer.py "oussama"
-        name = " ".join(sys.argv[1:])
-        view_conversation(name)
+    if args:
+        # Command line usage: python linkedin_messages_viewer.py "oussama" [--offline] [--profile[=sample]]
+        name = " ".join(args)
+        run_profiled(profile_mode, "linkedin_messages_viewer", view_conversation, name, sync=not offline)
     else:
         # Interactive usage
         viewer = LinkedInMessagesViewer()
@@ -332,7 +358,8 @@ if __name__ == "__main__":
                 name = input("Enter person's name: ").strip()
                 if name:
                     print()
-                    conversation = viewer.view_messages_by_name(name)
+                    conversation = run_profiled(profile_mode, "linkedin_messages_viewer",
+                                                viewer.view_messages_by_name, name)
                     print(conversation)
                     
                     # Ask if they want to save to file
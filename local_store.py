@@ -0,0 +1,774 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Local Store
+
+SQLite database (local_data/linkedin_local.db) holding what the messaging
+scripts have already fetched, so repeat lookups don't need to refetch the
+inbox. Conversations are stored with their participants; `sync_state` keeps
+small bookkeeping values such as when the conversation list was last synced.
+
+Messages are append-only: each conversation's messages are inserted once
+(keyed by message URN) and indexed on (conversation_urn, delivered_at), so the
+viewer only has to fetch what arrived after the newest stored message. A
+full-text index (SQLite FTS5) over message text and sender names is kept in
+step with the table by triggers, so stored history can be searched offline.
+
+First-degree connections imported from LinkedIn's data export
+(Connections.csv, see data_export.py) are keyed by public identifier and
+profile URL, so connection checks can be answered without a request.
+`resolver_stats` holds per-strategy hit and latency counters for
+resolver_pipeline.py. `posts` keeps search results from the scraper, keyed by
+post URL.
+
+Usage:
+    store = default_local_store()
+    store.save_conversations(conversations)       # output of extract_conversation_data
+    store.load_conversations()
+    store.find_conversation_urn('urn:li:fsd_profile:ACoAA...')
+    store.conversations_age()                     # seconds since last sync, or None
+    store.conversation_cursor()                   # newest lastActivityAt merged so far
+    store.conversation_backfill()                 # where an unfinished sync resumes, or None
+    store.invalidate_conversations()
+    store.save_messages(conversation_urn, messages)   # output of extract_messages
+    store.load_messages(conversation_urn)
+    store.newest_message_time(conversation_urn)
+    store.search_messages('invoice', since=time.time() * 1000 - 90 * 86400000)
+    store.find_connection('https://www.linkedin.com/in/johndoe/')
+    store.save_posts(posts, search='hiring marketing dubai', page_start=10)   # output of extract_posts_from_json
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from identity_cache import normalize_public_id
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+LOCAL_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "local_data")
+LOCAL_STORE_PATH = os.path.join(LOCAL_DATA_DIR, "linkedin_local.db")
+
+CONVERSATIONS_SYNCED_AT = "conversations_synced_at"
+# Newest lastActivityAt (ms) merged into the store; incremental syncs stop there
+CONVERSATIONS_CURSOR = "conversations_newest_activity"
+# "before:until" - older conversations a sync ran out of pages for (see conversation_backfill)
+CONVERSATIONS_BACKFILL = "conversations_backfill"
+
+CONNECTIONS_IMPORTED_AT = "connections_imported_at"
+
+# Per-conversation messaging syncToken, suffixed with the conversation URN
+MESSAGES_SYNC_TOKEN = "messages_sync_token:"
+
+PARTICIPANT_FIELDS = (
+    "profile_urn", "host_identity_urn", "entity_urn", "first_name", "last_name",
+    "full_name", "headline", "profile_url", "public_identifier",
+)
+
+MESSAGE_FIELDS = (
+    "backend_urn", "sender_urn", "sender_name", "sender_first_name", "sender_last_name", "text",
+)
+
+CONNECTION_FIELDS = (
+    "profile_url", "first_name", "last_name", "email", "company", "position", "connected_on",
+)
+
+POST_FIELDS = ("author_name", "profile_url", "post_content", "post_url")
+
+# Full-text index over messages; external content, so the text is stored once
+MESSAGES_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE messages_fts USING fts5 (
+    text, sender_name,
+    content = 'messages', content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+{insert_trigger}
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text, sender_name)
+    VALUES ('delete', old.rowid, old.text, old.sender_name);
+END;
+INSERT INTO messages_fts (messages_fts) VALUES ('rebuild');
+"""
+
+# Dropped during bulk imports, which index the new rows in one statement instead
+MESSAGES_FTS_INSERT_TRIGGER = """
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text, sender_name) VALUES (new.rowid, new.text, new.sender_name);
+END;
+"""
+
+# Words in a plain search query; a trailing * keeps prefix matching ('invoic*')
+SEARCH_TERM_PATTERN = re.compile(r"\w+\*?")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversations (
+    conversation_urn  TEXT PRIMARY KEY,
+    backend_urn       TEXT,
+    conversation_url  TEXT,
+    last_activity     INTEGER NOT NULL DEFAULT 0,
+    unread_count      INTEGER NOT NULL DEFAULT 0,
+    updated_at        REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_conversations_last_activity ON conversations (last_activity);
+
+CREATE TABLE IF NOT EXISTS participants (
+    conversation_urn   TEXT NOT NULL REFERENCES conversations (conversation_urn) ON DELETE CASCADE,
+    position           INTEGER NOT NULL,
+    profile_urn        TEXT,
+    host_identity_urn  TEXT,
+    entity_urn         TEXT,
+    first_name         TEXT,
+    last_name          TEXT,
+    full_name          TEXT,
+    headline           TEXT,
+    profile_url        TEXT,
+    public_identifier  TEXT,
+    PRIMARY KEY (conversation_urn, position)
+);
+CREATE INDEX IF NOT EXISTS idx_participants_profile_urn ON participants (profile_urn);
+
+CREATE TABLE IF NOT EXISTS messages (
+    message_urn        TEXT PRIMARY KEY,
+    conversation_urn   TEXT NOT NULL,
+    delivered_at       INTEGER NOT NULL DEFAULT 0,
+    backend_urn        TEXT,
+    sender_urn         TEXT,
+    sender_name        TEXT,
+    sender_first_name  TEXT,
+    sender_last_name   TEXT,
+    text               TEXT,
+    stored_at          REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_delivered ON messages (conversation_urn, delivered_at);
+
+CREATE TABLE IF NOT EXISTS connections (
+    public_id     TEXT PRIMARY KEY,
+    profile_url   TEXT,
+    first_name    TEXT,
+    last_name     TEXT,
+    email         TEXT,
+    company       TEXT,
+    position      TEXT,
+    connected_on  TEXT,
+    imported_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_connections_profile_url ON connections (profile_url);
+
+CREATE TABLE IF NOT EXISTS posts (
+    post_key      TEXT PRIMARY KEY,
+    author_name   TEXT,
+    profile_url   TEXT,
+    post_content  TEXT,
+    post_url      TEXT,
+    search        TEXT,
+    page_start    INTEGER,
+    fetched_at    REAL NOT NULL,
+    stored_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_search_fetched ON posts (search, fetched_at);
+
+CREATE TABLE IF NOT EXISTS resolver_stats (
+    pipeline              TEXT NOT NULL,
+    strategy              TEXT NOT NULL,
+    attempts              INTEGER NOT NULL DEFAULT 0,
+    hits                  INTEGER NOT NULL DEFAULT 0,
+    consecutive_failures  INTEGER NOT NULL DEFAULT 0,
+    total_latency         REAL NOT NULL DEFAULT 0,
+    last_attempt_at       REAL,
+    last_hit_at           REAL,
+    PRIMARY KEY (pipeline, strategy)
+);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    key         TEXT PRIMARY KEY,
+    value       TEXT,
+    updated_at  REAL NOT NULL
+);
+"""
+
+
+def post_key(post: Dict) -> str:
+    """A post's share URL, or a hash of author and text for posts without one"""
+    if post.get("post_url"):
+        return post["post_url"]
+    text = f"{post.get('profile_url') or ''}|{post.get('post_content') or ''}"
+    return "sha1:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class LocalStore:
+    """SQLite store for conversations, messages, connections, posts and sync bookkeeping"""
+
+    def __init__(self, db_path: str = LOCAL_STORE_PATH):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.has_fts = self._ensure_messages_fts()
+
+    def _ensure_messages_fts(self) -> bool:
+        """Create the message search index on first use; False if SQLite lacks FTS5"""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'"
+        ).fetchone()
+        if exists:
+            return True
+        try:
+            # Also indexes messages stored before the index existed
+            self.conn.executescript(MESSAGES_FTS_SCHEMA.format(insert_trigger=MESSAGES_FTS_INSERT_TRIGGER))
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Full-text search unavailable ({e}), message search will scan")
+            return False
+
+    # ------------------------------------------------------------------
+    # Sync state
+    # ------------------------------------------------------------------
+
+    def get_state(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM sync_state WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def set_state(self, key: str, value, commit: bool = True) -> None:
+        with self._lock:
+            self.conn.execute(
+                "INSERT INTO sync_state (key, value, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at",
+                (key, None if value is None else str(value), time.time()),
+            )
+            if commit:
+                self.conn.commit()
+
+    def delete_state(self, key: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM sync_state WHERE key = ?", (key,))
+            self.conn.commit()
+
+    # ------------------------------------------------------------------
+    # Conversations
+    # ------------------------------------------------------------------
+
+    def save_conversations(self, conversations: List[Dict], mark_synced: bool = True,
+                           advance_cursor: bool = True, replace_existing: bool = True) -> int:
+        """
+        Upsert conversations (as returned by extract_conversation_data).
+
+        A conversation's participant list is replaced as a whole and the sync
+        cursor advances to the newest lastActivityAt saved. With `mark_synced`,
+        the conversation list counts as fresh from now on.
+
+        Imports pass advance_cursor=False and replace_existing=False, so they
+        only add conversations the API hasn't already provided and the next
+        sync still fetches the live details.
+        """
+        now = time.time()
+        saved = 0
+        with self._lock:
+            for conv in conversations:
+                conversation_urn = conv.get("conversation_urn")
+                if not conversation_urn:
+                    continue
+                if not replace_existing and self.conn.execute(
+                        "SELECT 1 FROM conversations WHERE conversation_urn = ?", (conversation_urn,)).fetchone():
+                    continue
+                self.conn.execute(
+                    """
+                    INSERT INTO conversations (conversation_urn, backend_urn, conversation_url,
+                                               last_activity, unread_count, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(conversation_urn) DO UPDATE SET
+                        backend_urn = excluded.backend_urn,
+                        conversation_url = excluded.conversation_url,
+                        last_activity = excluded.last_activity,
+                        unread_count = excluded.unread_count,
+                        updated_at = excluded.updated_at
+                    """,
+                    (conversation_urn, conv.get("backend_urn", ""), conv.get("conversation_url", ""),
+                     conv.get("last_activity") or 0, conv.get("unread_count") or 0, now),
+                )
+                self.conn.execute("DELETE FROM participants WHERE conversation_urn = ?", (conversation_urn,))
+                self.conn.executemany(
+                    f"INSERT INTO participants (conversation_urn, position, {', '.join(PARTICIPANT_FIELDS)}) "
+                    f"VALUES (?, ?, {', '.join('?' for _ in PARTICIPANT_FIELDS)})",
+                    [
+                        (conversation_urn, position, *(participant.get(field, "") for field in PARTICIPANT_FIELDS))
+                        for position, participant in enumerate(conv.get("participants", []))
+                    ],
+                )
+                saved += 1
+            newest = max((conv.get("last_activity") or 0 for conv in conversations), default=0)
+            cursor = self.conversation_cursor()
+            if advance_cursor and newest and (cursor is None or newest > cursor):
+                self.set_state(CONVERSATIONS_CURSOR, newest, commit=False)
+            if mark_synced:
+                self.set_state(CONVERSATIONS_SYNCED_AT, now, commit=False)
+            self.conn.commit()
+        return saved
+
+    def load_conversations(self, limit: Optional[int] = None) -> List[Dict]:
+        """Stored conversations, most recently active first, in extract_conversation_data's shape"""
+        query = "SELECT * FROM conversations ORDER BY last_activity DESC"
+        params = ()
+        if limit:
+            query += " LIMIT ?"
+            params = (limit,)
+        rows = self.conn.execute(query, params).fetchall()
+        if not rows:
+            return []
+
+        participants: Dict[str, List[Dict]] = {}
+        for row in self.conn.execute("SELECT * FROM participants ORDER BY conversation_urn, position"):
+            participants.setdefault(row["conversation_urn"], []).append(
+                {field: row[field] or "" for field in PARTICIPANT_FIELDS}
+            )
+
+        return [
+            {
+                "conversation_urn": row["conversation_urn"],
+                "participants": participants.get(row["conversation_urn"], []),
+                "last_activity": row["last_activity"],
+                "unread_count": row["unread_count"],
+                "backend_urn": row["backend_urn"] or "",
+                "conversation_url": row["conversation_url"] or "",
+            }
+            for row in rows
+        ]
+
+    def find_conversation_urn(self, profile_urn: str) -> Optional[str]:
+        """Most recently active stored conversation that `profile_urn` takes part in"""
+        row = self.conn.execute(
+            "SELECT c.conversation_urn FROM participants p "
+            "JOIN conversations c ON c.conversation_urn = p.conversation_urn "
+            "WHERE p.profile_urn = ? ORDER BY c.last_activity DESC LIMIT 1",
+            (profile_urn,),
+        ).fetchone()
+        return row["conversation_urn"] if row else None
+
+    def conversation_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM conversations").fetchone()[0]
+
+    def conversations_age(self) -> Optional[float]:
+        """Seconds since the conversation list was last synced, or None if never / invalidated"""
+        synced_at = self.get_state(CONVERSATIONS_SYNCED_AT)
+        return time.time() - float(synced_at) if synced_at else None
+
+    def conversation_cursor(self) -> Optional[int]:
+        """Newest lastActivityAt (ms) already merged into the store, or None before the first sync"""
+        cursor = self.get_state(CONVERSATIONS_CURSOR)
+        return int(cursor) if cursor else None
+
+    def conversation_backfill(self) -> Optional[Tuple[int, Optional[int]]]:
+        """
+        Older conversations a sync stopped short of: (lastUpdatedBefore to resume
+        paging from, lastActivityAt they are newer than or None for the rest of
+        the inbox), or None when nothing is missing
+        """
+        value = self.get_state(CONVERSATIONS_BACKFILL)
+        if not value:
+            return None
+        before, _, until = value.partition(":")
+        return int(before), int(until) if until else None
+
+    def set_conversation_backfill(self, backfill: Optional[Tuple[int, Optional[int]]]) -> None:
+        """Save (or with None, clear) the resume point returned by conversation_backfill"""
+        if backfill is None:
+            self.delete_state(CONVERSATIONS_BACKFILL)
+        else:
+            before, until = backfill
+            self.set_state(CONVERSATIONS_BACKFILL, f"{before}:{'' if until is None else until}")
+
+    def invalidate_conversations(self, drop_cursor: bool = False) -> None:
+        """
+        Mark the stored conversation list stale; rows are kept and the next
+        sync merges into them. With `drop_cursor`, that sync starts over from
+        the newest conversation instead of stopping at the last one seen.
+        """
+        self.delete_state(CONVERSATIONS_SYNCED_AT)
+        if drop_cursor:
+            self.delete_state(CONVERSATIONS_CURSOR)
+            self.delete_state(CONVERSATIONS_BACKFILL)
+
+    # ------------------------------------------------------------------
+    # Messages
+    # ------------------------------------------------------------------
+
+    def save_messages(self, conversation_urn: str, messages: List[Dict],
+                      sync_token: Optional[str] = None) -> int:
+        """
+        Append messages (as returned by extract_messages) to a conversation.
+
+        Messages already stored are left untouched, so saving an overlapping
+        or repeated page is harmless. `sync_token`, when given, is kept for
+        the next incremental fetch of this conversation.
+
+        Returns:
+            Number of messages that were new
+        """
+        with self._lock:
+            inserted = self._insert_messages(conversation_urn, messages)
+            if sync_token:
+                self.set_state(MESSAGES_SYNC_TOKEN + conversation_urn, sync_token, commit=False)
+            self.conn.commit()
+        return inserted
+
+    def append_messages(self, messages: Iterable[Dict], batch_size: int = 5000) -> int:
+        """
+        Bulk variant of save_messages for imports: each message carries its own
+        conversation_urn. `messages` may be a generator; it is consumed in
+        batches inside a single transaction, so memory stays bounded.
+
+        The per-row full-text trigger is suspended meanwhile and the new rows
+        (rowids past the previous maximum) are indexed in one pass at the end,
+        which is about three times faster than indexing row by row.
+
+        Returns:
+            Number of messages that were new
+        """
+        inserted = 0
+        with self._lock:
+            try:
+                if self.has_fts:
+                    # Explicit BEGIN so the DROP is rolled back with the rest if the import fails
+                    if not self.conn.in_transaction:
+                        self.conn.execute("BEGIN")
+                    last_rowid = self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM messages").fetchone()[0]
+                    self.conn.execute("DROP TRIGGER IF EXISTS messages_fts_insert")
+                batch: List[Dict] = []
+                for message in messages:
+                    batch.append(message)
+                    if len(batch) >= batch_size:
+                        inserted += self._insert_messages(None, batch)
+                        batch = []
+                if batch:
+                    inserted += self._insert_messages(None, batch)
+                if self.has_fts:
+                    self.conn.execute(
+                        "INSERT INTO messages_fts (rowid, text, sender_name) "
+                        "SELECT rowid, text, sender_name FROM messages WHERE rowid > ?",
+                        (last_rowid,),
+                    )
+                    self.conn.execute(MESSAGES_FTS_INSERT_TRIGGER)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return inserted
+
+    def _insert_messages(self, conversation_urn: Optional[str], messages: List[Dict]) -> int:
+        now = time.time()
+        rows = [
+            (msg["message_urn"], conversation_urn or msg["conversation_urn"], msg.get("timestamp") or 0,
+             *(msg.get(field, "") for field in MESSAGE_FIELDS), now)
+            for msg in messages if msg.get("message_urn")
+        ]
+        return self.conn.executemany(
+            f"INSERT OR IGNORE INTO messages (message_urn, conversation_urn, delivered_at, "
+            f"{', '.join(MESSAGE_FIELDS)}, stored_at) "
+            f"VALUES (?, ?, ?, {', '.join('?' for _ in MESSAGE_FIELDS)}, ?)",
+            rows,
+        ).rowcount
+
+    def load_messages(self, conversation_urn: str, since: Optional[int] = None,
+                      limit: Optional[int] = None) -> List[Dict]:
+        """
+        Stored messages of a conversation, oldest first, in extract_messages' shape.
+
+        Args:
+            since: Only messages delivered after this time (ms)
+            limit: Only the most recent `limit` messages
+        """
+        query = "SELECT * FROM messages WHERE conversation_urn = ? AND delivered_at > ? ORDER BY delivered_at DESC"
+        params = [conversation_urn, since or -1]
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        rows = self.conn.execute(query, params).fetchall()
+
+        return [self._message_from_row(row) for row in reversed(rows)]
+
+    @staticmethod
+    def _message_from_row(row: sqlite3.Row) -> Dict:
+        message = {field: row[field] or "" for field in MESSAGE_FIELDS}
+        message["message_urn"] = row["message_urn"]
+        message["conversation_urn"] = row["conversation_urn"]
+        message["timestamp"] = row["delivered_at"]
+        message["datetime"] = datetime.fromtimestamp(row["delivered_at"] / 1000) if row["delivered_at"] else None
+        return message
+
+    def search_messages(self, query: str, since: Optional[int] = None, until: Optional[int] = None,
+                        conversation_urn: Optional[str] = None, limit: int = 50,
+                        raw: bool = False) -> List[Dict]:
+        """
+        Stored messages matching `query`, newest first.
+
+        Every word must appear in the message text or sender name ('invoice
+        march'); a trailing * matches prefixes ('invoic*'). With `raw`, the
+        query is passed to FTS5 as is (phrases, OR, NEAR, column filters).
+
+        Args:
+            since / until: Only messages delivered in this range (ms)
+            conversation_urn: Only messages from this conversation
+            limit: Maximum number of results
+
+        Returns:
+            Messages in load_messages' shape plus 'snippet' with the match in [brackets]
+        """
+        filters, params = [], []
+        if since is not None:
+            filters.append("m.delivered_at >= ?")
+            params.append(since)
+        if until is not None:
+            filters.append("m.delivered_at < ?")
+            params.append(until)
+        if conversation_urn:
+            filters.append("m.conversation_urn = ?")
+            params.append(conversation_urn)
+
+        if self.has_fts:
+            match = query if raw else " ".join(
+                f'"{term[:-1]}"*' if term.endswith("*") else f'"{term}"'
+                for term in SEARCH_TERM_PATTERN.findall(query)
+            )
+            if not match:
+                return []
+            sql = (
+                "SELECT m.*, snippet(messages_fts, 0, '[', ']', '…', 12) AS snippet "
+                "FROM messages_fts JOIN messages m ON m.rowid = messages_fts.rowid "
+                f"WHERE messages_fts MATCH ? {''.join(' AND ' + f for f in filters)} "
+                "ORDER BY m.delivered_at DESC LIMIT ?"
+            )
+            params = [match, *params, limit]
+        else:
+            terms = [term.rstrip("*") for term in SEARCH_TERM_PATTERN.findall(query)]
+            if not terms:
+                return []
+            filters.extend("(m.text LIKE ? OR m.sender_name LIKE ?)" for _ in terms)
+            for term in terms:
+                params.extend([f"%{term}%", f"%{term}%"])
+            sql = f"SELECT m.*, m.text AS snippet FROM messages m WHERE {' AND '.join(filters)} " \
+                  "ORDER BY m.delivered_at DESC LIMIT ?"
+            params.append(limit)
+
+        results = []
+        for row in self.conn.execute(sql, params):
+            message = self._message_from_row(row)
+            message["snippet"] = row["snippet"] or ""
+            results.append(message)
+        return results
+
+    def newest_message_time(self, conversation_urn: str) -> Optional[int]:
+        """deliveredAt (ms) of the newest stored message in a conversation, or None if there are none"""
+        row = self.conn.execute(
+            "SELECT MAX(delivered_at) FROM messages WHERE conversation_urn = ?", (conversation_urn,)
+        ).fetchone()
+        return row[0]
+
+    def message_count(self, conversation_urn: Optional[str] = None) -> int:
+        if conversation_urn is None:
+            return self.conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+        return self.conn.execute(
+            "SELECT COUNT(*) FROM messages WHERE conversation_urn = ?", (conversation_urn,)
+        ).fetchone()[0]
+
+    def message_sync_token(self, conversation_urn: str) -> Optional[str]:
+        """syncToken returned by the last message fetch for a conversation, if any"""
+        return self.get_state(MESSAGES_SYNC_TOKEN + conversation_urn)
+
+    def drop_message_sync_token(self, conversation_urn: str) -> None:
+        self.delete_state(MESSAGES_SYNC_TOKEN + conversation_urn)
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def replace_connections(self, connections: Iterable[Dict], batch_size: int = 1000) -> int:
+        """
+        Replace the stored first-degree connections with an export snapshot.
+
+        `connections` may be a generator; rows are written in batches inside a
+        single transaction, and connections missing from a non-empty snapshot
+        (removed since the last import) are dropped at the end. Rows need a
+        profile_url.
+
+        Returns:
+            Number of connections stored
+        """
+        now = time.time()
+        sql = (
+            f"INSERT INTO connections (public_id, {', '.join(CONNECTION_FIELDS)}, imported_at) "
+            f"VALUES (?, {', '.join('?' for _ in CONNECTION_FIELDS)}, ?) "
+            f"ON CONFLICT(public_id) DO UPDATE SET "
+            f"{', '.join(f'{field} = excluded.{field}' for field in CONNECTION_FIELDS)}, "
+            f"imported_at = excluded.imported_at"
+        )
+        stored = 0
+        with self._lock:
+            try:
+                batch = []
+                for connection in connections:
+                    public_id = normalize_public_id(connection.get("profile_url") or "")
+                    if not public_id:
+                        continue
+                    batch.append((public_id, *(connection.get(field) or "" for field in CONNECTION_FIELDS), now))
+                    if len(batch) >= batch_size:
+                        stored += len(batch)
+                        self.conn.executemany(sql, batch)
+                        batch = []
+                if batch:
+                    stored += len(batch)
+                    self.conn.executemany(sql, batch)
+                if stored:
+                    # An empty snapshot is more likely a wrong file than zero connections
+                    self.conn.execute("DELETE FROM connections WHERE imported_at < ?", (now,))
+                self.set_state(CONNECTIONS_IMPORTED_AT, now, commit=False)
+                self.conn.commit()
+            except Exception:
+                self.conn.rollback()
+                raise
+        return stored
+
+    def find_connection(self, public_id_or_url: str) -> Optional[Dict]:
+        """Imported first-degree connection for a public identifier or profile URL, or None"""
+        public_id = normalize_public_id(public_id_or_url or "")
+        if not public_id:
+            return None
+        row = self.conn.execute("SELECT * FROM connections WHERE public_id = ?", (public_id,)).fetchone()
+        if row is None and "/" in public_id_or_url:
+            row = self.conn.execute(
+                "SELECT * FROM connections WHERE profile_url = ?", (public_id_or_url.split("?")[0],)
+            ).fetchone()
+        if row is None:
+            return None
+        connection = {field: row[field] or "" for field in CONNECTION_FIELDS}
+        connection["public_id"] = row["public_id"]
+        return connection
+
+    def connection_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM connections").fetchone()[0]
+
+    def connections_imported_at(self) -> Optional[float]:
+        """When Connections.csv was last imported (epoch seconds), or None"""
+        imported_at = self.get_state(CONNECTIONS_IMPORTED_AT)
+        return float(imported_at) if imported_at else None
+
+    # ------------------------------------------------------------------
+    # Posts
+    # ------------------------------------------------------------------
+
+    def save_posts(self, posts: Iterable[Dict], search: str = "", page_start: Optional[int] = None,
+                   fetched_at: Optional[float] = None, commit: bool = True) -> int:
+        """
+        Upsert scraped posts (as returned by extract_posts_from_json).
+
+        `fetched_at` is when the page was fetched (now by default); a post seen
+        again keeps the newest fields. With commit=False the posts go into the
+        same transaction as the next committing call (e.g. set_state).
+
+        Returns:
+            Number of posts saved
+        """
+        now = time.time()
+        fetched_at = fetched_at if fetched_at is not None else now
+        rows = [
+            (post_key(post), *(post.get(field) or "" for field in POST_FIELDS), search, page_start, fetched_at, now)
+            for post in posts
+        ]
+        with self._lock:
+            self.conn.executemany(
+                f"INSERT INTO posts (post_key, {', '.join(POST_FIELDS)}, search, page_start, fetched_at, stored_at) "
+                f"VALUES (?, {', '.join('?' for _ in POST_FIELDS)}, ?, ?, ?, ?) "
+                f"ON CONFLICT(post_key) DO UPDATE SET "
+                f"{', '.join(f'{field} = excluded.{field}' for field in POST_FIELDS)}, "
+                f"search = excluded.search, page_start = excluded.page_start, "
+                f"fetched_at = excluded.fetched_at, stored_at = excluded.stored_at "
+                f"WHERE excluded.fetched_at >= posts.fetched_at",
+                rows,
+            )
+            if commit:
+                self.conn.commit()
+        return len(rows)
+
+    def has_post(self, key: str) -> bool:
+        return self.conn.execute("SELECT 1 FROM posts WHERE post_key = ?", (key,)).fetchone() is not None
+
+    def post_keys(self) -> Iterator[str]:
+        """Every stored post key, in no particular order"""
+        for row in self.conn.execute("SELECT post_key FROM posts"):
+            yield row[0]
+
+    def post_count(self, search: Optional[str] = None) -> int:
+        if search is None:
+            return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+        return self.conn.execute("SELECT COUNT(*) FROM posts WHERE search = ?", (search,)).fetchone()[0]
+
+    # ------------------------------------------------------------------
+    # Resolver statistics
+    # ------------------------------------------------------------------
+
+    def load_resolver_stats(self, pipeline: str) -> Dict[str, Dict]:
+        """Per-strategy counters of a resolver pipeline, by strategy name"""
+        return {
+            row["strategy"]: dict(row)
+            for row in self.conn.execute("SELECT * FROM resolver_stats WHERE pipeline = ?", (pipeline,))
+        }
+
+    def record_resolver_attempts(self, pipeline: str, attempts: List[Dict]) -> None:
+        """
+        Add one pipeline run to the counters.
+
+        Each attempt has 'strategy', 'hit', 'latency' (seconds) and 'failure':
+        whether a miss counts towards consecutive_failures. A hit resets them.
+        """
+        now = time.time()
+        with self._lock:
+            for attempt in attempts:
+                hit = 1 if attempt["hit"] else 0
+                failure = 1 if attempt.get("failure") and not hit else 0
+                self.conn.execute(
+                    """
+                    INSERT INTO resolver_stats (pipeline, strategy, attempts, hits, consecutive_failures,
+                                                total_latency, last_attempt_at, last_hit_at)
+                    VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+                    ON CONFLICT(pipeline, strategy) DO UPDATE SET
+                        attempts = attempts + 1,
+                        hits = hits + excluded.hits,
+                        consecutive_failures = CASE WHEN excluded.hits THEN 0
+                                                    ELSE consecutive_failures + excluded.consecutive_failures END,
+                        total_latency = total_latency + excluded.total_latency,
+                        last_attempt_at = excluded.last_attempt_at,
+                        last_hit_at = COALESCE(excluded.last_hit_at, last_hit_at)
+                    """,
+                    (pipeline, attempt["strategy"], hit, failure, attempt["latency"], now, now if hit else None),
+                )
+            self.conn.commit()
+
+    def reset_resolver_stats(self, pipeline: str) -> None:
+        with self._lock:
+            self.conn.execute("DELETE FROM resolver_stats WHERE pipeline = ?", (pipeline,))
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+_default_store: Optional[LocalStore] = None
+
+
+def default_local_store() -> LocalStore:
+    """Process-wide store shared by the messaging scripts"""
+    global _default_store
+    if _default_store is None:
+        _default_store = LocalStore()
+    return _default_store
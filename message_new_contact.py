@@ -12,16 +12,20 @@ import requests
 import uuid
 from typing import Dict, Optional
 from get_profile_urns import LinkedInProfileURNExtractor
+from identity_cache import IdentityCache, default_identity_cache
+from linkedin_client import VOYAGER_API
 
 class NewContactMessenger:
-    def __init__(self):
-        self.extractor = LinkedInProfileURNExtractor()
-        self.session = requests.Session()
-        self.session.cookies = self.extractor.session.cookies
-        self.session.headers = self.extractor.session.headers.copy()
+    def __init__(self, identity_cache: Optional[IdentityCache] = None, session: Optional[requests.Session] = None):
+        # Shared with the extractor, which consults it before any network lookup
+        self.identity_cache = identity_cache if identity_cache is not None else default_identity_cache()
+        self.extractor = LinkedInProfileURNExtractor(identity_cache=self.identity_cache, session=session)
+        # Same pooled connection as the URN lookup, so the send needs no new handshake
+        self.session = self.extractor.session
+        self.headers = self.extractor.headers.copy()
         
         # Add required headers for messaging (matching PowerShell script)
-        self.session.headers.update({
+        self.headers.update({
             "authority": "www.linkedin.com",
             "method": "POST",
             "path": "/voyager/api/voyagerMessagingDashMessengerMessages?action=createMessage",
@@ -63,14 +67,14 @@ class NewContactMessenger:
         payload["trackingId"] = str(uuid.uuid4())[:16]
         
         # Update headers with specific referer and page instance for this profile
-        headers = self.session.headers.copy()
+        headers = self.headers.copy()
         headers.update({
             "referer": profile_url,
             "x-li-page-instance": "urn:li:page:d_flagship3_profile_view_base;hOn+xkrURFiK118ise1SZw=="
         })
         
         # API endpoint
-        url = "https://www.linkedin.com/voyager/api/voyagerMessagingDashMessengerMessages?action=createMessage"
+        url = f"{VOYAGER_API}/voyagerMessagingDashMessengerMessages?action=createMessage"
         
         try:
             print(f"📤 Sending message to: {urns['recipient_urn']}")
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Stage Timing Metrics
+
+Where a run spends its time, per stage and endpoint. Stages are timed with
+span() context managers (or the timed() decorator) and land in fixed-bucket
+latency histograms:
+
+    http               request round-trip up to the response headers, every session request
+    json_decode        response.json() on the main fetch paths (timed_json)
+    extract            the response extractors (posts, conversations, messages, connection info)
+    rate_limit_sleep   apply_rate_limiting and the 429 back-off sleeps
+    file_write         CSV/TXT page writes and response archive appends
+    store_write        posts + checkpoint commits to the local store
+
+Every response from the shared session is also counted by endpoint and
+status, so 429 (rate limited) and 403 (blocked / expired cookies) responses
+show up per endpoint.
+
+Aggregation is always on and costs a clock read and a dict update per span.
+Exports are opt-in:
+
+    LINKEDIN_METRICS_JSONL   append one JSON line per span to this file
+    LINKEDIN_METRICS_PROM    write a Prometheus textfile (node_exporter textfile collector) at exit
+
+Usage:
+    with default_metrics().span("extract", "posts"):
+        posts = extract(data)
+    LINKEDIN_METRICS_JSONL=local_data/metrics.jsonl python linkedin_api_call.py
+    LINKEDIN_METRICS_PROM=/var/lib/node_exporter/linkedin.prom python linkedin_connection_checker.py URL
+    python metrics.py local_data/metrics.jsonl            # per-stage p50/p95/total, slowest first
+"""
+
+import argparse
+import atexit
+import bisect
+import functools
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+METRICS_JSONL_PATH = os.environ.get("LINKEDIN_METRICS_JSONL")
+METRICS_PROM_PATH = os.environ.get("LINKEDIN_METRICS_PROM")
+
+# Histogram bucket upper bounds in seconds (sleeps run to minutes, parsers to microseconds)
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+METRIC_PREFIX = "linkedin"
+
+# Path parts that name a profile rather than an endpoint, collapsed in endpoint labels
+ENDPOINT_PATTERNS = [
+    (re.compile(r"^/voyager/api"), ""),
+    (re.compile(r"/(identity/profiles|relationships/relationship|identity/shared/connections)/[^/]+"), r"/\1/*"),
+    (re.compile(r"^/in/[^/]+/?$"), "/in/*"),
+]
+
+
+def endpoint_name(url: str) -> str:
+    """Low-cardinality label for a request URL (GraphQL query name, action, or path with ids masked)"""
+    parts = urlsplit(url)
+    query = parse_qs(parts.query)
+    if "queryId" in query:
+        return query["queryId"][0].split(".")[0]
+    if "action" in query:
+        return query["action"][0]
+    path = parts.path
+    for pattern, replacement in ENDPOINT_PATTERNS:
+        path = pattern.sub(replacement, path)
+    return path.strip("/") or "/"
+
+
+class Histogram:
+    """Cumulative-style latency histogram over LATENCY_BUCKETS"""
+
+    __slots__ = ("buckets", "count", "total", "max")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (max for the overflow bucket)"""
+        rank, seen = q * self.count, 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else self.max
+        return 0.0
+
+
+class Metrics:
+    """Per-(stage, endpoint) latency histograms and per-(endpoint, status) response counts"""
+
+    def __init__(self, jsonl_path: Optional[str] = METRICS_JSONL_PATH, prom_path: Optional[str] = METRICS_PROM_PATH):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self._events = None
+        self._lock = threading.Lock()
+        if jsonl_path or prom_path:
+            atexit.register(self.close)
+
+    # ------------------------------------------
+    # Recording
+    # ------------------------------------------
+
+    def observe(self, stage: str, endpoint: str, seconds: float, status: Optional[int] = None) -> None:
+        with self._lock:
+            histogram = self.histograms.get((stage, endpoint))
+            if histogram is None:
+                histogram = self.histograms[(stage, endpoint)] = Histogram()
+            histogram.observe(seconds)
+            if status is not None:
+                self.responses[(endpoint, status)] = self.responses.get((endpoint, status), 0) + 1
+            if self.jsonl_path:
+                self._write_event(stage, endpoint, seconds, status)
+
+    @contextmanager
+    def span(self, stage: str, endpoint: str = ""):
+        """Time the block as one `stage` observation"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, endpoint, time.perf_counter() - start)
+
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook: round-trip time and status of every session request"""
+        self.observe("http", endpoint_name(response.url), response.elapsed.total_seconds(), response.status_code)
+        return response
+
+    def _write_event(self, stage: str, endpoint: str, seconds: float, status: Optional[int]) -> None:
+        """Append one JSON line (caller holds the lock)"""
+        if self._events is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.jsonl_path)), exist_ok=True)
+            self._events = open(self.jsonl_path, "a", encoding="utf-8", buffering=64 * 1024)
+        event = {"ts": round(time.time(), 6), "pid": os.getpid(), "stage": stage, "endpoint": endpoint,
+                 "ms": round(seconds * 1000, 3)}
+        if status is not None:
+            event["status"] = status
+        self._events.write(json.dumps(event) + "\n")
+
+    # ------------------------------------------
+    # Reading / export
+    # ------------------------------------------
+
+    def status_count(self, status: int) -> int:
+        """Responses with this status across all endpoints (e.g. 429, 403)"""
+        return sum(count for (_, code), count in self.responses.items() if code == status)
+
+    def summary(self) -> List[Dict]:
+        """One row per (stage, endpoint), most total time first"""
+        with self._lock:
+            rows = [{
+                "stage": stage,
+                "endpoint": endpoint,
+                "count": h.count,
+                "total_ms": h.total * 1000,
+                "mean_ms": h.total * 1000 / h.count,
+                "p95_ms": h.quantile(0.95) * 1000,
+                "max_ms": h.max * 1000,
+            } for (stage, endpoint), h in self.histograms.items()]
+        return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+    def prometheus_text(self) -> str:
+        """Prometheus exposition format: stage histograms and response counters"""
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [f"# HELP {name} Time spent per stage and endpoint",
+                 f"# TYPE {name} histogram"]
+        with self._lock:
+            for (stage, endpoint), h in sorted(self.histograms.items()):
+                labels = f'stage="{stage}",endpoint="{_escape(endpoint)}"'
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS, h.buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {h.count}')
+                lines.append(f"{name}_sum{{{labels}}} {h.total:.6f}")
+                lines.append(f"{name}_count{{{labels}}} {h.count}")
+
+            name = f"{METRIC_PREFIX}_http_responses_total"
+            lines += [f"# HELP {name} Responses by endpoint and status (429 = rate limited, 403 = blocked)",
+                      f"# TYPE {name} counter"]
+            for (endpoint, status), count in sorted(self.responses.items()):
+                lines.append(f'{name}{{endpoint="{_escape(endpoint)}",status="{status}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: Optional[str] = None) -> None:
+        """Write the textfile atomically, so a collector never reads half of it"""
+        path = path or self.prom_path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+    def close(self) -> None:
+        """Flush the JSON lines file and write the Prometheus textfile"""
+        with self._lock:
+            if self._events is not None:
+                self._events.close()
+                self._events = None
+        if self.prom_path:
+            try:
+                self.write_prometheus()
+            except OSError as e:
+                print(f"⚠️ Could not write metrics to {self.prom_path}: {e}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+_default_metrics: Optional[Metrics] = None
+_default_metrics_lock = threading.Lock()
+
+
+def default_metrics() -> Metrics:
+    """Process-wide metrics shared by the session, scrapers and extractors"""
+    global _default_metrics
+    if _default_metrics is None:
+        with _default_metrics_lock:
+            if _default_metrics is None:
+                _default_metrics = Metrics()
+    return _default_metrics
+
+
+def span(stage: str, endpoint: str = ""):
+    """default_metrics().span(...)"""
+    return default_metrics().span(stage, endpoint)
+
+
+def timed(stage: str, endpoint: Optional[str] = None) -> Callable:
+    """Decorator: time every call as `stage` (endpoint defaults to the function name)"""
+    def decorate(func: Callable) -> Callable:
+        label = endpoint or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with default_metrics().span(stage, label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_json(response):
+    """response.json(), timed as json_decode for the response's endpoint"""
+    with default_metrics().span("json_decode", endpoint_name(response.url)):
+        return response.json()
+
+
+# ==========================================
+# JSON LINES SUMMARY
+# ==========================================
+
+def summarize_events(path: str) -> List[Dict]:
+    """Exact per-(stage, endpoint) percentiles from a JSON lines file, most total time first"""
+    durations: Dict[Tuple[str, str], List[float]] = {}
+    statuses: Dict[Tuple[str, str], Dict[int, int]] = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            key = (event["stage"], event["endpoint"])
+            durations.setdefault(key, []).append(event["ms"])
+            if "status" in event:
+                by_status = statuses.setdefault(key, {})
+                by_status[event["status"]] = by_status.get(event["status"], 0) + 1
+
+    rows = []
+    for (stage, endpoint), values in durations.items():
+        values.sort()
+        rows.append({
+            "stage": stage,
+            "endpoint": endpoint,
+            "count": len(values),
+            "total_ms": sum(values),
+            "p50_ms": values[len(values) // 2],
+            "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            "max_ms": values[-1],
+            "statuses": statuses.get((stage, endpoint), {}),
+        })
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize recorded stage timings")
+    parser.add_argument("events", nargs="?", default=METRICS_JSONL_PATH, help="JSON lines file (LINKEDIN_METRICS_JSONL)")
+    parser.add_argument("--stage", help="Only this stage (e.g. http, extract)")
+    parser.add_argument("--top", type=int, default=30, help="Rows to print")
+    args = parser.parse_args()
+
+    if not args.events or not os.path.exists(args.events):
+        print("❌ No metrics file (set LINKEDIN_METRICS_JSONL when running a script, then pass the file here)")
+        return
+
+    rows = [row for row in summarize_events(args.events) if not args.stage or row["stage"] == args.stage]
+    print("=" * 110)
+    print(f"⏱️ STAGE TIMINGS ({args.events})")
+    print("=" * 110)
+    print(f"{'Stage':<18} {'Endpoint':<36} {'count':>7} {'total ms':>12} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}")
+    print("-" * 110)
+    for row in rows[:args.top]:
+        print(f"{row['stage']:<18} {row['endpoint'][:36]:<36} {row['count']:>7} {row['total_ms']:>12.1f} "
+              f"{row['p50_ms']:>10.2f} {row['p95_ms']:>10.2f} {row['max_ms']:>10.2f}")
+    print("=" * 110)
+
+    blocked: Dict[int, int] = {}
+    for row in rows:
+        for status, count in row["statuses"].items():
+            if status in (429, 403):
+                blocked[status] = blocked.get(status, 0) + count
+    print(f"🚦 429 rate limited: {blocked.get(429, 0)}, 403 forbidden: {blocked.get(403, 0)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Name Index
+
+In-memory index over the name → URN mapping built by
+LinkedInConversationExtractor.create_name_mapping (keys are first names, full
+names and public identifiers, lower-cased). It replaces the linear
+"query in name or name in query" scan with ranked lookups:
+
+1. exact key
+2. query is the start of a word in the key  ('jo' → 'john doe', 'doe' → 'john-doe-12ab')
+3. query appears inside the key             ('ohn' → 'john doe')
+4. key appears inside the query             ('john doe smith' → 'john doe')
+5. trigram similarity, for typos            ('jonh' → 'john')
+
+Ties are broken by most recent conversation activity. Typos are matched per
+word against the vocabulary of distinct name words rather than every key.
+
+Usage:
+    index = NameIndex(name_mapping)
+    for match in index.search('jonh', limit=5):
+        print(match.key, match.score, match.kind)
+"""
+
+import heapq
+import math
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Minimum trigram (Dice) similarity for a fuzzy match
+FUZZY_THRESHOLD = 0.4
+
+# Prefixes up to this length get pre-ranked candidate lists
+SHORT_PREFIX_LENGTH = 3
+
+# Words inside names and public identifiers ('john doe', 'john-doe-12ab')
+WORD_PATTERN = re.compile(r"[^\s\-_.]+")
+
+KIND_SCORES = {
+    "exact": 1.0,
+    "prefix": 0.9,
+    "substring": 0.8,
+    "contained": 0.7,
+}
+
+
+class NameMatch(NamedTuple):
+    key: str
+    score: float
+    kind: str       # exact, prefix, substring, contained or fuzzy
+    data: Dict
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of `text` padded so short names and word starts still get some"""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def inner_trigrams(text: str) -> Set[str]:
+    """Unpadded trigrams: every one of them occurs in any key containing `text`"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """Ranked lookups over a name → mapping-data dict"""
+
+    def __init__(self, name_mapping: Dict[str, Dict]):
+        self.mapping = name_mapping
+        self.keys: List[str] = list(name_mapping)
+        self._key_ids: Dict[str, int] = {key: key_id for key_id, key in enumerate(self.keys)}
+        self._activity: List[int] = [(name_mapping[key].get("last_activity") or 0) for key in self.keys]
+
+        # (word-start suffix, key id) sorted, for word-prefix lookups via bisect;
+        # inner-trigram postings for substring lookups
+        word_starts: List[Tuple[str, int]] = []
+        self._trigram_postings: Dict[str, List[int]] = {}
+
+        for key_id, key in enumerate(self.keys):
+            for word in WORD_PATTERN.finditer(key):
+                word_starts.append((key[word.start():], key_id))
+            for gram in inner_trigrams(key):
+                postings = self._trigram_postings.get(gram)
+                if postings is None:
+                    self._trigram_postings[gram] = [key_id]
+                else:
+                    postings.append(key_id)
+
+        word_starts.sort()
+        self._word_starts = word_starts
+        self._word_start_texts = [text for text, _ in word_starts]
+        self._word_start_ids = [key_id for _, key_id in word_starts]
+
+        # Short prefixes match huge ranges, so their candidates are kept
+        # pre-ranked (shortest key, then most recent activity, first)
+        rank = [(len(key), -self._activity[key_id]) for key_id, key in enumerate(self.keys)]
+        self._rank = rank
+        short_prefixes: Dict[str, List[int]] = {}
+        for text, key_id in word_starts:
+            for length in range(1, min(SHORT_PREFIX_LENGTH, len(text)) + 1):
+                short_prefixes.setdefault(text[:length], []).append(key_id)
+        self._short_prefixes = {
+            prefix: sorted(set(key_ids), key=rank.__getitem__)
+            for prefix, key_ids in short_prefixes.items()
+        }
+
+        # Typos are matched word by word against the (much smaller) vocabulary
+        # of distinct words, then mapped back to each word's best-ranked keys
+        word_keys: Dict[str, Set[int]] = {}
+        for key_id, key in enumerate(self.keys):
+            for word in WORD_PATTERN.findall(key):
+                word_keys.setdefault(word, set()).add(key_id)
+        self._vocabulary: List[str] = list(word_keys)
+        self._word_keys: List[List[int]] = [sorted(word_keys[word], key=rank.__getitem__) for word in self._vocabulary]
+        self._word_grams: List[Set[str]] = [trigrams(word) for word in self._vocabulary]
+        self._word_gram_postings: Dict[str, List[int]] = {}
+        for word_id, grams in enumerate(self._word_grams):
+            for gram in grams:
+                self._word_gram_postings.setdefault(gram, []).append(word_id)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    # ------------------------------------------------------------------
+    # Candidate generators, one per match kind
+    # ------------------------------------------------------------------
+
+    def _prefix_ids(self, query: str, limit: int) -> Iterable[int]:
+        if len(query) <= SHORT_PREFIX_LENGTH:
+            # Already ranked, so the first `limit` are the best of this kind
+            return self._short_prefixes.get(query, [])[:limit]
+        start = bisect_left(self._word_start_texts, query)
+        end = bisect_left(self._word_start_texts, query + "\uffff", start)
+        return heapq.nsmallest(limit, set(self._word_start_ids[start:end]), key=self._rank.__getitem__)
+
+    def _substring_ids(self, query: str) -> Iterable[int]:
+        grams = inner_trigrams(query)
+        if not grams:
+            return []
+        postings = sorted((self._trigram_postings.get(gram, []) for gram in grams), key=len)
+        if not postings[0]:
+            return []
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            candidates.intersection_update(posting)
+            if not candidates:
+                return []
+        return (key_id for key_id in candidates if query in self.keys[key_id])
+
+    def _contained_ids(self, query: str) -> Iterable[int]:
+        # Every key inside the query is one of its substrings; queries are short
+        length = len(query)
+        for i in range(length):
+            for j in range(i + 2, length + 1):
+                key = query[i:j]
+                if key in self._key_ids:
+                    yield self._key_ids[key]
+
+    def _similar_words(self, word: str, limit: int) -> List[int]:
+        """
+        Vocabulary words with trigram (Dice) similarity >= FUZZY_THRESHOLD, best first.
+
+        Every trigram set has at least 3 grams, so a qualifying word shares at
+        least `needed` grams with `word`, and therefore at least one of its
+        len(grams) - needed + 1 rarest grams. Only those postings are probed
+        (prefix filtering), which skips the huge lists of grams like '  j'.
+        """
+        grams = trigrams(word)
+        needed = max(1, math.ceil(FUZZY_THRESHOLD * (len(grams) + 3) / 2))
+        postings = sorted((self._word_gram_postings.get(gram, ()) for gram in grams), key=len)
+        candidates = set()
+        for posting in postings[:len(grams) - needed + 1]:
+            candidates.update(posting)
+
+        word_grams = self._word_grams
+        similar = []
+        for word_id in candidates:
+            other = word_grams[word_id]
+            similarity = 2.0 * len(grams & other) / (len(grams) + len(other))
+            if similarity >= FUZZY_THRESHOLD:
+                similar.append((similarity, word_id))
+        return [word_id for _, word_id in heapq.nlargest(limit, similar)]
+
+    def _fuzzy(self, query: str, limit: int) -> List[Tuple[int, float]]:
+        candidates: Set[int] = set()
+        for query_word in WORD_PATTERN.findall(query):
+            # Only the closest words are worth expanding into keys
+            for word_id in self._similar_words(query_word, limit):
+                candidates.update(self._word_keys[word_id][:limit])
+
+        query_grams = trigrams(query)
+        scored = []
+        for key_id in candidates:
+            key_grams = trigrams(self.keys[key_id])
+            scored.append((key_id, 2.0 * len(query_grams & key_grams) / (len(query_grams) + len(key_grams))))
+        return scored
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, limit: int = 5, fuzzy: bool = True) -> List[NameMatch]:
+        """
+        Best matches for `query`, highest score first.
+
+        Match kinds are tried strongest first and their score ranges don't
+        overlap, so once `limit` keys are found the weaker kinds are skipped.
+        """
+        query = " ".join(query.lower().split())
+        if not query or not self.keys:
+            return []
+
+        keys = self.keys
+        tiers = [
+            ("exact", lambda: ((self._key_ids[query], KIND_SCORES["exact"]),) if query in self._key_ids else ()),
+            # Shorter keys are closer to what was typed
+            ("prefix", lambda: ((i, KIND_SCORES["prefix"] + 0.05 * len(query) / len(keys[i]))
+                                for i in self._prefix_ids(query, limit))),
+            ("substring", lambda: ((i, KIND_SCORES["substring"] + 0.05 * len(query) / len(keys[i]))
+                                   for i in self._substring_ids(query))),
+            ("contained", lambda: ((i, KIND_SCORES["contained"] + 0.05 * len(keys[i]) / len(query))
+                                   for i in self._contained_ids(query))),
+        ]
+        if fuzzy:
+            tiers.append(("fuzzy", lambda: ((i, 0.6 * similarity) for i, similarity in self._fuzzy(query, limit))))
+
+        best: Dict[int, Tuple[float, str]] = {}
+        for kind, candidates in tiers:
+            for key_id, score in candidates():
+                current = best.get(key_id)
+                if current is None or (current[1] == kind and current[0] < score):
+                    best[key_id] = (score, kind)
+            if len(best) >= limit:
+                break
+
+        activity = self._activity
+        ranked = heapq.nlargest(limit, best.items(), key=lambda item: (item[1][0], activity[item[0]]))
+        return [
+            NameMatch(keys[key_id], round(score, 4), kind, self.mapping[keys[key_id]])
+            for key_id, (score, kind) in ranked
+        ]
+
+    def best(self, query: str) -> Optional[NameMatch]:
+        """Single best match, or None"""
+        matches = self.search(query, limit=1)
+        return matches[0] if matches else None
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Post Extraction
+
+Turns a searchClusters (content search) response into post dicts:
+author_name, profile_url, post_content and post_url. Needs no session,
+archive or config.py, so archived responses can be re-extracted offline
+(reextract.py); LinkedInScraper.extract_posts_from_json uses the same code.
+
+Usage:
+    posts, skipped = extract_posts(response_json)
+    posts, skipped = extract_posts(response_json, seen=default_seen_posts())
+"""
+
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from local_store import post_key
+from seen_posts import SeenPostIndex
+
+logger = logging.getLogger(__name__)
+
+
+def clean_profile_url(url: str) -> str:
+    """Clean profile URL by removing query parameters"""
+    if not url or 'URL not found' in url:
+        return url
+
+    # For individual profiles, clean up the URL
+    if '/in/' in url and '?' in url:
+        return url.split('?')[0]
+
+    return url
+
+
+def extract_post_data(update: Dict) -> Dict:
+    """Extract individual post data from update object"""
+    post_data = {}
+
+    # Extract actor (author) information
+    actor = update.get('actor', {})
+    if actor:
+        name_obj = actor.get('name', {})
+        if name_obj:
+            post_data['author_name'] = name_obj.get('text', 'Unknown')
+
+        nav_context = actor.get('navigationContext', {})
+        if nav_context:
+            action_target = nav_context.get('actionTarget', '')
+            post_data['profile_url'] = clean_profile_url(action_target)
+        else:
+            post_data['profile_url'] = 'URL not found'
+
+    # Extract post content from commentary
+    commentary = update.get('commentary', {})
+    if commentary:
+        text_obj = commentary.get('text', {})
+        if text_obj:
+            post_data['post_content'] = text_obj.get('text', '')
+
+    # Extract social content for post URL
+    social_content = update.get('socialContent', {})
+    if social_content:
+        post_data['post_url'] = social_content.get('shareUrl', '')
+
+    return post_data
+
+
+def extract_posts(json_data: Dict, seen: Optional[SeenPostIndex] = None) -> Tuple[List[Dict], int]:
+    """
+    Extract posts data from the structured JSON response
+
+    With `seen`, posts collected before are skipped; those with a share URL
+    are skipped before their fields are extracted.
+
+    Returns:
+        (posts, number of posts skipped as already seen)
+    """
+    posts = []
+    skipped = 0
+
+    try:
+        elements = json_data.get('data', {}).get('searchDashClustersByAll', {}).get('elements', [])
+
+        for element in elements:
+            items = element.get('items', [])
+            for item_wrapper in items:
+                item = item_wrapper.get('item', {})
+
+                search_feed_update = item.get('searchFeedUpdate')
+                if search_feed_update:
+                    update = search_feed_update.get('update', {})
+                    if update:
+                        if seen is not None:
+                            share_url = (update.get('socialContent') or {}).get('shareUrl')
+                            if share_url and share_url in seen:
+                                skipped += 1
+                                continue
+
+                        post_data = extract_post_data(update)
+
+                        # Only add posts with meaningful content
+                        if post_data.get('post_content') and post_data.get('author_name'):
+                            if seen is not None and not post_data.get('post_url') and post_key(post_data) in seen:
+                                skipped += 1
+                                continue
+                            posts.append(post_data)
+
+        return posts, skipped
+
+    except Exception as e:
+        logger.error(f"Error extracting posts: {e}")
+        return [], skipped
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Streaming Post Sink
+
+Writes the scraper's results page by page instead of at the end of a run.
+As each search page is extracted:
+
+  1. the raw response is appended to the response archive (response_archive.py)
+  2. the posts are appended to the run's CSV and TXT files and flushed to disk
+  3. the posts and a checkpoint (next page start, post count, file sizes)
+     are saved to the local store in one transaction
+
+A crash, 403 or Ctrl+C therefore loses at most the page in flight. The next
+run for the same search resumes from the checkpoint. It keeps appending to the
+same CSV/TXT files, truncated back to the checkpointed sizes in case a page was
+half-written, and doesn't request the pages already fetched. The checkpoint is
+cleared when a run finishes.
+
+Usage:
+    sink = PostSink("hiring marketing dubai", posts_per_page=10)
+    sink.open()                                  # resumes an unfinished run if there is one
+    sink.write_page(start, raw_response, posts)
+    sink.finish()
+"""
+
+import csv
+import json
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from local_store import LocalStore, default_local_store
+from metrics import span
+from response_archive import ResponseArchive, default_response_archive
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+# sync_state key of a search's checkpoint, suffixed with the search keywords
+SCRAPE_CHECKPOINT = "scrape_checkpoint:"
+
+CSV_HEADERS = ['Post_Number', 'Author_Name', 'Profile_URL', 'Post_Content', 'Post_URL']
+
+# Posts kept in memory for the end-of-run summary
+SAMPLE_SIZE = 3
+
+
+class PostSink:
+    """Per-page, checkpointed output for LinkedInScraper.scrape_posts"""
+
+    def __init__(self, search: str, posts_per_page: int, filename_prefix: str = "linkedin_search_results",
+                 store: Optional[LocalStore] = None, archive: Optional[ResponseArchive] = None):
+        self.search = search
+        self.posts_per_page = posts_per_page
+        self.filename_prefix = filename_prefix
+        self.store = store or default_local_store()
+        self.archive = archive if archive is not None else default_response_archive()
+
+        self.checkpoint: Dict = {}
+        self.resumed = False
+        self.finished = False
+        self.sample: List[Dict] = []
+        self._csv = None
+        self._txt = None
+
+    @property
+    def state_key(self) -> str:
+        return SCRAPE_CHECKPOINT + self.search
+
+    # Checkpoint fields, for the scraper's loop
+    @property
+    def next_start(self) -> int:
+        return self.checkpoint["next_start"]
+
+    @property
+    def post_count(self) -> int:
+        return self.checkpoint["posts"]
+
+    @property
+    def empty_pages(self) -> int:
+        return self.checkpoint["empty_pages"]
+
+    @property
+    def csv_file(self) -> Optional[str]:
+        return self.checkpoint.get("csv_file")
+
+    @property
+    def txt_file(self) -> Optional[str]:
+        return self.checkpoint.get("txt_file")
+
+    def load_checkpoint(self) -> Optional[Dict]:
+        """The unfinished run's checkpoint for this search, if its files are still there"""
+        value = self.store.get_state(self.state_key)
+        if not value:
+            return None
+        try:
+            checkpoint = json.loads(value)
+        except ValueError:
+            return None
+        if checkpoint.get("posts_per_page") != self.posts_per_page:
+            # Page starts wouldn't line up
+            return None
+        if not (os.path.exists(checkpoint["csv_file"]) and os.path.exists(checkpoint["txt_file"])):
+            return None
+        return checkpoint
+
+    def open(self, resume: bool = True) -> bool:
+        """
+        Start a run, or continue the unfinished one for this search.
+
+        Returns:
+            True if an earlier run was resumed
+        """
+        checkpoint = self.load_checkpoint() if resume else None
+        if checkpoint:
+            self.checkpoint = checkpoint
+            self.resumed = True
+            # Drop anything written after the last checkpoint (a half-written page)
+            for path, size in ((checkpoint["csv_file"], checkpoint["csv_bytes"]),
+                               (checkpoint["txt_file"], checkpoint["txt_bytes"])):
+                with open(path, "r+b") as f:
+                    f.truncate(size)
+            self._csv = open(checkpoint["csv_file"], "a", newline='', encoding='utf-8')
+            self._txt = open(checkpoint["txt_file"], "a", encoding='utf-8')
+            return True
+
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.checkpoint = {
+            "search": self.search,
+            "posts_per_page": self.posts_per_page,
+            "next_start": 0,
+            "pages": 0,
+            "posts": 0,
+            "empty_pages": 0,
+            "csv_file": f"{self.filename_prefix}_{timestamp}.csv",
+            "txt_file": f"{self.filename_prefix}_parsed_{timestamp}.txt",
+            "started_at": time.time(),
+        }
+        self.resumed = False
+        self._csv = open(self.csv_file, "w", newline='', encoding='utf-8-sig')
+        csv.writer(self._csv).writerow(CSV_HEADERS)
+        self._txt = open(self.txt_file, "w", encoding='utf-8')
+        self._txt.write("=== LinkedIn Marketing Jobs in Dubai ===\n\n")
+        self._save_checkpoint()
+        return False
+
+    def write_page(self, start: int, data: Dict, posts: List[Dict]) -> None:
+        """Durably record one fetched page: raw response, CSV/TXT rows, stored posts and checkpoint"""
+        fetched_at = time.time()
+        self.archive.append("searchClusters", f"{self.search}|start={start}", data, fetched_at)
+
+        with span("file_write", "posts_csv_txt"):
+            writer = csv.writer(self._csv)
+            number = self.post_count
+            for post in posts:
+                number += 1
+                writer.writerow([
+                    number,
+                    post.get('author_name', 'Unknown'),
+                    post.get('profile_url', 'Not found'),
+                    post.get('post_content', 'No content'),
+                    post.get('post_url', 'No URL'),
+                ])
+                self._txt.write(f"POST #{number}\n")
+                self._txt.write("-" * 50 + "\n")
+                self._txt.write(f"Author: {post.get('author_name', 'Unknown')}\n")
+                self._txt.write(f"Profile: {post.get('profile_url', 'Not found')}\n")
+                self._txt.write(f"Content: {post.get('post_content', 'No content')}\n")
+                self._txt.write(f"URL: {post.get('post_url', 'No URL')}\n")
+                self._txt.write("\n")
+            for f in (self._csv, self._txt):
+                f.flush()
+                os.fsync(f.fileno())
+
+        self.sample.extend(posts[:SAMPLE_SIZE - len(self.sample)])
+        self.checkpoint.update({
+            "next_start": start + self.posts_per_page,
+            "pages": self.checkpoint["pages"] + 1,
+            "posts": number,
+            "empty_pages": 0 if posts else self.empty_pages + 1,
+        })
+        with span("store_write", "posts"):
+            self.store.save_posts(posts, search=self.search, page_start=start, fetched_at=fetched_at, commit=False)
+            self._save_checkpoint()
+
+    def _save_checkpoint(self) -> None:
+        """Commit the checkpoint (and any posts saved with commit=False) in one transaction"""
+        self.checkpoint["csv_bytes"] = os.path.getsize(self.csv_file)
+        self.checkpoint["txt_bytes"] = os.path.getsize(self.txt_file)
+        self.store.set_state(self.state_key, json.dumps(self.checkpoint))
+
+    def finish(self) -> None:
+        """End the run: the next run for this search starts from the first page"""
+        self.close()
+        self.store.delete_state(self.state_key)
+        self.finished = True
+
+    def close(self) -> None:
+        """Close the files but keep the checkpoint, so the next run resumes"""
+        for f in (self._csv, self._txt):
+            if f is not None:
+                f.close()
+        self._csv = self._txt = None
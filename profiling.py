@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Command Profiling
+
+Backs the --profile switch of the command-line scripts. With --profile (or
+--profile=cprofile) the command runs under cProfile. With --profile=sample
+only a stack sampler runs, which costs much less on long scrapes. Either way
+two files are written to local_data/profiles/ (LINKEDIN_PROFILE_DIR):
+
+    <script>_<timestamp>.prof     pstats: snakeviz, or `python profiling.py FILE`
+    <script>_<timestamp>.folded   collapsed stacks: flamegraph.pl, speedscope, inferno
+
+The sampler reads the command thread's stack every SAMPLE_INTERVAL_MS of
+wall-clock time, so sleeps and network waits show up as well as CPU time.
+In sample mode the .prof file is built from those samples: call counts are
+sample counts and times are estimated from the share of samples.
+
+Interactive scripts write one profile per action, so time spent waiting at
+the prompt is left out.
+
+Usage:
+    python linkedin_api_call.py --profile
+    python linkedin_connection_checker.py https://www.linkedin.com/in/johndoe/ --profile=sample
+    python profiling.py local_data/profiles/linkedin_api_call_20250101_120000.prof --top 30
+    flamegraph.pl local_data/profiles/linkedin_api_call_20250101_120000.folded > flame.svg
+"""
+
+import argparse
+import cProfile
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from identity_cache import LOCAL_DATA_DIR
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+PROFILE_DIR = os.environ.get("LINKEDIN_PROFILE_DIR", os.path.join(LOCAL_DATA_DIR, "profiles"))
+PROFILE_MODES = ("cprofile", "sample")
+PROFILE_FLAG = "--profile"
+
+# Wall-clock time between stack samples
+SAMPLE_INTERVAL_MS = 5
+
+# Functions printed after a profiled run
+SUMMARY_TOP = 15
+
+
+def pop_profile_flag(argv: Optional[List[str]] = None) -> Optional[str]:
+    """
+    Remove --profile[=MODE] from argv (sys.argv by default), before the script reads its arguments.
+
+    Returns:
+        The profiling mode, or None if the flag wasn't given
+    """
+    argv = sys.argv if argv is None else argv
+    mode = None
+    for arg in list(argv[1:]):
+        if arg == PROFILE_FLAG or arg.startswith(PROFILE_FLAG + "="):
+            argv.remove(arg)
+            mode = arg.partition("=")[2] or "cprofile"
+    if mode is not None and mode not in PROFILE_MODES:
+        print(f"❌ Unknown profile mode {mode!r} (expected one of {', '.join(PROFILE_MODES)})")
+        sys.exit(2)
+    return mode
+
+
+class StackSampler:
+    """Background thread that counts one thread's call stacks, in collapsed-stack form"""
+
+    def __init__(self, thread_id: Optional[int] = None, interval_ms: float = SAMPLE_INTERVAL_MS):
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.interval = interval_ms / 1000
+        self.stacks: Dict[str, int] = {}
+        self.samples = 0
+        self.elapsed = 0.0
+        # Collapsed-stack label -> pstats function key (filename, line, name)
+        self.functions: Dict[str, Tuple[str, int, str]] = {}
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.elapsed = time.perf_counter() - self._started
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                label = f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                if label not in self.functions:
+                    self.functions[label] = (code.co_filename, code.co_firstlineno, code.co_name)
+                names.append(label)
+                frame = frame.f_back
+            stack = ";".join(reversed(names))
+            self.stacks[stack] = self.stacks.get(stack, 0) + 1
+            self.samples += 1
+
+    def write_collapsed(self, path: str) -> None:
+        """One `root;...;leaf count` line per distinct stack"""
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack} {count}\n")
+
+    def write_pstats(self, path: str) -> None:
+        """
+        Write the samples as a pstats file (readable by pstats.Stats, snakeviz).
+
+        A function's call count is the number of samples it appears in, its
+        own time the samples it was on top of the stack, and its cumulative
+        time the samples it was anywhere on the stack.
+        """
+        per_sample = self.elapsed / self.samples if self.samples else 0.0
+        own: Dict[str, int] = {}
+        inclusive: Dict[str, int] = {}
+        edges: Dict[Tuple[str, str], int] = {}
+        edges_own: Dict[Tuple[str, str], int] = {}
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            leaf = frames[-1]
+            own[leaf] = own.get(leaf, 0) + count
+            # Count recursive frames once per sample
+            for label in set(frames):
+                inclusive[label] = inclusive.get(label, 0) + count
+            for edge in set(zip(frames, frames[1:])):
+                edges[edge] = edges.get(edge, 0) + count
+            if len(frames) > 1:
+                edge = (frames[-2], leaf)
+                edges_own[edge] = edges_own.get(edge, 0) + count
+
+        callers: Dict[str, Dict] = {label: {} for label in inclusive}
+        for (caller, callee), count in edges.items():
+            callers[callee][self._function(caller)] = (
+                count, count, edges_own.get((caller, callee), 0) * per_sample, count * per_sample)
+
+        stats = {
+            self._function(label): (count, count, own.get(label, 0) * per_sample, count * per_sample,
+                                    callers[label])
+            for label, count in inclusive.items()
+        }
+        with open(path, "wb") as f:
+            marshal.dump(stats, f)
+
+    def _function(self, label: str) -> Tuple[str, int, str]:
+        """pstats key for a stack label"""
+        return self.functions.get(label, ("~", 0, label))
+
+    def top_frames(self, limit: int = SUMMARY_TOP) -> List:
+        """(leaf frame, samples) for the frames most often on top of the stack"""
+        leaves: Dict[str, int] = {}
+        for stack, count in self.stacks.items():
+            leaf = stack.rsplit(";", 1)[-1]
+            leaves[leaf] = leaves.get(leaf, 0) + count
+        return sorted(leaves.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def run_profiled(mode: Optional[str], name: str, func: Callable, *args, **kwargs):
+    """
+    Run func(*args, **kwargs), profiled if `mode` is set, and write the profile files.
+
+    The files are written however the command ends (return, sys.exit, Ctrl+C, exception).
+    """
+    if not mode:
+        return func(*args, **kwargs)
+
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base_path = os.path.join(PROFILE_DIR, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    sampler = StackSampler()
+    profiler = cProfile.Profile() if mode == "cprofile" else None
+    sampler.start()
+    try:
+        if profiler is not None:
+            return profiler.runcall(func, *args, **kwargs)
+        return func(*args, **kwargs)
+    finally:
+        sampler.stop()
+        sampler.write_collapsed(base_path + ".folded")
+        print("\n" + "=" * 80)
+        print(f"⏱️ PROFILE ({mode}, {sampler.samples} stack samples)")
+        print("=" * 80)
+        if profiler is not None:
+            profiler.dump_stats(base_path + ".prof")
+            pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(SUMMARY_TOP)
+        else:
+            sampler.write_pstats(base_path + ".prof")
+            for frame, count in sampler.top_frames():
+                print(f"   {count / max(1, sampler.samples):6.1%}  {frame}")
+        print(f"📊 pstats: {base_path}.prof")
+        print(f"🔥 Collapsed stacks: {base_path}.folded")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print a saved profile")
+    parser.add_argument("path", help=".prof (pstats) or .folded (collapsed stacks) file")
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key (cumulative, tottime, ncalls, ...)")
+    parser.add_argument("--top", type=int, default=30, help="Rows to print")
+    args = parser.parse_args()
+
+    if args.path.endswith(".folded"):
+        sampler = StackSampler()
+        with open(args.path, "r", encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                sampler.stacks[stack] = int(count)
+                sampler.samples += int(count)
+        print(f"📊 {sampler.samples} samples, {len(sampler.stacks)} distinct stacks")
+        for frame, count in sampler.top_frames(args.top):
+            print(f"   {count / max(1, sampler.samples):6.1%}  {frame}")
+    else:
+        pstats.Stats(args.path).sort_stats(args.sort).print_stats(args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+Offline Re-extraction
+
+Runs archived raw responses (see response_archive.py) through the current
+extractors and writes what they derive back to local storage, without any
+requests to LinkedIn. After an extractor is fixed, this backfills everything
+fetched so far instead of fetching it again:
+
+    searchClusters          -> post_extraction.extract_posts                  -> posts (local_store.py)
+    messengerConversations  -> extract_conversation_data                     -> conversations (local_store.py)
+    profileView, relationship_*, profileActions, identity, hoveringCard
+                            -> LinkedInConnectionChecker.extract_connection_info -> connection_cache.py
+
+Records are decoded and extracted in a process pool. Each worker memory-maps
+the archive read-only and is sent batches of record offsets, so only the
+derived records travel back. The parent does every write, in archive order,
+so a newer response always wins over an older one.
+
+Workers call the extraction functions directly: no session, live archive or
+store is opened for them. Posts need no config.py; the conversation and
+connection extractors live in modules that load it on import.
+
+By default the main archive and the debug capture archives are read.
+
+Usage:
+    python reextract.py
+    python reextract.py --endpoint searchClusters --since-days 90
+    python reextract.py --archive local_data/response_archive/responses.dat --workers 8
+    python reextract.py --dry-run
+"""
+
+import argparse
+import contextlib
+import mmap
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from connection_cache import ConnectionCache, default_connection_cache
+from debug_capture import default_debug_capture
+from local_store import LocalStore, default_local_store
+from response_archive import RESPONSE_ARCHIVE_PATH, ResponseArchive, decode_record
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+# Worker processes (0 or 1 extracts in this process)
+REEXTRACT_WORKERS = os.cpu_count() or 1
+
+# Records sent to a worker at a time
+REEXTRACT_BATCH_SIZE = 200
+
+# Connection check endpoints whose answer counts without a distance (see connection_strategies)
+FALLBACK_CONNECTION_ENDPOINTS = ("identity", "hoveringCard")
+CONNECTION_ENDPOINTS = ("profileView", "profileActions") + FALLBACK_CONNECTION_ENDPOINTS
+
+
+def extractor_kind(endpoint: str) -> Optional[str]:
+    """'posts', 'conversations' or 'connection' for an archived endpoint, None if nothing extracts it"""
+    if endpoint == "searchClusters":
+        return "posts"
+    if endpoint == "messengerConversations":
+        return "conversations"
+    if endpoint in CONNECTION_ENDPOINTS or endpoint.startswith("relationship_"):
+        return "connection"
+    return None
+
+
+# ==========================================
+# WORKER SIDE
+# ==========================================
+
+# Per worker process: extraction functions and archive maps, looked up on first use
+_extractors: Dict[str, Callable] = {}
+_views: Dict[str, Tuple[object, mmap.mmap]] = {}
+
+
+def _extractor(kind: str) -> Callable:
+    if kind not in _extractors:
+        if kind == "posts":
+            from post_extraction import extract_posts
+            _extractors[kind] = lambda data: extract_posts(data)[0]
+            return _extractors[kind]
+        try:
+            if kind == "conversations":
+                from linkedin_conversation_extractor import LinkedInConversationExtractor
+                _extractors[kind] = LinkedInConversationExtractor.extract_conversation_data
+            else:
+                from linkedin_connection_checker import LinkedInConnectionChecker
+                _extractors[kind] = LinkedInConnectionChecker.extract_connection_info
+        except SystemExit:
+            raise RuntimeError(f"Extracting {kind} needs config.py (copy config_template.py)")
+    return _extractors[kind]
+
+
+def _view(path: str, end: int) -> mmap.mmap:
+    """Read-only map of an archive covering at least `end` bytes"""
+    if path not in _views or len(_views[path][1]) < end:
+        if path in _views:
+            f, view = _views.pop(path)
+            view.close()
+            f.close()
+        f = open(path, "rb")
+        _views[path] = (f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+    return _views[path][1]
+
+
+def reextract_batch(path: str, rows: List[Tuple[int, int]]) -> Dict:
+    """
+    Decode and extract one batch of (offset, length) records; runs in a worker.
+
+    Returns:
+        {'derived': [(kind, endpoint, key, captured_at, output), ...], 'errors': [...], 'bytes': int}
+    """
+    derived, errors = [], []
+    view = _view(path, max(offset + length for offset, length in rows))
+    # The extractors print progress meant for interactive use
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for offset, _ in rows:
+            try:
+                record = decode_record(view, offset)
+                endpoint = record["endpoint"]
+                kind = extractor_kind(endpoint)
+                if kind == "connection":
+                    output = _extractor(kind)(record["data"], endpoint)
+                else:
+                    output = _extractor(kind)(record["data"])
+                derived.append((kind, endpoint, record["key"], record["captured_at"], output))
+            except Exception as e:
+                errors.append(f"{os.path.basename(path)}@{offset}: {e}")
+    return {"derived": derived, "errors": errors, "bytes": sum(length for _, length in rows)}
+
+
+# ==========================================
+# PARENT SIDE
+# ==========================================
+
+def default_archive_paths() -> List[str]:
+    """The main response archive and the debug capture archives, oldest capture file first"""
+    paths = [RESPONSE_ARCHIVE_PATH] if os.path.exists(RESPONSE_ARCHIVE_PATH) else []
+    return paths + default_debug_capture().archive_files()
+
+
+class Reextractor:
+    """Streams archived responses through the extractors in a process pool and stores the results"""
+
+    def __init__(self, store: Optional[LocalStore] = None, connection_cache: Optional[ConnectionCache] = None,
+                 workers: int = REEXTRACT_WORKERS, batch_size: int = REEXTRACT_BATCH_SIZE, dry_run: bool = False):
+        self.store = store or default_local_store()
+        self.connection_cache = connection_cache if connection_cache is not None else default_connection_cache()
+        self.workers = workers
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.stats = self.new_stats()
+        # public_id -> [(captured_at, endpoint, extracted result), ...] in archive order
+        self._connection_checks: Dict[str, List[Tuple[float, str, Dict]]] = {}
+
+    @staticmethod
+    def new_stats() -> Dict:
+        return {
+            "records": 0, "bytes": 0, "errors": 0, "by_endpoint": {},
+            "posts": 0, "conversations": 0, "connections": 0, "connections_skipped": 0,
+            "elapsed": 0.0,
+        }
+
+    def batches(self, path: str, endpoints: Optional[List[str]] = None,
+                since: Optional[float] = None) -> Iterator[Tuple[str, List[Tuple[int, int]]]]:
+        """(path, [(offset, length), ...]) batches of the records that have an extractor"""
+        archive = ResponseArchive(path)
+        try:
+            batch = []
+            for row in archive.iter_index(since=since):
+                endpoint = row["endpoint"]
+                if extractor_kind(endpoint) is None or (endpoints and endpoint not in endpoints):
+                    continue
+                batch.append((row["offset"], row["length"]))
+                if len(batch) >= self.batch_size:
+                    yield path, batch
+                    batch = []
+            if batch:
+                yield path, batch
+        finally:
+            archive.close()
+
+    def run(self, archive_paths: List[str], endpoints: Optional[List[str]] = None,
+            since: Optional[float] = None) -> Dict:
+        """Re-extract every supported record in `archive_paths` (in order) and write the results"""
+        self.stats = self.new_stats()
+        self._connection_checks = {}
+        start = time.perf_counter()
+
+        batches = (batch for path in archive_paths for batch in self.batches(path, endpoints, since))
+        if self.workers <= 1:
+            for path, rows in batches:
+                self._apply(reextract_batch(path, rows))
+        else:
+            # spawn: workers open their own stores instead of inheriting this process's SQLite handles
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                # A bounded window of batches in flight, applied in submission (= archive) order
+                in_flight = deque()
+                for path, rows in batches:
+                    in_flight.append(executor.submit(reextract_batch, path, rows))
+                    if len(in_flight) >= self.workers * 2:
+                        self._apply(in_flight.popleft().result())
+                while in_flight:
+                    self._apply(in_flight.popleft().result())
+
+        self._store_connections()
+        self.stats["elapsed"] = time.perf_counter() - start
+        return self.stats
+
+    def _apply(self, result: Dict) -> None:
+        self.stats["bytes"] += result["bytes"]
+        self.stats["errors"] += len(result["errors"])
+        for error in result["errors"][:3]:
+            print(f"⚠️ {error}")
+
+        for kind, endpoint, key, captured_at, output in result["derived"]:
+            self.stats["records"] += 1
+            self.stats["by_endpoint"][endpoint] = self.stats["by_endpoint"].get(endpoint, 0) + 1
+            if not output:
+                continue
+            if kind == "posts":
+                # Keys are "<keywords>|start=<offset>" (legacy imports: the old file name)
+                search, separator, page_start = key.rpartition("|start=")
+                if not separator:
+                    search, page_start = key, None
+                self.stats["posts"] += len(output)
+                if not self.dry_run:
+                    self.store.save_posts(output, search=search,
+                                          page_start=int(page_start) if page_start else None,
+                                          fetched_at=captured_at)
+            elif kind == "conversations":
+                self.stats["conversations"] += len(output)
+                if not self.dry_run:
+                    # Older pages come first, so the newest copy of a conversation is saved last
+                    self.store.save_conversations(output, mark_synced=False, advance_cursor=False)
+            else:
+                self._connection_checks.setdefault(key, []).append((captured_at, endpoint, output))
+
+    @staticmethod
+    def connection_result(public_id: str, checks: List[Tuple[float, str, Dict]]) -> Tuple[Dict, float]:
+        """
+        Combine one profile's archived responses the way resolve_connection_status does:
+        the latest response with a distance answers, else the latest fallback endpoint's,
+        and the latest name found is kept.
+
+        Returns:
+            (result, checked_at)
+        """
+        result = {
+            "profile_url": f"https://www.linkedin.com/in/{public_id}/",
+            "is_connected": False,
+            "distance": None,
+            "connection_status": "Unknown",
+            "profile_name": None,
+            "error": None,
+        }
+        answer = next((check for check in reversed(checks) if check[2].get("distance") is not None), None)
+        if answer is None:
+            answer = next((check for check in reversed(checks) if check[1] in FALLBACK_CONNECTION_ENDPOINTS), None)
+        name = next((check[2]["profile_name"] for check in reversed(checks) if check[2].get("profile_name")), None)
+
+        if answer:
+            result.update(answer[2])
+            checked_at = answer[0]
+        else:
+            result["error"] = ("Could not determine connection status, but found profile name" if name
+                               else "Could not determine connection status using any method")
+            checked_at = checks[-1][0]
+        if name:
+            result["profile_name"] = name
+        return result, checked_at
+
+    def _store_connections(self) -> None:
+        for public_id, checks in self._connection_checks.items():
+            result, checked_at = self.connection_result(public_id, checks)
+            cached = self.connection_cache.get(public_id)
+            if cached and cached["checked_at"] >= checked_at:
+                # A live check since then knows better
+                self.stats["connections_skipped"] += 1
+                continue
+            if self.dry_run or self.connection_cache.put(public_id, result, checked_at=checked_at):
+                self.stats["connections"] += 1
+            else:
+                # Expired already (or not cacheable)
+                self.stats["connections_skipped"] += 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run the extractors over archived raw responses")
+    parser.add_argument("--archive", action="append", metavar="PATH",
+                        help="Archive data file (repeatable; default: main and debug capture archives)")
+    parser.add_argument("--endpoint", action="append", help="Only this endpoint (repeatable), e.g. searchClusters")
+    parser.add_argument("--since-days", type=float, help="Only responses captured in the last N days")
+    parser.add_argument("--workers", type=int, default=REEXTRACT_WORKERS,
+                        help=f"Worker processes (default: {REEXTRACT_WORKERS}; 1 runs in this process)")
+    parser.add_argument("--batch-size", type=int, default=REEXTRACT_BATCH_SIZE, help="Records per worker batch")
+    parser.add_argument("--dry-run", action="store_true", help="Extract and count, but don't write anything")
+    args = parser.parse_args()
+
+    paths = args.archive or default_archive_paths()
+    if not paths:
+        print("❌ No response archives found (see response_archive.py)")
+        return
+    since = time.time() - args.since_days * 86400 if args.since_days else None
+
+    print("=" * 80)
+    print(f"♻️ RE-EXTRACTING {len(paths)} archive(s) with {args.workers} worker(s)"
+          f"{' (dry run)' if args.dry_run else ''}")
+    print("=" * 80)
+    for path in paths:
+        print(f"🗄️ {path}")
+
+    reextractor = Reextractor(workers=args.workers, batch_size=args.batch_size, dry_run=args.dry_run)
+    stats = reextractor.run(paths, endpoints=args.endpoint, since=since)
+
+    elapsed = max(stats["elapsed"], 1e-9)
+    print("-" * 80)
+    for endpoint, count in sorted(stats["by_endpoint"].items()):
+        print(f"   {endpoint}: {count}")
+    print(f"📝 Posts: {stats['posts']}")
+    print(f"💬 Conversations: {stats['conversations']}")
+    print(f"🔗 Connection results: {stats['connections']} ({stats['connections_skipped']} skipped: already current or expired)")
+    if stats["errors"]:
+        print(f"⚠️ Records that failed: {stats['errors']}")
+    print(f"⏱️ {stats['records']} records ({stats['bytes'] / 1048576:.1f} MB) in {elapsed:.2f}s: "
+          f"{stats['records'] / elapsed:.0f} records/s, {stats['bytes'] / 1048576 / elapsed:.1f} MB/s")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
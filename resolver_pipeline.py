@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Adaptive Resolver Pipeline
+
+Runs a list of strategies (usually one API endpoint each) until one of them
+gives an acceptable answer, and learns from every run. Hits, misses and
+latency are recorded per strategy in the local store (resolver_stats table),
+and the next run tries them in order of expected pay-off:
+
+    score = hit rate / mean latency      (hits per second spent)
+
+which is the order that minimises the expected time to the first hit. Hit
+rates and latencies are smoothed, so untried strategies keep their listed
+order. A strategy that has missed SKIP_AFTER_FAILURES times in a row, while
+another strategy answered, is skipped. It gets one retry once RETRY_SKIPPED_AFTER
+seconds have passed. Fallback strategies always run after the others.
+
+Usage:
+    pipeline = ResolverPipeline("connection_status", [
+        Strategy("profileView", check_via_profile_view, has_distance),
+        Strategy("identity", check_via_identity_api, bool, fallback=True),
+    ])
+    outcome = pipeline.run(public_id)
+    python resolver_pipeline.py --stats connection_status
+    python resolver_pipeline.py --reset connection_status
+"""
+
+import argparse
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from local_store import LocalStore, default_local_store
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+# Misses in a row (while another strategy answered) before a strategy is skipped
+SKIP_AFTER_FAILURES = 5
+
+# Skipped strategies get one retry after this long (seconds)
+RETRY_SKIPPED_AFTER = 24 * 3600
+
+# Latency assumed for a strategy before it has been timed (seconds)
+PRIOR_LATENCY = 1.0
+
+
+class Strategy(NamedTuple):
+    name: str
+    resolve: Callable[..., Optional[Dict]]      # (key, *run args)
+    accept: Callable[[Dict], bool]      # whether a result answers the question
+    fallback: bool = False              # only tried after every other strategy
+
+
+class PipelineOutcome(NamedTuple):
+    answer: Optional[Dict]              # accepted result, or None
+    strategy: Optional[str]             # name of the strategy that answered
+    partials: List[Dict]                # results returned but not accepted, in run order
+    tried: List[str]
+    skipped: List[str]
+
+
+class ResolverPipeline:
+    """Strategy cascade that reorders itself from recorded hit rates and latencies"""
+
+    def __init__(self, name: str, strategies: List[Strategy], store: Optional[LocalStore] = None,
+                 skip_after: int = SKIP_AFTER_FAILURES, retry_after: float = RETRY_SKIPPED_AFTER):
+        self.name = name
+        self.strategies = strategies
+        self.store = store or default_local_store()
+        self.skip_after = skip_after
+        self.retry_after = retry_after
+
+    @staticmethod
+    def score(stats: Optional[Dict]) -> float:
+        """Smoothed hit rate per second of latency"""
+        if not stats:
+            return 0.5 / PRIOR_LATENCY
+        hit_rate = (stats["hits"] + 1) / (stats["attempts"] + 2)
+        mean_latency = (stats["total_latency"] + PRIOR_LATENCY) / (stats["attempts"] + 1)
+        return hit_rate / max(mean_latency, 1e-3)
+
+    def is_skipped(self, stats: Optional[Dict], now: float) -> bool:
+        if not stats or stats["consecutive_failures"] < self.skip_after:
+            return False
+        return now - (stats["last_attempt_at"] or 0) < self.retry_after
+
+    def plan(self) -> Tuple[List[Strategy], List[Strategy]]:
+        """(strategies to try in order, strategies skipped this run)"""
+        stats = self.store.load_resolver_stats(self.name)
+        now = time.time()
+        active = [s for s in self.strategies if not self.is_skipped(stats.get(s.name), now)]
+        skipped = [s for s in self.strategies if s not in active]
+        # sorted() is stable, so equal scores (e.g. untried strategies) keep their listed order
+        ordered = sorted(active, key=lambda s: (s.fallback, -self.score(stats.get(s.name))))
+        return ordered, skipped
+
+    def run(self, key: str, *args) -> PipelineOutcome:
+        """Try strategies on `key` (plus any `args`) until one is accepted, then record the run"""
+        ordered, skipped = self.plan()
+        attempts: List[Dict] = []
+        partials: List[Dict] = []
+        answer, answered_by = None, None
+
+        for strategy in ordered:
+            start = time.perf_counter()
+            try:
+                result = strategy.resolve(key, *args)
+            except Exception as e:
+                print(f"❌ Strategy {strategy.name} error: {e}")
+                result = None
+            latency = time.perf_counter() - start
+
+            hit = bool(result) and strategy.accept(result)
+            attempts.append({"strategy": strategy.name, "hit": hit, "latency": latency})
+            if hit:
+                answer, answered_by = result, strategy.name
+                break
+            if result:
+                partials.append(result)
+
+        # Misses only count towards skipping when something else answered; if
+        # everything missed, the profile (or the session) is the likelier cause
+        for attempt in attempts:
+            attempt["failure"] = answer is not None
+        self.store.record_resolver_attempts(self.name, attempts)
+
+        return PipelineOutcome(answer, answered_by, partials,
+                               [a["strategy"] for a in attempts], [s.name for s in skipped])
+
+    def report(self) -> List[Dict]:
+        """Per-strategy stats in the order the next run would use"""
+        stats = self.store.load_resolver_stats(self.name)
+        ordered, skipped = self.plan()
+        rows = []
+        for strategy in ordered + skipped:
+            entry = stats.get(strategy.name) or {}
+            attempts = entry.get("attempts", 0)
+            rows.append({
+                "strategy": strategy.name,
+                "attempts": attempts,
+                "hit_rate": entry.get("hits", 0) / attempts if attempts else None,
+                "mean_latency_ms": entry.get("total_latency", 0) / attempts * 1000 if attempts else None,
+                "consecutive_failures": entry.get("consecutive_failures", 0),
+                "skipped": strategy in skipped,
+                "fallback": strategy.fallback,
+            })
+        return rows
+
+
+def print_report(rows: List[Dict]):
+    print(f"{'Strategy':<34} {'tries':>6} {'hit %':>7} {'ms':>8} {'misses':>7}  status")
+    print("-" * 80)
+    for row in rows:
+        hit_rate = f"{row['hit_rate'] * 100:.0f}" if row['hit_rate'] is not None else "-"
+        latency = f"{row['mean_latency_ms']:.0f}" if row['mean_latency_ms'] is not None else "-"
+        status = "skipped" if row['skipped'] else ("fallback" if row['fallback'] else "")
+        print(f"{row['strategy']:<34} {row['attempts']:>6} {hit_rate:>7} {latency:>8} "
+              f"{row['consecutive_failures']:>7}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or reset resolver pipeline statistics")
+    parser.add_argument("--stats", metavar="PIPELINE", help="Show per-strategy stats, in run order")
+    parser.add_argument("--reset", metavar="PIPELINE", help="Forget recorded stats")
+    args = parser.parse_args()
+
+    store = default_local_store()
+    if args.reset:
+        store.reset_resolver_stats(args.reset)
+        print(f"🗑️ Reset stats for {args.reset}")
+    if args.stats:
+        if args.stats == "connection_status":
+            from linkedin_connection_checker import LinkedInConnectionChecker
+            print_report(LinkedInConnectionChecker(store=store).pipeline.report())
+        else:
+            for name, stats in store.load_resolver_stats(args.stats).items():
+                print(f"📊 {name}: {stats}")
+    if not (args.reset or args.stats):
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Raw Response Archive
+
+Append-only archive for raw API responses. All responses go into one data file
+instead of one JSON file each. Every record is length-prefixed and
+zlib-compressed:
+
+    file:    MAGIC | record | record | ...
+    record:  <payload_len u32> <crc32 u32> <captured_at f64> <endpoint_len u16> <key_len u16>
+             endpoint (utf-8) | key (utf-8) | payload (zlib-compressed compact JSON)
+
+A sidecar SQLite index (<archive>.idx) maps (endpoint, key, captured_at) to
+the record's offset and length. Reads go through a memory map of the data
+file, so fetching any archived response is one index seek plus one slice,
+with no directory scan. The index can always be rebuilt from the data file,
+because record headers describe themselves. A record cut short by a crash is
+truncated away the next time the archive is opened.
+
+Several processes may append to the same archive (the scraper and the
+messaging scripts all use default_response_archive()). Appends and that
+recovery step hold an exclusive lock on <archive>.lock, and each append takes
+its offset from the real end of the file, not from this handle's position.
+
+Usage:
+    archive = default_response_archive()
+    archive.append("searchClusters", "hiring marketing dubai|start=10", data)
+    archive.get("profileView", "john-doe")            # latest record, or None
+    python response_archive.py --stats
+    python response_archive.py --list profileView
+    python response_archive.py --show profileView john-doe
+    python response_archive.py --import-dir debug_responses
+    python response_archive.py --rebuild-index
+"""
+
+import argparse
+import glob
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: lock the first byte of the lock file instead
+    fcntl = None
+    import msvcrt
+
+from identity_cache import LOCAL_DATA_DIR
+from metrics import span
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+RESPONSE_ARCHIVE_PATH = os.path.join(LOCAL_DATA_DIR, "response_archive", "responses.dat")
+
+MAGIC = b"LIRESP01"
+RECORD_HEADER = struct.Struct("<IIdHH")
+ZLIB_LEVEL = 6
+
+INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    offset       INTEGER PRIMARY KEY,
+    length       INTEGER NOT NULL,
+    endpoint     TEXT NOT NULL,
+    key          TEXT NOT NULL,
+    captured_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_records_lookup ON records (endpoint, key, captured_at);
+CREATE INDEX IF NOT EXISTS idx_records_captured_at ON records (captured_at);
+"""
+
+
+class ArchiveError(Exception):
+    """Raised when a record fails its checksum or the file isn't an archive"""
+
+
+def encode_record(endpoint: str, key: str, data, captured_at: float) -> bytes:
+    endpoint_bytes, key_bytes = endpoint.encode("utf-8"), key.encode("utf-8")
+    payload = zlib.compress(
+        json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=str).encode("utf-8"), ZLIB_LEVEL)
+    header = RECORD_HEADER.pack(len(payload), zlib.crc32(payload), captured_at, len(endpoint_bytes), len(key_bytes))
+    return header + endpoint_bytes + key_bytes + payload
+
+
+def decode_record(view, offset: int, verify: bool = True) -> Dict:
+    """
+    Record at `offset` of an archive's bytes (a memory map or bytes object).
+
+    Needs no ResponseArchive, so other processes can read a mapped archive
+    without opening its index or its append handle.
+    """
+    payload_len, crc, captured_at, endpoint_len, key_len = RECORD_HEADER.unpack_from(view, offset)
+    position = offset + RECORD_HEADER.size
+    endpoint = bytes(view[position:position + endpoint_len]).decode("utf-8")
+    position += endpoint_len
+    key = bytes(view[position:position + key_len]).decode("utf-8")
+    position += key_len
+    payload = view[position:position + payload_len]
+    if verify and zlib.crc32(payload) != crc:
+        raise ArchiveError(f"Checksum mismatch for record at offset {offset}")
+    return {
+        "endpoint": endpoint,
+        "key": key,
+        "captured_at": captured_at,
+        "offset": offset,
+        "data": json.loads(zlib.decompress(payload)),
+    }
+
+
+class ResponseArchive:
+    """Single data file of compressed response records plus a rebuildable offset index"""
+
+    def __init__(self, path: str = RESPONSE_ARCHIVE_PATH):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.lock_path = path + ".lock"
+        self._lock = threading.RLock()
+        self._map: Optional[mmap.mmap] = None
+        self._map_file = None
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock_file = open(self.lock_path, "a+b")
+        self._data = open(path, "ab")
+        self._index = sqlite3.connect(self.index_path, check_same_thread=False)
+        self._index.row_factory = sqlite3.Row
+        self._index.execute("PRAGMA journal_mode=WAL")
+        self._index.execute("PRAGMA synchronous=NORMAL")
+        self._index.executescript(INDEX_SCHEMA)
+        with self._file_lock():
+            if self._data.seek(0, os.SEEK_END) == 0:
+                self._data.write(MAGIC)
+                self._data.flush()
+            with open(path, "rb") as f:
+                is_archive = f.read(len(MAGIC)) == MAGIC
+            if is_archive:
+                self._recover()
+        if not is_archive:
+            self.close()
+            raise ArchiveError(f"{path} is not a response archive")
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared with other processes using this archive"""
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            else:
+                self._lock_file.seek(0)
+                msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+                else:
+                    self._lock_file.seek(0)
+                    msvcrt.locking(self._lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    # ------------------------------------------
+    # Writing
+    # ------------------------------------------
+
+    def append(self, endpoint: str, key: str, data, captured_at: Optional[float] = None) -> int:
+        """Append one response; returns its offset"""
+        return self.append_many([(endpoint, key, data, captured_at)])[0]
+
+    def append_many(self, records: Iterable[Tuple[str, str, object, Optional[float]]]) -> List[int]:
+        """Append (endpoint, key, data, captured_at) records in one write and one index transaction"""
+        encoded = []
+        for endpoint, key, data, captured_at in records:
+            captured_at = captured_at if captured_at is not None else time.time()
+            encoded.append((encode_record(endpoint, key, data, captured_at), endpoint, key, captured_at))
+        if not encoded:
+            return []
+        with self._file_lock(), span("file_write", "response_archive"):
+            # Another process may have appended since this handle last wrote
+            offset = self._data.seek(0, os.SEEK_END)
+            rows = []
+            for record, endpoint, key, captured_at in encoded:
+                rows.append((offset, len(record), endpoint, key, captured_at))
+                offset += len(record)
+            self._data.write(b"".join(record for record, *_ in encoded))
+            self._data.flush()
+            self._index.executemany(
+                "INSERT OR REPLACE INTO records (offset, length, endpoint, key, captured_at) VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._index.commit()
+        return [row[0] for row in rows]
+
+    # ------------------------------------------
+    # Reading
+    # ------------------------------------------
+
+    def _view(self, end: int) -> mmap.mmap:
+        """Memory map covering at least `end` bytes (remapped after appends)"""
+        if self._map is None or len(self._map) < end:
+            self._data.flush()
+            if self._map is not None:
+                self._map.close()
+                self._map_file.close()
+            self._map_file = open(self.path, "rb")
+            self._map = mmap.mmap(self._map_file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def read_at(self, offset: int, length: int) -> Dict:
+        """Record at a known offset (as stored in the index)"""
+        with self._lock:
+            return decode_record(self._view(offset + length), offset)
+
+    def lookup(self, endpoint: str, key: str) -> List[sqlite3.Row]:
+        """Index rows for (endpoint, key), oldest first"""
+        return self._index.execute(
+            "SELECT * FROM records WHERE endpoint = ? AND key = ? ORDER BY captured_at", (endpoint, key)
+        ).fetchall()
+
+    def get(self, endpoint: str, key: str, at: Optional[float] = None) -> Optional[Dict]:
+        """Latest record for (endpoint, key), or the latest captured at or before `at`"""
+        row = self._index.execute(
+            "SELECT offset, length FROM records WHERE endpoint = ? AND key = ? AND captured_at <= ? "
+            "ORDER BY captured_at DESC LIMIT 1",
+            (endpoint, key, at if at is not None else float("inf")),
+        ).fetchone()
+        return self.read_at(row["offset"], row["length"]) if row else None
+
+    def iter_index(self, endpoint: Optional[str] = None, since: Optional[float] = None) -> Iterator[sqlite3.Row]:
+        """Index rows in file order, optionally for one endpoint / captured since a time"""
+        query, params = "SELECT * FROM records WHERE 1 = 1", []
+        if endpoint:
+            query += " AND endpoint = ?"
+            params.append(endpoint)
+        if since is not None:
+            query += " AND captured_at >= ?"
+            params.append(since)
+        yield from self._index.execute(query + " ORDER BY offset", params)
+
+    def iter_records(self, endpoint: Optional[str] = None, key: Optional[str] = None,
+                     since: Optional[float] = None) -> Iterator[Dict]:
+        """Decoded records in file order"""
+        for row in self.iter_index(endpoint, since):
+            if key is None or row["key"] == key:
+                yield self.read_at(row["offset"], row["length"])
+
+    def endpoints(self) -> Dict[str, int]:
+        return {row[0]: row[1] for row in self._index.execute(
+            "SELECT endpoint, COUNT(*) FROM records GROUP BY endpoint ORDER BY endpoint")}
+
+    # ------------------------------------------
+    # Index maintenance
+    # ------------------------------------------
+
+    def _scan(self, start: int) -> Tuple[List[Tuple], int]:
+        """Index rows for the records from `start` on, and where the last complete record ends"""
+        size = os.path.getsize(self.path)
+        rows, offset = [], start
+        if size <= start:
+            return rows, start
+        with open(self.path, "rb") as f:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                while offset + RECORD_HEADER.size <= size:
+                    payload_len, _, captured_at, endpoint_len, key_len = RECORD_HEADER.unpack_from(view, offset)
+                    length = RECORD_HEADER.size + endpoint_len + key_len + payload_len
+                    if offset + length > size:
+                        break
+                    position = offset + RECORD_HEADER.size
+                    endpoint = bytes(view[position:position + endpoint_len]).decode("utf-8")
+                    key = bytes(view[position + endpoint_len:position + endpoint_len + key_len]).decode("utf-8")
+                    rows.append((offset, length, endpoint, key, captured_at))
+                    offset += length
+            finally:
+                view.close()
+        return rows, offset
+
+    def _recover(self) -> None:
+        """Index records appended after the last index commit and drop a torn final record"""
+        row = self._index.execute("SELECT offset, length FROM records ORDER BY offset DESC LIMIT 1").fetchone()
+        indexed_end = row["offset"] + row["length"] if row else len(MAGIC)
+        rows, end = self._scan(indexed_end)
+        if rows:
+            self._index.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?, ?, ?)", rows)
+            self._index.commit()
+        if end < os.path.getsize(self.path):
+            print(f"⚠️ Truncating {os.path.getsize(self.path) - end} bytes of incomplete record from {self.path}")
+            self._data.truncate(end)
+            self._data.seek(end)
+
+    def rebuild_index(self) -> int:
+        """Recreate the index from the data file; returns the number of records"""
+        with self._file_lock():
+            self._index.execute("DELETE FROM records")
+            rows, _ = self._scan(len(MAGIC))
+            self._index.executemany("INSERT INTO records VALUES (?, ?, ?, ?, ?)", rows)
+            self._index.commit()
+        return len(rows)
+
+    # ------------------------------------------
+    # Housekeeping
+    # ------------------------------------------
+
+    def size(self) -> int:
+        self._data.flush()
+        return os.path.getsize(self.path)
+
+    def stats(self) -> Dict:
+        row = self._index.execute("SELECT COUNT(*), MIN(captured_at), MAX(captured_at) FROM records").fetchone()
+        return {
+            "records": row[0],
+            "endpoints": self.endpoints(),
+            "data_bytes": self.size(),
+            "oldest": time.strftime("%Y-%m-%d %H:%M", time.localtime(row[1])) if row[1] else None,
+            "newest": time.strftime("%Y-%m-%d %H:%M", time.localtime(row[2])) if row[2] else None,
+            "path": self.path,
+        }
+
+    def __len__(self) -> int:
+        return self._index.execute("SELECT COUNT(*) FROM records").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._map is not None:
+                self._map.close()
+                self._map_file.close()
+                self._map = None
+            self._data.close()
+            self._lock_file.close()
+            self._index.close()
+
+
+_default_archive: Optional[ResponseArchive] = None
+
+
+def default_response_archive() -> ResponseArchive:
+    """Process-wide archive for raw API responses"""
+    global _default_archive
+    if _default_archive is None:
+        _default_archive = ResponseArchive()
+    return _default_archive
+
+
+def import_json_files(archive: ResponseArchive, directory: str) -> int:
+    """
+    Archive legacy one-file-per-response dumps: debug_responses/<endpoint>_<id>.json
+    and linkedin_search_results_raw_<timestamp>.json files.
+    """
+    records = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        stem = os.path.splitext(os.path.basename(path))[0]
+        if "_raw_" in stem:
+            endpoint, key = "searchClusters", stem
+        elif stem.startswith("relationship_"):
+            name, _, key = stem[len("relationship_"):].partition("_")
+            endpoint = f"relationship_{name}"
+        else:
+            endpoint, _, key = stem.partition("_")
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Skipping {path}: {e}")
+            continue
+        records.append((endpoint, key, data, os.path.getmtime(path)))
+    archive.append_many(records)
+    return len(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the raw response archive")
+    parser.add_argument("--archive", default=RESPONSE_ARCHIVE_PATH, help="Archive data file")
+    parser.add_argument("--stats", action="store_true", help="Record counts per endpoint and file size")
+    parser.add_argument("--list", metavar="ENDPOINT", help="List archived keys for an endpoint")
+    parser.add_argument("--show", nargs=2, metavar=("ENDPOINT", "KEY"), help="Print the latest archived response")
+    parser.add_argument("--import-dir", metavar="DIR", help="Archive a directory of legacy per-response JSON files")
+    parser.add_argument("--rebuild-index", action="store_true", help="Recreate the offset index from the data file")
+    args = parser.parse_args()
+
+    archive = ResponseArchive(args.archive)
+    if args.import_dir:
+        print(f"✅ Archived {import_json_files(archive, args.import_dir)} files from {args.import_dir}")
+    if args.rebuild_index:
+        print(f"✅ Indexed {archive.rebuild_index()} records")
+    if args.list:
+        for row in archive.iter_index(args.list):
+            when = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(row["captured_at"]))
+            print(f"📄 {when}  {row['key']}  ({row['length']} bytes @ {row['offset']})")
+    if args.show:
+        start = time.perf_counter()
+        record = archive.get(*args.show)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if record:
+            print(json.dumps(record["data"], indent=2, ensure_ascii=False))
+            print(f"\n⏱️ Read in {elapsed_ms:.2f} ms")
+        else:
+            print(f"❌ Nothing archived for {args.show[0]} / {args.show[1]}")
+    if args.stats or not (args.import_dir or args.rebuild_index or args.list or args.show):
+        for key, value in archive.stats().items():
+            print(f"📊 {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
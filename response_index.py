@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Normalized Response Index
+
+LinkedIn's normalized voyager responses (accept: application/vnd.linkedin.normalized+json+2.1)
+put every entity in one flat `included` array. Extractors used to scan that
+array once per predicate; ResponseIndex is built once per response and keeps
+lookup tables keyed by `$type`, `entityUrn`, URN namespace and `publicIdentifier`
+so the extractors can do direct lookups instead.
+
+Usage:
+    index = ResponseIndex(response_json)
+    index.of_type('com.linkedin.voyager.identity.profile.Profile')
+    index.by_public_id('johndoe')
+    index.first_urn_in_namespace('fsd_profile')
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+PROFILE_TYPE = 'com.linkedin.voyager.identity.profile.Profile'
+MINI_PROFILE_TYPE = 'com.linkedin.voyager.identity.shared.MiniProfile'
+
+
+def urn_namespace(urn: str) -> Optional[str]:
+    """Return the namespace of a URN, e.g. 'fsd_profile' for 'urn:li:fsd_profile:ACoAA...'"""
+    if not isinstance(urn, str) or not urn.startswith('urn:li:'):
+        return None
+    end = urn.find(':', 7)
+    return urn[7:end] if end != -1 else None
+
+
+class ResponseIndex:
+    """
+    Index over a normalized voyager response.
+
+    The `$type` and `entityUrn` tables are built eagerly in one pass. The
+    publicIdentifier, URN-namespace and field-position tables are built the
+    first time they are asked for and then reused, so each table costs at most
+    one pass over `included` per response.
+    """
+
+    def __init__(self, data: Dict):
+        self.data = data if isinstance(data, dict) else {}
+        included = self.data.get('included', [])
+        self.included: List[Dict] = included if isinstance(included, list) else []
+
+        self._type_positions: Dict[str, List[int]] = {}
+        self._urn_positions: Dict[str, int] = {}
+        self._namespace_positions: Optional[Dict[str, List[int]]] = None
+        self._by_public_id: Optional[Dict[str, List[Dict]]] = None
+        self._field_positions: Dict[Tuple[str, ...], List[int]] = {}
+
+        self._build()
+
+    def _build(self):
+        type_positions = self._type_positions
+        urn_positions = self._urn_positions
+
+        for position, element in enumerate(self.included):
+            if not isinstance(element, dict):
+                continue
+
+            element_type = element.get('$type', '')
+            positions = type_positions.get(element_type)
+            if positions is None:
+                type_positions[element_type] = [position]
+            else:
+                positions.append(position)
+
+            entity_urn = element.get('entityUrn')
+            if entity_urn and entity_urn not in urn_positions:
+                urn_positions[entity_urn] = position
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def types(self) -> List[str]:
+        """All distinct `$type` values in the response"""
+        return list(self._type_positions)
+
+    def of_type(self, element_type: str) -> List[Dict]:
+        """Elements with the given `$type`, in response order"""
+        return [self.included[i] for i in self._type_positions.get(element_type, [])]
+
+    def positions_of_type(self, element_type: str) -> List[int]:
+        return self._type_positions.get(element_type, [])
+
+    def by_urn(self, entity_urn: str) -> Optional[Dict]:
+        """Element whose `entityUrn` equals the given URN"""
+        position = self._urn_positions.get(entity_urn)
+        return self.included[position] if position is not None else None
+
+    def _namespaces(self) -> Dict[str, List[int]]:
+        if self._namespace_positions is None:
+            namespaces: Dict[str, List[int]] = {}
+            for entity_urn, position in self._urn_positions.items():
+                namespace = urn_namespace(entity_urn)
+                if namespace:
+                    namespaces.setdefault(namespace, []).append(position)
+            for positions in namespaces.values():
+                positions.sort()
+            self._namespace_positions = namespaces
+        return self._namespace_positions
+
+    def in_namespace(self, namespace: str) -> List[Dict]:
+        """Elements whose `entityUrn` is in the given namespace (e.g. 'fsd_profile')"""
+        return [self.included[i] for i in self._namespaces().get(namespace, [])]
+
+    def first_urn_in_namespace(self, namespace: str) -> Optional[str]:
+        positions = self._namespaces().get(namespace)
+        return self.included[positions[0]]['entityUrn'] if positions else None
+
+    def by_public_id(self, public_id: str) -> List[Dict]:
+        """Elements whose `publicIdentifier` equals `public_id`, in response order"""
+        if not public_id:
+            return []
+        if self._by_public_id is None:
+            by_public_id: Dict[str, List[Dict]] = {}
+            for element in self.included:
+                value = element.get('publicIdentifier') if isinstance(element, dict) else None
+                if isinstance(value, str) and value:
+                    by_public_id.setdefault(value, []).append(element)
+            self._by_public_id = by_public_id
+        return self._by_public_id.get(public_id, [])
+
+    def positions_with_field(self, *fields: str) -> List[int]:
+        """Positions of elements containing any of `fields`, in response order"""
+        positions = self._field_positions.get(fields)
+        if positions is None:
+            if len(fields) == 1:
+                field = fields[0]
+                positions = [i for i, e in enumerate(self.included) if isinstance(e, dict) and field in e]
+            else:
+                wanted = frozenset(fields)
+                positions = [i for i, e in enumerate(self.included) if isinstance(e, dict) and not wanted.isdisjoint(e)]
+            self._field_positions[fields] = positions
+        return positions
+
+    def positions_with_all_fields(self, *fields: str) -> List[int]:
+        """Positions of elements containing every one of `fields`, in response order"""
+        common = set(self.positions_with_field(fields[0]))
+        for field in fields[1:]:
+            common.intersection_update(self.positions_with_field(field))
+        return sorted(common)
+
+    def with_field(self, *fields: str) -> List[Tuple[int, Dict]]:
+        """(position, element) pairs for elements containing any of `fields`"""
+        return [(i, self.included[i]) for i in self.positions_with_field(*fields)]
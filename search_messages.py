@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Search Stored LinkedIn Messages
+
+Full-text search over the messages kept in the local store (everything the
+messages viewer has fetched). Runs offline against local_data/linkedin_local.db.
+
+Usage:
+    python search_messages.py invoice
+    python search_messages.py invoice --days 90
+    python search_messages.py "invoic*" --with john --limit 20
+    python search_messages.py '"final invoice" OR receipt' --raw
+"""
+
+import argparse
+import sqlite3
+import time
+
+from local_store import default_local_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search your stored LinkedIn messages offline")
+    parser.add_argument("query", help="Words that must all appear (a trailing * matches prefixes)")
+    parser.add_argument("--days", type=float, help="Only messages from the last N days")
+    parser.add_argument("--with", dest="person", metavar="NAME",
+                        help="Only the conversation with this contact (looked up in the stored conversations)")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum number of results (default: 50)")
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 unchanged")
+    args = parser.parse_args()
+
+    store = default_local_store()
+    since = int((time.time() - args.days * 86400) * 1000) if args.days else None
+
+    conversation_urn = None
+    if args.person:
+        from linkedin_conversation_extractor import LinkedInConversationExtractor
+        # Stored conversations only: searching never syncs with LinkedIn
+        result = LinkedInConversationExtractor(store=store).get_urns_by_name(args.person, offline=True)
+        if not result:
+            print(f"❌ No stored conversation matches '{args.person}' "
+                  f"(sync it first, e.g. python get_urns.py \"{args.person}\")")
+            return
+        conversation_urn = result['conversation_urn']
+
+    start = time.perf_counter()
+    try:
+        results = store.search_messages(args.query, since=since, conversation_urn=conversation_urn,
+                                        limit=args.limit, raw=args.raw)
+    except sqlite3.OperationalError as e:
+        print(f"❌ Invalid search query: {e}")
+        return
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    print("=" * 80)
+    print(f"🔎 {len(results)} messages matching '{args.query}'"
+          f"{f' in the last {args.days:g} days' if args.days else ''} ({elapsed_ms:.1f} ms)")
+    print("=" * 80)
+    for message in results:
+        when = message['datetime'].strftime('%Y-%m-%d %H:%M') if message['datetime'] else 'Unknown time'
+        thread = message['conversation_urn'].split(',')[-1].rstrip(')')
+        print(f"\n📱 {when} | {message['sender_name'] or 'Unknown'} | thread {thread}")
+        print(f"   {message['snippet']}")
+    if not results:
+        print(f"\n❌ Nothing found among {store.message_count()} stored messages")
+
+
+if __name__ == "__main__":
+    main()
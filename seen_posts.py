@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Seen-Post Index
+
+Answers "has the scraper collected this post before?" without a database
+query for new posts. Every post the scraper saves goes into the local store's
+`posts` table, keyed by post URL (see local_store.post_key). A Bloom filter
+over those keys sits in front of the table. A key the filter has never seen
+is certainly new. Only a filter hit is confirmed with one primary-key lookup,
+so false positives never drop a post.
+
+The filter is saved to local_data/seen_posts.bloom together with the number
+of stored posts it covers. Posts are only ever added, so if the count no
+longer matches (e.g. after reextract.py or a crash), the filter is rebuilt
+from the table. It is also rebuilt at double the size when the posts outgrow
+its capacity.
+
+LinkedInScraper uses it to skip posts it already has and to stop paging once
+a whole page was seen before (search results are sorted by date).
+
+Usage:
+    seen = default_seen_posts()
+    'https://www.linkedin.com/feed/update/urn:li:activity:123/' in seen
+    seen.add(post_key(post))
+    seen.save()
+    python seen_posts.py --stats
+    python seen_posts.py --rebuild
+"""
+
+import argparse
+import hashlib
+import math
+import os
+import struct
+import time
+from typing import Dict, Iterable, Optional
+
+from local_store import LOCAL_DATA_DIR, LocalStore, default_local_store
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+SEEN_POSTS_BLOOM_PATH = os.path.join(LOCAL_DATA_DIR, "seen_posts.bloom")
+
+# Posts the filter is sized for (it is rebuilt at double size when outgrown) and its false positive rate
+BLOOM_CAPACITY = 100000
+BLOOM_ERROR_RATE = 0.001
+
+BLOOM_MAGIC = b"LIBLOOM1"
+# capacity, error rate, posts covered
+BLOOM_HEADER = struct.Struct("<QdQ")
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing of one blake2b digest)"""
+
+    def __init__(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE,
+                 bits: Optional[bytearray] = None):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str) -> None:
+        for position in self._positions(key):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class SeenPostIndex:
+    """Bloom filter in front of the local store's posts table"""
+
+    def __init__(self, store: Optional[LocalStore] = None, path: str = SEEN_POSTS_BLOOM_PATH,
+                 capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE):
+        self.store = store or default_local_store()
+        self.path = path
+        self.counters = {"new": 0, "seen": 0, "false_positives": 0}
+        # Posts the filter covers (the table's count when it was last in step)
+        self.count = 0
+        self.dirty = False
+
+        self.bloom = self._load(capacity, error_rate)
+        if self.bloom is None:
+            self.rebuild(capacity, error_rate)
+
+    def _load(self, capacity: int, error_rate: float) -> Optional[BloomFilter]:
+        """The saved filter, if it still covers exactly the stored posts"""
+        if not os.path.exists(self.path):
+            return None
+        try:
+            with open(self.path, "rb") as f:
+                if f.read(len(BLOOM_MAGIC)) != BLOOM_MAGIC:
+                    return None
+                saved_capacity, saved_error_rate, count = BLOOM_HEADER.unpack(f.read(BLOOM_HEADER.size))
+                bits = bytearray(f.read())
+        except (OSError, struct.error):
+            return None
+        if count != self.store.post_count() or saved_error_rate != error_rate or saved_capacity < capacity:
+            return None
+        bloom = BloomFilter(saved_capacity, error_rate, bits)
+        if len(bits) != (bloom.size + 7) // 8:
+            return None
+        self.count = count
+        return bloom
+
+    def rebuild(self, capacity: int = BLOOM_CAPACITY, error_rate: float = BLOOM_ERROR_RATE) -> int:
+        """Refill the filter from the posts table; returns the number of posts"""
+        count = self.store.post_count()
+        while capacity < count * 2:
+            capacity *= 2
+        self.bloom = BloomFilter(capacity, error_rate)
+        for key in self.store.post_keys():
+            self.bloom.add(key)
+        self.count = count
+        self.dirty = True
+        self.save()
+        return count
+
+    def __contains__(self, key: str) -> bool:
+        if not key or key not in self.bloom:
+            self.counters["new"] += 1
+            return False
+        if self.store.has_post(key):
+            self.counters["seen"] += 1
+            return True
+        self.counters["false_positives"] += 1
+        self.counters["new"] += 1
+        return False
+
+    def add(self, key: str) -> None:
+        """Remember a post the scraper has just saved to the store"""
+        self.add_many([key])
+
+    def add_many(self, keys: Iterable[str]) -> None:
+        for key in keys:
+            self.bloom.add(key)
+            self.count += 1
+            self.dirty = True
+        if self.count > self.bloom.capacity:
+            self.rebuild(self.bloom.capacity * 2, self.bloom.error_rate)
+
+    def save(self) -> None:
+        """Write the filter (atomically) if it changed"""
+        if not self.dirty:
+            return
+        # Re-saved posts (already in the table) were counted again; record the table's real count
+        self.count = self.store.post_count()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(BLOOM_MAGIC)
+            f.write(BLOOM_HEADER.pack(self.bloom.capacity, self.bloom.error_rate, self.count))
+            f.write(self.bloom.bits)
+        os.replace(temp_path, self.path)
+        self.dirty = False
+
+    def stats(self) -> Dict:
+        filled = sum(bin(byte).count("1") for byte in self.bloom.bits) / self.bloom.size
+        return {
+            "posts": self.count,
+            "capacity": self.bloom.capacity,
+            "bloom_bytes": len(self.bloom.bits),
+            "hash_functions": self.bloom.hashes,
+            "bits_set": f"{filled:.1%}",
+            "path": self.path,
+            **self.counters,
+        }
+
+
+_default_seen_posts: Optional[SeenPostIndex] = None
+
+
+def default_seen_posts() -> SeenPostIndex:
+    """Process-wide seen-post index used by the scraper"""
+    global _default_seen_posts
+    if _default_seen_posts is None:
+        _default_seen_posts = SeenPostIndex()
+    return _default_seen_posts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the scraper's seen-post index")
+    parser.add_argument("--stats", action="store_true", help="Print filter size and post count")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild the filter from the posts table")
+    parser.add_argument("--check", metavar="POST_URL", help="Whether a post has been collected before")
+    args = parser.parse_args()
+
+    seen = default_seen_posts()
+    if args.rebuild:
+        start = time.perf_counter()
+        count = seen.rebuild()
+        print(f"✅ Rebuilt from {count} posts in {(time.perf_counter() - start) * 1000:.0f} ms")
+    if args.check:
+        print(f"{'👀 Seen before' if args.check in seen else '🆕 Not seen'}: {args.check}")
+    if args.stats or not (args.rebuild or args.check):
+        for key, value in seen.stats().items():
+            print(f"📊 {key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,10 @@ import re
 import uuid
 import html
 from typing import Optional, Tuple
-from linkedin_conversation_extractor import LinkedInConversationExtractor  # NEW IMPORT
+from linkedin_conversation_extractor import CONVERSATION_CACHE_MAX_AGE, default_conversation_extractor
+from linkedin_client import CSRF_TOKEN, VOYAGER_API, default_session, site_url
+from local_store import default_local_store
+from urn_extraction import scan_page_urns
 
 # ==========================================
 # AUTOMATION FUNCTIONS FOR LINKEDIN URNS
@@ -34,9 +37,8 @@ def extract_profile_urn_from_url(profile_url: str) -> Optional[str]:
         Profile URN in format: urn:li:fsd_profile:XXXXXX or None if not found
     """
     try:
-        # Create session for URN resolution
-        session = requests.Session()
-        session.cookies.update(cookies)
+        # Shared pooled session (no new handshake per lookup)
+        session = default_session()
         
         # If already a URN, clean and return it
         if profile_url.startswith('urn:li:fsd_profile:'):
@@ -51,26 +53,16 @@ def extract_profile_urn_from_url(profile_url: str) -> Optional[str]:
             'referer': 'https://www.linkedin.com/',
         })
         
-        response = session.get(profile_url, headers=profile_headers)
+        response = session.get(site_url(profile_url), headers=profile_headers)
         
         if response.status_code == 200:
-            # Look for profile URN in the page source with multiple patterns
-            urn_patterns = [
-                r'"urn:li:fsd_profile:([^"]+)"',
-                r'urn:li:fsd_profile:([^,)"\s&]+)',
-                r'"profileUrn":"urn:li:fsd_profile:([^"]+)"',
-                r'&quot;urn:li:fsd_profile:([^&]+)&quot;',
-                r'%22urn:li:fsd_profile:([^%]+)%22',
-            ]
-            
-            for pattern in urn_patterns:
-                matches = re.findall(pattern, response.text)
-                if matches:
-                    urn_id = matches[0]
-                    full_urn = f"urn:li:fsd_profile:{urn_id}"
-                    cleaned_urn = clean_urn(full_urn)
-                    print(f"✅ Found URN: {cleaned_urn}")
-                    return cleaned_urn
+            # Scan the page once; quoted URNs win over bare ones
+            urn_id = scan_page_urns(response.text).first_profile_id(prefer_quoted=True)
+            if urn_id:
+                full_urn = f"urn:li:fsd_profile:{urn_id}"
+                cleaned_urn = clean_urn(full_urn)
+                print(f"✅ Found URN: {cleaned_urn}")
+                return cleaned_urn
         
         # Method 2: Fallback to username extraction
         print("🔄 Using username fallback method...")
@@ -95,12 +87,19 @@ def search_conversations(session: requests.Session, profile_urn: str) -> Optiona
         Conversation URN if found, None otherwise
     """
     try:
+        # Answer from the stored conversation list while it is fresh
+        store = default_local_store()
+        age = store.conversations_age()
+        if age is not None and age < CONVERSATION_CACHE_MAX_AGE:
+            conversation_urn = store.find_conversation_urn(profile_urn)
+            if conversation_urn:
+                return conversation_urn
+        
         # LinkedIn conversations API endpoint
-        url = "https://www.linkedin.com/voyager/api/voyagerMessagingDashConversations"
+        url = f"{VOYAGER_API}/voyagerMessagingDashConversations"
         
         headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-            "csrf-token": "ajax:4763283604314235653",
+            "csrf-token": CSRF_TOKEN,
             "x-li-lang": "en_US",
             "x-restli-protocol-version": "2.0.0",
             "accept": "application/json",
@@ -186,32 +185,9 @@ def get_linkedin_urns(profile_url_or_urn: str, session: requests.Session = None)
 # ORIGINAL AUTHENTICATION AND HEADERS
 # ==========================================
 
-# Define cookies (use a full, clean set as in your example)
-cookies = {
-    "bcookie": "v=2&12e9e7e4-3797-4b9d-8b85-e67c6fbbcf80",
-    "li_sugr": "9c83b1f7-b3ab-47d6-8f9c-aac27e761ba1",
-    "bscookie": "v=1&20250507140639ea67aaf7-6f73-48ff-8813-9f6383cea24eAQEBEVVX01KNZ7vWOUKdmFDVKvhshdNt",
-    "liap": "true",
-    "JSESSIONID": "ajax:4763283604314235653",
-    "_guid": "c4c27323-6441-4b94-8a60-e2dae58ecd41",
-    "dfpfpt": "3c04e81e591e469e8cf3481efad5f950",
-    "timezone": "Asia/Dubai",
-    "li_theme": "light",
-    "li_theme_set": "app",
-    "li_at": "AQEDASP6v4EBfhJ7AAABl8BT3OQAAAGX5GBg5E0AocvtLBfU2unQg6KLYHNi6AG83PSJwqQdkZ2kcjhYnS0jlwh0Xy834jLziuj_Kdg3yOwz-L-QrbzlBOjMqHho03KrmOqhKNRdfYXUPajAOyj_oUg_",
-    "lang": "v=2&lang=en-us",
-    "AnalyticsSyncHistory": "AQLwTYiBPPXAEQAAAZeq9LsZodIRFt_Zyzisf1c3QnUwif1sDC0AaLlviE-azQevBEOVyvdiwPqNY36wV-xZxw",
-    "fptctx2": "....",  # Shortened for brevity; use your full value
-    "sdui_ver": "sdui-flagship:0.1.7528+sdui-flagship.production",
-    "lms_ads": "....",
-    "lms_analytics": "....",
-    "UserMatchHistory": "....",
-    "lidc": "b=VB85:s=V:r=V:a=V:p=V:g=5950:u=785:x=1:i=1751116112:t=1751157469:v=2:sig=AQHO7kkYm6_UVNy5H4OrCoar7zLfZY5w"
-}
-
+# Cookies and the User-Agent are set on the shared session (linkedin_client.py)
 headers = {
-    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/138.0.0.0 Safari/537.36",
-    "csrf-token": "ajax:4763283604314235653",
+    "csrf-token": CSRF_TOKEN,
     "x-li-lang": "en_US",
     "x-li-page-instance": "urn:li:page:d_flagship3_messaging_conversation_detail;WlIOZhHvTp2Ya52EhsXI1Q==",
     "x-li-track": '{"clientVersion":"1.13.36800.3","mpVersion":"1.13.36800.3","osName":"web","timezoneOffset":4,"timezone":"Asia/Dubai","deviceFormFactor":"DESKTOP","mpName":"voyager-web","displayDensity":2.5,"displayWidth":3600,"displayHeight":2250}',
@@ -227,9 +203,8 @@ headers = {
 # AUTOMATED URN EXTRACTION
 # ==========================================
 
-# Create session with cookies
-session = requests.Session()
-session.cookies.update(cookies)
+# Shared session with cookies (keep-alive pool reused by every request below)
+session = default_session()
 
 # Initialize URNs as None - will be set via name lookup
 mailbox_urn = None
@@ -275,7 +250,7 @@ def send_linkedin_message(message_text: str, target_profile: str) -> bool:
         }
         
         # Send message
-        url = "https://www.linkedin.com/voyager/api/voyagerMessagingDashMessengerMessages?action=createMessage"
+        url = f"{VOYAGER_API}/voyagerMessagingDashMessengerMessages?action=createMessage"
         response = session.post(url, headers=headers, data=json.dumps(payload))
         
         if response.status_code == 200:
@@ -299,8 +274,13 @@ if __name__ == "__main__":
     input_value = input("👤 Enter the recipient's name OR LinkedIn profile URL (e.g., 'oussama' or 'https://www.linkedin.com/in/oussamagaham/'): ").strip()
     if input_value:
         try:
-            extractor = LinkedInConversationExtractor()
+            # One extractor (and connection pool) for every lookup in this process
+            extractor = default_conversation_extractor()
             result = extractor.get_urns_by_name(input_value)
+            if not result:
+                # The stored list may predate this conversation; check LinkedIn once
+                print("🔄 Not in the stored conversations, refetching...")
+                result = extractor.get_urns_by_name(input_value, refresh=True)
             if result:
                 mailbox_urn = result["mailbox_urn"]
                 conversation_urn = result["conversation_urn"]
@@ -369,7 +349,7 @@ if __name__ == "__main__":
             "dedupeByClientGeneratedToken": False
         }
         
-        url = "https://www.linkedin.com/voyager/api/voyagerMessagingDashMessengerMessages?action=createMessage"
+        url = f"{VOYAGER_API}/voyagerMessagingDashMessengerMessages?action=createMessage"
         
         print(f"📤 Sending message…")
         print(f"🎯 To: {mailbox_urn}")
@@ -7,6 +7,7 @@ This will help us understand the actual structure of the data
 import requests
 import json
 import sys
+from linkedin_client import VOYAGER_API
 from linkedin_connection_checker import LinkedInConnectionChecker
 
 def debug_profile_response(profile_url: str):
@@ -24,9 +25,9 @@ def debug_profile_response(profile_url: str):
     print("=" * 60)
     
     # Try the profileView endpoint
-    url = f"https://www.linkedin.com/voyager/api/identity/profiles/{public_id}/profileView"
+    url = f"{VOYAGER_API}/identity/profiles/{public_id}/profileView"
     
-    headers = checker.session.headers.copy()
+    headers = checker.headers.copy()
     headers.update({
         "referer": f"https://www.linkedin.com/in/{public_id}/",
         "x-li-page-instance": f"urn:li:page:d_flagship3_profile_view_base;12345678"
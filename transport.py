@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Record / Replay Transport
+
+Every LinkedIn request goes through the shared session (linkedin_client.py).
+This module decides what that session does with a request, based on
+LINKEDIN_TRANSPORT:
+
+    passthrough   send it to LinkedIn (default)
+    record        send it to LinkedIn and also write the response to a cassette
+    replay        answer it from the cassette; nothing leaves the machine
+
+A cassette is a response archive file (see response_archive.py). The record
+endpoint is the HTTP method and the key is the URL, with volatile parts such
+as lastUpdatedBefore timestamps masked. POST bodies are not part of the key,
+because they carry fresh tracking ids. When one key was recorded several
+times, replay returns the responses in recorded order and then repeats the
+last one. A request with nothing recorded fails with CassetteMiss, a
+requests ConnectionError, so callers handle it like a network error.
+
+Replay waits LINKEDIN_REPLAY_LATENCY_MS per response: a number of
+milliseconds, or "recorded" to reproduce each response's original time. The
+HTTP cache (http_cache.py) is off in record and replay modes, so every request
+reaches the cassette.
+
+Usage:
+    LINKEDIN_TRANSPORT=record LINKEDIN_CASSETTE=local_data/cassettes/checker.dat \\
+        python test_debug_connection.py https://www.linkedin.com/in/johndoe/
+    LINKEDIN_TRANSPORT=replay LINKEDIN_CASSETTE=local_data/cassettes/checker.dat LINKEDIN_REPLAY_LATENCY_MS=recorded \\
+        python test_debug_connection.py https://www.linkedin.com/in/johndoe/
+    python transport.py --list local_data/cassettes/checker.dat
+"""
+
+import argparse
+import base64
+import os
+import re
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from identity_cache import LOCAL_DATA_DIR
+from response_archive import ResponseArchive
+
+# ==========================================
+# CONFIG
+# ==========================================
+
+TRANSPORT_MODES = ("passthrough", "record", "replay")
+
+TRANSPORT_MODE = os.environ.get("LINKEDIN_TRANSPORT", "passthrough")
+CASSETTE_PATH = os.environ.get("LINKEDIN_CASSETTE", os.path.join(LOCAL_DATA_DIR, "cassettes", "default.dat"))
+# Milliseconds per replayed response, or "recorded"
+REPLAY_LATENCY_MS = os.environ.get("LINKEDIN_REPLAY_LATENCY_MS", "0")
+
+# URL parts that change on every call, masked in cassette keys
+VOLATILE_URL_PATTERNS = [
+    (re.compile(r"(lastUpdatedBefore[:=])\d+"), r"\1*"),
+    (re.compile(r"([?&]_=)\d+"), r"\1*"),
+]
+
+
+class CassetteMiss(requests.exceptions.ConnectionError):
+    """Raised in replay mode for a request the cassette has no response for"""
+
+
+def request_key(url: str) -> str:
+    """Cassette key for a request URL"""
+    for pattern, replacement in VOLATILE_URL_PATTERNS:
+        url = pattern.sub(replacement, url)
+    return url
+
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records responses to, or replays them from, a cassette"""
+
+    def __init__(self, mode: str = TRANSPORT_MODE, cassette: Optional[ResponseArchive] = None,
+                 latency_ms: str = REPLAY_LATENCY_MS, **kwargs):
+        if mode not in TRANSPORT_MODES:
+            raise ValueError(f"Unknown transport mode {mode!r} (expected one of {', '.join(TRANSPORT_MODES)})")
+        super().__init__(**kwargs)
+        self.mode = mode
+        self.cassette = cassette if cassette is not None else ResponseArchive(CASSETTE_PATH)
+        self.latency_ms = latency_ms
+        self.counters = {"recorded": 0, "replayed": 0, "misses": 0}
+        # Responses replayed so far per (method, key)
+        self._played: Dict[tuple, int] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        if self.mode == "replay":
+            return self.replay(request)
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        if self.mode == "record":
+            self.record(request, response, (time.perf_counter() - start) * 1000)
+        return response
+
+    def record(self, request, response: Response, elapsed_ms: float) -> None:
+        self.cassette.append(request.method, request_key(request.url), {
+            "url": request.url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": dict(response.headers),
+            # Reads (and decodes) the body now; Session.send would do the same unless stream=True
+            "body": base64.b64encode(response.content).decode("ascii"),
+            "elapsed_ms": elapsed_ms,
+        })
+        self.counters["recorded"] += 1
+
+    def replay(self, request) -> Response:
+        key = request_key(request.url)
+        rows = self.cassette.lookup(request.method, key)
+        if not rows:
+            self.counters["misses"] += 1
+            raise CassetteMiss(f"No recorded response for {request.method} {request.url}", request=request)
+        with self._lock:
+            played = self._played.get((request.method, key), 0)
+            self._played[(request.method, key)] = played + 1
+        row = rows[min(played, len(rows) - 1)]
+        entry = self.cassette.read_at(row["offset"], row["length"])["data"]
+
+        delay_ms = entry.get("elapsed_ms", 0) if self.latency_ms == "recorded" else float(self.latency_ms or 0)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+        self.counters["replayed"] += 1
+        return self.build_replayed_response(request, entry)
+
+    def build_replayed_response(self, request, entry: Dict) -> Response:
+        response = Response()
+        response.status_code = entry["status_code"]
+        response.reason = entry.get("reason") or ""
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response._content = base64.b64decode(entry["body"])
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.encoding = get_encoding_from_headers(response.headers)
+        return response
+
+    def close(self):
+        super().close()
+        self.cassette.close()
+
+
+def cassette_adapter(mode: str = TRANSPORT_MODE, **kwargs) -> Optional[CassetteAdapter]:
+    """Adapter for the record/replay modes, or None for passthrough"""
+    if mode == "passthrough":
+        return None
+    return CassetteAdapter(mode, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect record/replay cassettes")
+    parser.add_argument("cassette", nargs="?", default=CASSETTE_PATH, help="Cassette file")
+    parser.add_argument("--list", action="store_true", help="List the recorded requests")
+    args = parser.parse_args()
+
+    print(f"🔌 Transport: {TRANSPORT_MODE} (LINKEDIN_TRANSPORT)")
+    print(f"📼 Cassette: {args.cassette} (LINKEDIN_CASSETTE)")
+    print(f"⏱️ Replay latency: {REPLAY_LATENCY_MS} ms (LINKEDIN_REPLAY_LATENCY_MS)")
+    if not os.path.exists(args.cassette):
+        print("❌ Cassette not recorded yet")
+        return
+
+    cassette = ResponseArchive(args.cassette)
+    for method, count in cassette.endpoints().items():
+        print(f"📊 {method}: {count} responses")
+    if args.list:
+        for row in cassette.iter_index():
+            entry = cassette.read_at(row["offset"], row["length"])["data"]
+            print(f"   {row['endpoint']} {entry['status_code']} {entry.get('elapsed_ms', 0):7.1f} ms  {row['key'][:120]}")
+    cassette.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+URN Extraction Helpers
+
+Finds profile URNs in two kinds of input:
+
+* Parsed voyager responses: iter_urn_fields() walks the object iteratively and
+  only runs a small regex on string fields that actually contain a URN, instead
+  of json.dumps()-ing the whole response and regex-scanning the string.
+* Profile HTML pages: scan_page_urns() answers every fallback lookup from at
+  most one pass per precompiled pattern (URNs, then lazily member-id /
+  photo-id hits), so the fallback paths no longer run 4-15 separate
+  re.findall() calls per page.
+
+Usage:
+    profile_urn_candidates(response_json)   # ['ACoAA...', ...] in document order
+    scan = scan_page_urns(html_text)
+    scan.first_profile_id(prefer_quoted=True)
+"""
+
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+URN_MARKER = 'urn:li:'
+
+FSD_PROFILE_ID_RE = re.compile(r'urn:li:fsd_profile:([A-Za-z0-9_-]+)')
+MINI_PROFILE_ID_RE = re.compile(r'urn:li:fs_miniProfile:([A-Za-z0-9_-]+)')
+
+
+def iter_urn_fields(obj: Any) -> Iterator[Tuple[Optional[str], str]]:
+    """
+    Yield (key, value) for every string field containing a URN, in document order.
+
+    `key` is the name of the enclosing dict field (list items report the key
+    of the list they belong to). The walk uses an explicit stack, so deeply
+    nested responses cannot hit the recursion limit.
+    """
+    stack = [iter(((None, obj),))]
+    while stack:
+        for key, value in stack[-1]:
+            if isinstance(value, str):
+                if URN_MARKER in value:
+                    yield key, value
+            elif isinstance(value, dict):
+                stack.append(iter(value.items()))
+                break
+            elif isinstance(value, list):
+                stack.append(((key, item) for item in value))
+                break
+        else:
+            stack.pop()
+
+
+def profile_urn_candidates(obj: Any, include_mini_profiles: bool = True) -> List[str]:
+    """
+    Return every distinct fsd_profile ID in `obj`, in document order, in one pass.
+
+    With `include_mini_profiles`, IDs from `miniProfile` fields that hold an
+    fs_miniProfile URN are included too (they share the same ID).
+    """
+    seen = set()
+    candidates = []
+    for key, value in iter_urn_fields(obj):
+        for urn_id in FSD_PROFILE_ID_RE.findall(value):
+            if urn_id not in seen:
+                seen.add(urn_id)
+                candidates.append(urn_id)
+        if include_mini_profiles and key == 'miniProfile':
+            for urn_id in MINI_PROFILE_ID_RE.findall(value):
+                if urn_id not in seen:
+                    seen.add(urn_id)
+                    candidates.append(urn_id)
+    return candidates
+
+
+def first_profile_urn_id(obj: Any, min_length: int = 20) -> Optional[str]:
+    """First fsd_profile ID of at least `min_length` characters, or None"""
+    for _, value in iter_urn_fields(obj):
+        for urn_id in FSD_PROFILE_ID_RE.findall(value):
+            if len(urn_id) >= min_length:
+                return urn_id
+    return None
+
+
+# ==========================================
+# HTML PAGE SCANNING
+# ==========================================
+
+# URN hits dominate profile pages, so they get their own pattern: it starts
+# with a literal, which lets the regex engine jump between candidates instead
+# of trying every position (an alternation across all shapes loses that and
+# was ~3x slower than the old separate findall() passes).
+PAGE_URN_PATTERN = re.compile(
+    r'urn:li:(fsd_profile|fs_miniProfile|member):([A-Za-z0-9_-]+)'
+)
+
+# The member-id attribute and photo-id fallbacks share one alternation. Only
+# the last-resort path needs them, so this scan runs lazily.
+PAGE_FALLBACK_PATTERN = re.compile(
+    r'data-member-id="(?P<data_member_id>\d+)"'
+    r'|data-profileid="(?P<data_profileid>\d+)"'
+    r'|member-id=(?P<member_id>\d+)'
+    r'|memberId=(?P<memberId>\d+)'
+    r'|profile-displayphoto-shrink_\d+_\d+/\d+/\d+/\d+/(?P<photo_id>[^/?"&\s]+)'
+)
+
+# Openers that make a URN "quoted": ", &quot; or %22
+URN_QUOTES = ('"', '&quot;', '%22')
+
+# Applied to the few characters before a URN hit to recover which JSON field
+# ("entityUrn": / &quot;entityUrn&quot;:) or query parameter (entityUrn=) it
+# is the value of.
+URN_CONTEXT_PATTERN = re.compile(
+    r'(?:(?:"|&quot;)(?P<field>[\w$*]+)(?:"|&quot;):|(?P<param>\w+)=)(?:"|&quot;|%22)?$'
+)
+URN_CONTEXT_WINDOW = 48
+
+# Member-id attribute groups, in the order the fallbacks trust them
+MEMBER_ID_GROUPS = ('data_member_id', 'data_profileid', 'member_id', 'memberId')
+
+
+class UrnMatch(NamedTuple):
+    namespace: str          # fsd_profile, fs_miniProfile or member
+    urn_id: str
+    start: int              # offset of 'urn:li:' in the page
+    quoted: bool            # URN was opened by ", &quot; or %22
+
+    @property
+    def urn(self) -> str:
+        return f"urn:li:{self.namespace}:{self.urn_id}"
+
+
+class PageUrnScan:
+    """
+    URN-ish hits found in an HTML page, in document order.
+
+    Every table is filled by at most one pass over the page, the first time it
+    is asked for: the positioned UrnMatch list (which also serves the plain
+    profile-id lookups) and the member-id / photo-id hits for the last-resort
+    path.
+    """
+
+    def __init__(self, page: str):
+        self.page = page or ''
+        self._urns: Optional[List[UrnMatch]] = None
+        self._member_ids: Optional[Dict[str, List[str]]] = None
+        self._photo_ids: Optional[List[str]] = None
+        self._contexts: Dict[int, Tuple[Optional[str], Optional[str]]] = {}
+
+    @property
+    def urns(self) -> List[UrnMatch]:
+        """Every URN hit with its offset and whether it was quoted"""
+        if self._urns is None:
+            page = self.page
+            self._urns = [
+                UrnMatch(m.group(1), m.group(2), m.start(), page.endswith(URN_QUOTES, 0, m.start()))
+                for m in PAGE_URN_PATTERN.finditer(page)
+            ]
+        return self._urns
+
+    def profile_ids(self, include_mini_profiles: bool = False) -> List[str]:
+        """fsd_profile IDs (optionally fs_miniProfile IDs too), in document order"""
+        namespaces = ('fsd_profile', 'fs_miniProfile') if include_mini_profiles else ('fsd_profile',)
+        return [match.urn_id for match in self.urns if match.namespace in namespaces]
+
+    def first_profile_id(self, prefer_quoted: bool = True) -> Optional[str]:
+        """
+        First fsd_profile ID on the page.
+
+        With `prefer_quoted`, a quoted URN ("urn:...", &quot;urn:...&quot;,
+        %22urn:...%22, "profileUrn":"urn:...") wins over a bare one anywhere
+        on the page, matching the old pattern priority. Stops at the first
+        qualifying hit instead of scanning the rest of the page.
+        """
+        page = self.page
+        bare = None
+        for m in PAGE_URN_PATTERN.finditer(page):
+            if m.group(1) != 'fsd_profile':
+                continue
+            if not prefer_quoted or page.endswith(URN_QUOTES, 0, m.start()):
+                return m.group(2)
+            if bare is None:
+                bare = m.group(2)
+        return bare
+
+    def context(self, match: UrnMatch) -> Tuple[Optional[str], Optional[str]]:
+        """(JSON field, query parameter) the URN is the value of; either may be None"""
+        context = self._contexts.get(match.start)
+        if context is None:
+            found = URN_CONTEXT_PATTERN.search(self.page, max(0, match.start - URN_CONTEXT_WINDOW), match.start)
+            context = (found.group('field'), found.group('param')) if found else (None, None)
+            self._contexts[match.start] = context
+        return context
+
+    def urns_in_field(self, namespace: str, field: str = None, param: str = None) -> List[UrnMatch]:
+        """URN hits of `namespace` that are the value of a given JSON field or query parameter"""
+        matches = [m for m in self.urns if m.namespace == namespace]
+        if field is None and param is None:
+            return matches
+        wanted = []
+        for m in matches:
+            m_field, m_param = self.context(m)
+            if (field is None or m_field == field) and (param is None or m_param == param):
+                wanted.append(m)
+        return wanted
+
+    def _scan_fallbacks(self):
+        member_ids: Dict[str, List[str]] = {group: [] for group in MEMBER_ID_GROUPS}
+        photo_ids: List[str] = []
+        for m in PAGE_FALLBACK_PATTERN.finditer(self.page):
+            group = m.lastgroup
+            if group == 'photo_id':
+                photo_ids.append(m.group(group))
+            else:
+                member_ids[group].append(m.group(group))
+        self._member_ids, self._photo_ids = member_ids, photo_ids
+
+    @property
+    def member_ids(self) -> Dict[str, List[str]]:
+        """Member-id attribute values keyed by MEMBER_ID_GROUPS entry, in document order"""
+        if self._member_ids is None:
+            self._scan_fallbacks()
+        return self._member_ids
+
+    @property
+    def photo_ids(self) -> List[str]:
+        """IDs taken from profile-displayphoto URLs, in document order"""
+        if self._photo_ids is None:
+            self._scan_fallbacks()
+        return self._photo_ids
+
+
+def scan_page_urns(page: str) -> PageUrnScan:
+    """Wrap `page` for URN lookups; see PageUrnScan"""
+    return PageUrnScan(page)
+
+
+def dedupe_keep_longest(candidates: List[str]) -> List[str]:
+    """
+    Drop duplicates and truncated copies, keeping the longest version of each ID.
+
+    Truncated copies are prefixes of the full ID, and after sorting a prefix
+    sits directly before the strings that extend it, so one pass over the
+    sorted list finds them all (O(n log n) overall instead of the old pairwise
+    O(n^2) containment loop). Survivors keep their first-seen order.
+    """
+    unique = list(dict.fromkeys(candidates))
+    ordered = sorted(unique)
+    truncated = {
+        ordered[i] for i in range(len(ordered) - 1)
+        if ordered[i + 1].startswith(ordered[i])
+    }
+    return [c for c in unique if c not in truncated]